@@ -2,4 +2,4 @@
 Algorithms package untuk KNN dan Fuzzy Logic
 """
 
-__all__ = ['knn', 'fuzzy_logic']
+__all__ = ['knn', 'knn_sweep', 'fuzzy_logic', 'fuzzy_numpy', 'fuzzy_surface', 'fuzzy_cache', 'model_registry', 'dataset_store', 'mutable_dataset', 'ann', 'sharding', 'executor', 'instrumentation']
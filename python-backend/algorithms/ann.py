@@ -0,0 +1,221 @@
+"""
+Approximate nearest neighbor (ANN) backend untuk KNN pada training set besar.
+
+Index IVF (inverted file): data dikelompokkan dengan k-means menjadi n_lists
+cluster, titik disimpan berurutan per cluster, dan setiap query hanya memeriksa
+titik di n_probe cluster terdekat. Kandidat tersebut diurutkan ulang dengan jarak
+exact, jadi yang diaproksimasi hanya himpunan kandidatnya.
+
+n_probe adalah knob utama recall/kecepatan: makin besar makin mendekati exact.
+"""
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.metrics import pairwise_distances
+
+from .knn_sweep import neighbor_class_probabilities
+
+
+# Baris per blok saat menghitung jarak ke centroid (membatasi memori sementara)
+_ASSIGN_CHUNK_ROWS = 8192
+
+
+def _squared_distances_to_centroids(X, centroids, centroid_norms):
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2
+    distances = -2.0 * (X @ centroids.T)
+    distances += centroid_norms
+    distances += np.einsum('ij,ij->i', X, X)[:, None]
+    return distances
+
+
+def _nearest_centroid(X, centroids):
+    centroid_norms = np.einsum('ij,ij->i', centroids, centroids)
+    labels = np.empty(len(X), dtype=np.int64)
+    for start in range(0, len(X), _ASSIGN_CHUNK_ROWS):
+        block = X[start:start + _ASSIGN_CHUNK_ROWS]
+        labels[start:start + len(block)] = np.argmin(
+            _squared_distances_to_centroids(block, centroids, centroid_norms), axis=1
+        )
+    return labels
+
+
+def _candidate_distances(query, candidates, metric):
+    diff = np.abs(candidates - query)
+    if metric in ('euclidean', 'minkowski'):
+        return np.sqrt(np.einsum('ij,ij->i', diff, diff))
+    if metric == 'manhattan':
+        return diff.sum(axis=1)
+    if metric == 'chebyshev':
+        return diff.max(axis=1)
+    return pairwise_distances(query[None, :], candidates, metric=metric)[0]
+
+
+class ANNKNeighborsClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Klasifikasi KNN dengan index IVF, antarmuka sama dengan KNeighborsClassifier
+    (fit, kneighbors, predict, predict_proba, classes_).
+
+    Parameter:
+        n_neighbors: Jumlah tetangga
+        metric: Metrik jarak untuk re-ranking kandidat. Pengelompokan memakai
+            jarak euclidean, jadi recall terbaik untuk metrik norma.
+        weights: 'uniform' atau 'distance'
+        n_lists: Jumlah cluster (default: sekitar sqrt(n_samples))
+        n_probe: Jumlah cluster yang diperiksa per query
+        kmeans_iter: Iterasi Lloyd untuk k-means
+        kmeans_sample: Jumlah sampel untuk melatih centroid (default: 64 per cluster)
+        random_state: Seed untuk inisialisasi k-means
+    """
+
+    def __init__(self, n_neighbors=5, metric='euclidean', weights='uniform', n_lists=None,
+                 n_probe=8, kmeans_iter=10, kmeans_sample=None, random_state=0):
+        self.n_neighbors = n_neighbors
+        self.metric = metric
+        self.weights = weights
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.kmeans_iter = kmeans_iter
+        self.kmeans_sample = kmeans_sample
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        """
+        Bangun index IVF
+
+        Args:
+            X: Training features (n_samples, n_features)
+            y: Training labels
+
+        Returns:
+            self
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or len(X) == 0:
+            raise ValueError("Data training harus berupa matriks yang tidak kosong.")
+        if self.n_probe < 1:
+            raise ValueError("n_probe harus >= 1.")
+
+        self.classes_, self._y = np.unique(np.asarray(y), return_inverse=True)
+        n_samples = len(X)
+        n_lists = self.n_lists or int(round(np.sqrt(n_samples)))
+        n_lists = max(1, min(int(n_lists), n_samples))
+
+        self.centroids_ = self._train_centroids(X, n_lists)
+        assignments = _nearest_centroid(X, self.centroids_)
+
+        # Titik disimpan berurutan per cluster; _order memetakan ke indeks asli
+        self._order = np.argsort(assignments, kind='stable')
+        self._fit_X = X[self._order]
+        self._fit_norms = np.einsum('ij,ij->i', self._fit_X, self._fit_X)
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))])
+        self.n_samples_fit_ = n_samples
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def _train_centroids(self, X, n_lists):
+        rng = np.random.default_rng(self.random_state)
+        sample_size = self.kmeans_sample or 64 * n_lists
+        if sample_size < len(X):
+            sample = X[rng.choice(len(X), sample_size, replace=False)]
+        else:
+            sample = X
+
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(self.kmeans_iter):
+            labels = _nearest_centroid(sample, centroids)
+            counts = np.bincount(labels, minlength=n_lists)
+            sums = np.column_stack([
+                np.bincount(labels, weights=sample[:, j], minlength=n_lists)
+                for j in range(sample.shape[1])
+            ])
+
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            # Cluster kosong diisi ulang dengan titik acak
+            empty = np.flatnonzero(~filled)
+            if len(empty):
+                centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        return centroids
+
+    @property
+    def index_nbytes(self):
+        """Perkiraan memori index (data terurut, label, centroid, offset)"""
+        return int(sum(array.nbytes for array in (
+            self._fit_X, self._fit_norms, self._y, self._order, self._offsets, self.centroids_
+        )))
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        """
+        Cari tetangga terdekat (aproksimasi)
+
+        Returns:
+            tuple: (distances, indices) dengan indeks ke data training asli,
+                atau indices saja jika return_distance=False
+        """
+        if X is None:
+            raise ValueError("X wajib diisi untuk ANN backend.")
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        k = n_neighbors or self.n_neighbors
+        if k > self.n_samples_fit_:
+            raise ValueError(
+                f"n_neighbors ({k}) lebih besar dari jumlah data training ({self.n_samples_fit_})."
+            )
+
+        list_sizes = np.diff(self._offsets)
+        n_lists = len(list_sizes)
+        centroid_distances = _squared_distances_to_centroids(
+            X, self.centroids_, np.einsum('ij,ij->i', self.centroids_, self.centroids_)
+        )
+        n_probe = min(self.n_probe, n_lists)
+        probes = np.argpartition(centroid_distances, n_probe - 1, axis=1)[:, :n_probe]
+
+        distances = np.empty((len(X), k))
+        indices = np.empty((len(X), k), dtype=np.int64)
+        for i, query in enumerate(X):
+            lists = probes[i]
+            # Jika cluster yang diperiksa berisi kurang dari k titik, tambah cluster berikutnya
+            if list_sizes[lists].sum() < k:
+                ranked = np.argsort(centroid_distances[i])
+                needed = np.searchsorted(np.cumsum(list_sizes[ranked]), k) + 1
+                lists = ranked[:needed]
+            distances[i], indices[i] = self._search_lists(query, lists, k)
+
+        if return_distance:
+            return distances, indices
+        return indices
+
+    def _search_lists(self, query, lists, k):
+        # Setiap cluster adalah slice kontigu dari _fit_X, jadi tidak ada salinan kandidat
+        blocks = [(self._offsets[c], self._offsets[c + 1]) for c in lists]
+        positions = np.concatenate([np.arange(lo, hi) for lo, hi in blocks])
+
+        if self.metric in ('euclidean', 'minkowski'):
+            # Seleksi awal dengan ||x||^2 - 2 x.q, lalu jarak exact untuk kandidat teratas
+            scores = np.concatenate([
+                self._fit_norms[lo:hi] - 2.0 * (self._fit_X[lo:hi] @ query) for lo, hi in blocks
+            ])
+            n_keep = min(len(positions), 2 * k)
+            if len(positions) > n_keep:
+                positions = positions[np.argpartition(scores, n_keep - 1)[:n_keep]]
+            candidate_distances = _candidate_distances(query, self._fit_X[positions], self.metric)
+        else:
+            candidate_distances = np.concatenate([
+                _candidate_distances(query, self._fit_X[lo:hi], self.metric) for lo, hi in blocks
+            ])
+
+        original = self._order[positions]
+        top = np.argpartition(candidate_distances, k - 1)[:k] if len(positions) > k \
+            else np.arange(len(positions))
+        # Urut berdasarkan (jarak, indeks asli) seperti pencarian exact
+        top = top[np.lexsort((original[top], candidate_distances[top]))]
+        return candidate_distances[top], original[top]
+
+    def predict_proba(self, X):
+        """Probabilitas kelas dari tetangga aproksimasi"""
+        distances, indices = self.kneighbors(X)
+        return neighbor_class_probabilities(distances, indices, self._y, len(self.classes_),
+                                            self.weights)
+
+    def predict(self, X):
+        """Label prediksi dari tetangga aproksimasi"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
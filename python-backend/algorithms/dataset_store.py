@@ -0,0 +1,363 @@
+"""
+Penyimpanan dataset model KNN di disk sebagai file .npy yang dibuka memory-mapped.
+
+Data dan parameter model disimpan terpisah:
+- datasets/<data_id>/ berisi data training, dengan data_id fingerprint data saja
+  (feature dan label):
+  - X.npy         feature asli
+  - X_scaled.npy  feature hasil StandardScaler (dipakai langsung oleh model)
+  - y.npy         label (label campuran tipe disimpan di meta.json)
+  - meta.json     state scaler
+- models/<model_id>.json berisi data_id dan parameter model (k, metric, weights,
+  backend, ann_params)
+
+Model dengan data sama tetapi parameter berbeda (misalnya k lain) memakai file .npy
+yang sama, sehingga disk dan page cache hanya menyimpan satu salinan per dataset.
+
+Semua worker gunicorn membuka file yang sama dengan np.load(mmap_mode='r'), sehingga
+OS page cache hanya menyimpan satu salinan data untuk semua worker, dan dataset
+tetap tersedia setelah restart tanpa di-upload ulang.
+
+Folder ditulis ke nama sementara lalu di-rename atomik, jadi worker lain tidak pernah
+melihat dataset setengah jadi. Total ukuran dibatasi KNN_DATASET_MAX_BYTES; dataset
+yang paling lama tidak dipakai (mtime meta.json) dihapus lebih dulu bersama file
+model yang memakainya. Worker yang masih memakai dataset yang dihapus tetap aman
+karena mapping-nya tidak ikut hilang.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+
+DEFAULT_MAX_BYTES = int(os.environ.get('KNN_DATASET_MAX_BYTES', 8 * 1024 * 1024 * 1024))
+
+# State StandardScaler yang cukup untuk transform()
+_SCALER_ATTRS = ('mean_', 'scale_', 'var_')
+
+
+def is_memory_mapped(array):
+    """True jika array (atau base-nya) adalah view dari file memory-mapped"""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def scaler_state(scaler):
+    """State StandardScaler yang sudah di-fit dalam bentuk JSON-serializable"""
+    state = {attr: getattr(scaler, attr).tolist() for attr in _SCALER_ATTRS}
+    state['n_samples_seen_'] = int(scaler.n_samples_seen_)
+    return state
+
+
+def restore_scaler(state):
+    """Bangun ulang StandardScaler dari scaler_state()"""
+    scaler = StandardScaler()
+    for attr in _SCALER_ATTRS:
+        setattr(scaler, attr, np.asarray(state[attr], dtype=np.float64))
+    scaler.n_samples_seen_ = state['n_samples_seen_']
+    scaler.n_features_in_ = len(scaler.mean_)
+    return scaler
+
+
+class StoredDataset:
+    """Dataset yang dibuka dari DatasetStore (array read-only memory-mapped)"""
+
+    def __init__(self, data_id, X, X_scaled, y, meta, params=None):
+        self.data_id = data_id
+        self.X = X
+        self.X_scaled = X_scaled
+        self.y = y
+        self.meta = meta
+        self.params = params
+
+    @property
+    def scaler(self):
+        """StandardScaler yang menghasilkan X_scaled"""
+        return restore_scaler(self.meta['scaler'])
+
+
+class DatasetStore:
+    """Folder dataset .npy per fingerprint data dan parameter per model_id, dibagi semua worker"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory: Folder penyimpanan (dibuat jika belum ada)
+            max_bytes: Batas ukuran total semua dataset di disk
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._datasets_dir = os.path.join(directory, 'datasets')
+        self._models_dir = os.path.join(directory, 'models')
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(self, data_id, X, X_scaled, y, meta):
+        """
+        Simpan dataset lalu buka kembali secara memory-mapped
+
+        Jika worker lain sudah menyimpan data_id yang sama, dataset yang sudah
+        ada yang dipakai.
+
+        Args:
+            data_id: Fingerprint data (nama folder), lihat knn.data_fingerprint
+            X: Feature asli
+            X_scaled: Feature hasil scaler
+            y: Label
+            meta: Dict JSON-serializable (scaler, ...)
+
+        Returns:
+            StoredDataset
+        """
+        target = self._path(self._datasets_dir, data_id)
+        os.makedirs(self._datasets_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self._datasets_dir, prefix='.tmp-')
+        try:
+            meta = dict(meta, n_samples=len(X))
+            np.save(os.path.join(tmp_dir, 'X.npy'), np.ascontiguousarray(X, dtype=np.float64))
+            np.save(os.path.join(tmp_dir, 'X_scaled.npy'),
+                    np.ascontiguousarray(X_scaled, dtype=np.float64))
+            y = np.asarray(y)
+            if y.dtype.kind == 'O':
+                # Object array tidak bisa di-mmap; label campuran disimpan apa adanya
+                meta['labels'] = y.tolist()
+            else:
+                np.save(os.path.join(tmp_dir, 'y.npy'), y)
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as handle:
+                json.dump(meta, handle)
+            try:
+                os.rename(tmp_dir, target)
+            except OSError:
+                # Folder tujuan sudah ada: worker lain menyimpan dataset yang sama lebih dulu
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        self._prune(keep=target)
+        stored = self._open(data_id)
+        if stored is None:
+            raise OSError(f"Dataset {data_id} gagal dibuka setelah disimpan.")
+        return stored
+
+    def put_model(self, model_id, data_id, params):
+        """
+        Simpan parameter model yang dilatih dari dataset data_id
+
+        Args:
+            model_id: Fingerprint model (data dan parameter)
+            data_id: Fingerprint data yang sudah disimpan dengan put()
+            params: Parameter KNNAlgorithm (JSON-serializable)
+        """
+        path = self._path(self._models_dir, model_id + '.json')
+        os.makedirs(self._models_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._models_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+                json.dump({'data_id': data_id, 'params': params}, handle)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def get(self, data_id):
+        """
+        Buka dataset yang tersimpan
+
+        Returns:
+            StoredDataset (tanpa params) atau None jika tidak ada
+        """
+        return self._count(self._open(data_id))
+
+    def get_model(self, model_id):
+        """
+        Buka dataset beserta parameter model model_id
+
+        Returns:
+            StoredDataset dengan params, atau None jika model atau datasetnya tidak ada
+        """
+        model = self._read_model(model_id)
+        stored = None if model is None else self._open(model['data_id'])
+        if stored is not None:
+            stored.params = model['params']
+        return self._count(stored)
+
+    def remove_model(self, model_id):
+        """
+        Hapus model dari disk, beserta datasetnya jika tidak dipakai model lain
+
+        Returns:
+            bool: True jika model ditemukan dan dihapus
+        """
+        model = self._read_model(model_id)
+        if model is None:
+            return False
+        try:
+            os.unlink(self._path(self._models_dir, model_id + '.json'))
+        except FileNotFoundError:
+            return False
+        if model['data_id'] not in self._model_data_ids().values():
+            self._remove_dir(self._path(self._datasets_dir, model['data_id']))
+        return True
+
+    def clear(self):
+        """Hapus semua dataset dan model"""
+        for path in self._model_data_ids():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        for path, _, _ in self._datasets():
+            self._remove_dir(path)
+
+    def stats(self):
+        """Statistik store (jumlah dataset dan model, byte di disk, hit/miss, eviction)"""
+        datasets = self._datasets()
+        models = len(self._model_data_ids())
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'datasets': len(datasets),
+                'models': models,
+                'total_bytes': sum(size for _, size, _ in datasets),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _count(self, stored):
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return stored
+
+    @staticmethod
+    def _path(directory, name):
+        if not name or os.sep in name or name.startswith('.'):
+            raise ValueError("id dataset/model tidak valid.")
+        return os.path.join(directory, name)
+
+    def _read_model(self, model_id):
+        try:
+            path = self._path(self._models_dir, model_id + '.json')
+            with open(path, encoding='utf-8') as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def _model_data_ids(self):
+        """Dict path file model -> data_id"""
+        data_ids = {}
+        try:
+            names = os.listdir(self._models_dir)
+        except FileNotFoundError:
+            return {}
+        for name in names:
+            if name.startswith('.'):
+                continue
+            model = self._read_model(name[:-len('.json')])
+            if model is not None:
+                data_ids[os.path.join(self._models_dir, name)] = model['data_id']
+        return data_ids
+
+    def _open(self, data_id):
+        try:
+            path = self._path(self._datasets_dir, data_id)
+        except ValueError:
+            return None
+        meta_path = os.path.join(path, 'meta.json')
+        try:
+            with open(meta_path, encoding='utf-8') as handle:
+                meta = json.load(handle)
+            X = np.load(os.path.join(path, 'X.npy'), mmap_mode='r', allow_pickle=False)
+            X_scaled = np.load(os.path.join(path, 'X_scaled.npy'), mmap_mode='r',
+                               allow_pickle=False)
+            if 'labels' in meta:
+                y = np.asarray(meta.pop('labels'), dtype=object)
+            else:
+                y = np.load(os.path.join(path, 'y.npy'), mmap_mode='r', allow_pickle=False)
+        except (OSError, ValueError):
+            # Tidak ada, sedang dihapus worker lain, atau file rusak: dianggap miss
+            return None
+        try:
+            # mtime meta.json dipakai sebagai waktu akses terakhir untuk eviction
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return StoredDataset(data_id, X, X_scaled, y, meta)
+
+    def _datasets(self):
+        """List (path, size, mtime) folder dataset"""
+        datasets = []
+        try:
+            names = os.listdir(self._datasets_dir)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            if name.startswith('.'):
+                continue
+            path = os.path.join(self._datasets_dir, name)
+            try:
+                mtime = os.stat(os.path.join(path, 'meta.json')).st_mtime
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+            except OSError:
+                continue
+            datasets.append((path, size, mtime))
+        return datasets
+
+    def _prune(self, keep):
+        # Folder di-scan ulang karena worker lain juga menulis ke folder yang sama
+        datasets = self._datasets()
+        total = sum(size for _, size, _ in datasets)
+        evicted = set()
+        for path, size, _ in sorted(datasets, key=lambda item: item[2]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            if self._remove_dir(path):
+                total -= size
+                evicted.add(os.path.basename(path))
+                with self._lock:
+                    self.evictions += 1
+        if evicted:
+            # File model yang datasetnya sudah dihapus tidak bisa dipakai lagi
+            for model_path, data_id in self._model_data_ids().items():
+                if data_id in evicted:
+                    try:
+                        os.unlink(model_path)
+                    except OSError:
+                        pass
+
+    def _remove_dir(self, path):
+        # Rename dulu agar dataset hilang secara atomik bagi worker lain
+        trash = os.path.join(self._datasets_dir, f'.trash-{uuid.uuid4().hex}')
+        try:
+            os.rename(path, trash)
+        except FileNotFoundError:
+            return False
+        shutil.rmtree(trash, ignore_errors=True)
+        return True
+
+
+def default_dataset_store():
+    """DatasetStore dari KNN_DATASET_DIR, atau None jika tidak diatur"""
+    directory = os.environ.get('KNN_DATASET_DIR')
+    return DatasetStore(directory) if directory else None
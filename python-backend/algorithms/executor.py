@@ -0,0 +1,253 @@
+"""
+Process pool bersama untuk pekerjaan CPU-bound (fold cross-validation, sweep K).
+
+Pool dibuat sekali per proses saat pertama dibutuhkan lalu dipakai ulang oleh semua
+request. Data training dikirim ke worker lewat shared memory sehingga tidak
+di-pickle ulang untuk setiap task. Hasil selalu dikembalikan dalam urutan task,
+jadi penggabungan skor deterministik dan sama dengan eksekusi serial.
+
+Jumlah worker diatur lewat KNN_PARALLEL_WORKERS (default: jumlah core yang
+tersedia). Nilai 1 menjalankan semua task inline tanpa process pool.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+
+# Di bawah jumlah sampel ini overhead dispatch lebih besar dari manfaat paralel
+PARALLEL_MIN_SAMPLES = int(os.environ.get('KNN_PARALLEL_MIN_SAMPLES', 2000))
+
+# Ukuran minimum potongan query per task
+MIN_CHUNK_ROWS = 256
+
+
+def available_cores():
+    """Jumlah core yang boleh dipakai proses ini (menghormati CPU affinity)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _default_workers():
+    return int(os.environ.get('KNN_PARALLEL_WORKERS', available_cores()))
+
+
+def _init_worker():
+    # Satu thread BLAS/OpenMP per worker agar total thread tidak melebihi jumlah core
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+
+
+def _warm_worker():
+    # Import modul berat di worker sekali saat warm-up
+    import sklearn.neighbors  # noqa: F401
+    return os.getpid()
+
+
+class SharedArray:
+    """Handle picklable untuk numpy array di shared memory"""
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+
+def _call_with_shared(fn, args):
+    # Dijalankan di worker: SharedArray di-attach menjadi array tanpa salinan
+    segments = []
+    resolved = []
+    for arg in args:
+        if isinstance(arg, SharedArray):
+            segment = SharedMemory(name=arg.name)
+            segments.append(segment)
+            resolved.append(np.ndarray(arg.shape, dtype=arg.dtype, buffer=segment.buf))
+        else:
+            resolved.append(arg)
+    try:
+        return fn(*resolved)
+    finally:
+        # View harus dilepas sebelum segment ditutup
+        del resolved
+        for segment in segments:
+            segment.close()
+
+
+class ParallelExecutor:
+    """
+    Process pool yang dipakai ulang antar request
+
+    Args:
+        max_workers: Jumlah proses worker (default: KNN_PARALLEL_WORKERS atau jumlah core)
+        min_samples: Jumlah sampel minimum agar pekerjaan dikirim ke pool
+    """
+
+    def __init__(self, max_workers=None, min_samples=PARALLEL_MIN_SAMPLES):
+        self.max_workers = max(1, int(max_workers or _default_workers()))
+        self.min_samples = min_samples
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def parallel(self):
+        """True jika executor memakai process pool"""
+        return self.max_workers > 1
+
+    def should_parallelize(self, n_samples):
+        """Apakah dataset dengan n_samples baris layak diproses paralel"""
+        return self.parallel and n_samples >= self.min_samples
+
+    def chunk_count(self, n_rows):
+        """
+        Jumlah potongan query maksimum untuk n_rows baris
+
+        Returns:
+            int: Paling banyak max_workers, dengan minimal MIN_CHUNK_ROWS baris per potongan
+        """
+        if not self.parallel:
+            return 1
+        return max(1, min(self.max_workers, n_rows // MIN_CHUNK_ROWS))
+
+    def _get_pool(self):
+        with self._lock:
+            # Pool tidak diwariskan lewat fork (misalnya worker gunicorn dengan preload)
+            if self._pool is None or self._pool_pid != os.getpid():
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    'forkserver' if 'forkserver' in methods else 'spawn'
+                )
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def map(self, fn, tasks, progress=None):
+        """
+        Jalankan fn(*args) untuk setiap args di tasks
+
+        Args:
+            fn: Fungsi top-level (harus bisa di-pickle)
+            tasks: List tuple argumen; boleh berisi SharedArray dari share()
+            progress: Callback opsional progress(done, total), dipanggil setiap kali
+                satu task selesai (urutan selesai, bukan urutan task). Jika callback
+                melempar exception, task yang belum berjalan dibatalkan dan
+                exception diteruskan.
+
+        Returns:
+            list: Hasil dalam urutan yang sama dengan tasks
+        """
+        tasks = list(tasks)
+        if not self.parallel or len(tasks) <= 1:
+            results = []
+            for args in tasks:
+                results.append(fn(*args))
+                if progress is not None:
+                    progress(len(results), len(tasks))
+            return results
+
+        pool = self._get_pool()
+        futures = []
+        try:
+            futures = [pool.submit(_call_with_shared, fn, args) for args in tasks]
+            position = {future: index for index, future in enumerate(futures)}
+            results = [None] * len(tasks)
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[position[future]] = future.result()
+                if progress is not None:
+                    progress(done, len(tasks))
+            return results
+        except BrokenProcessPool:
+            # Worker mati (misalnya OOM): buang pool agar request berikutnya membuat baru
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+        except BaseException:
+            # Error atau pembatalan: task yang masih antri tidak perlu dijalankan
+            for future in futures:
+                future.cancel()
+            raise
+
+    def warm_up(self):
+        """Jalankan semua worker sekarang agar request pertama tidak membayar start-up"""
+        if self.parallel:
+            self.map(_warm_worker, [()] * self.max_workers)
+
+    @contextmanager
+    def share(self, *arrays):
+        """
+        Salin array ke shared memory selama blok with
+
+        Yields:
+            tuple: SharedArray untuk setiap array, atau array aslinya jika
+                executor berjalan inline
+        """
+        if not self.parallel:
+            yield arrays
+            return
+
+        segments = []
+        handles = []
+        try:
+            for array in arrays:
+                array = np.ascontiguousarray(array)
+                segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+                segments.append(segment)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+                handles.append(SharedArray(segment.name, array.shape, array.dtype))
+            yield tuple(handles)
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    def shutdown(self):
+        """Hentikan process pool (dibuat ulang otomatis saat dibutuhkan)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._pool_pid == os.getpid():
+            pool.shutdown(wait=True)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """ParallelExecutor bersama untuk proses ini"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ParallelExecutor()
+        return _executor
+
+
+def configure_executor(max_workers=None, min_samples=PARALLEL_MIN_SAMPLES):
+    """
+    Ganti executor bersama, misalnya untuk membatasi worker per proses gunicorn
+
+    Returns:
+        ParallelExecutor: Executor baru
+    """
+    global _executor
+    with _executor_lock:
+        previous, _executor = _executor, ParallelExecutor(max_workers, min_samples)
+    if previous is not None:
+        previous.shutdown()
+    return _executor
+
+
+def split_rows(indices, n_chunks):
+    """Bagi array indeks menjadi n_chunks potongan berurutan"""
+    return [chunk for chunk in np.array_split(indices, n_chunks) if len(chunk)]
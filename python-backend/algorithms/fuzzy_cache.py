@@ -0,0 +1,140 @@
+"""
+Cache FuzzyLogicSystem yang sudah di-build.
+Rule base yang sama tidak perlu membangun ulang ControlSystem dan
+ControlSystemSimulation; request berikutnya cukup set input dan compute.
+
+Selain jumlah system, cache dibatasi total byte DecisionSurface yang disimpan
+system (FUZZY_CACHE_MAX_SURFACE_BYTES). Surface dibangun setelah system masuk
+cache, jadi batas ini diperiksa ulang setiap get_or_build().
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from .fuzzy_logic import DEFAULT_OUTPUT, build_fuzzy_system
+from .instrumentation import stage
+
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get('FUZZY_CACHE_MAX_ENTRIES', 128))
+
+# Default 64 MiB untuk semua decision surface di cache
+DEFAULT_MAX_SURFACE_BYTES = int(os.environ.get('FUZZY_CACHE_MAX_SURFACE_BYTES', 64 * 1024 * 1024))
+
+
+def fuzzy_system_key(criteria, rules, output=None, defuzz_method='centroid', engine='skfuzzy',
+                     analytic=False):
+    """
+    Hash kanonik dari definisi fuzzy system
+
+    Args:
+        criteria: List konfigurasi input
+        rules: List rule definitions
+        output: Konfigurasi output (default: DEFAULT_OUTPUT)
+        defuzz_method: Metode defuzzifikasi
+        engine: Engine inference ('skfuzzy' atau 'numpy')
+        analytic: Fuzzifikasi dan centroid analitik (hanya engine 'numpy')
+
+    Returns:
+        str: Hex digest SHA-256
+    """
+    definition = {
+        'criteria': criteria,
+        'rules': rules,
+        'output': output or DEFAULT_OUTPUT,
+        'defuzz_method': defuzz_method,
+        'engine': engine,
+        'analytic': bool(analytic)
+    }
+    # sort_keys membuat urutan key dict tidak berpengaruh; tuple dan list
+    # sama-sama menjadi array JSON
+    canonical = json.dumps(definition, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class FuzzySystemCache:
+    """LRU cache untuk FuzzyLogicSystem yang sudah di-build, dengan hit/miss counter"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_surface_bytes=DEFAULT_MAX_SURFACE_BYTES):
+        """
+        Args:
+            max_entries: Jumlah maksimum system yang disimpan
+            max_surface_bytes: Batas total byte decision surface milik system di cache
+        """
+        self.max_entries = max_entries
+        self.max_surface_bytes = max_surface_bytes
+        self._systems = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, criteria, rules, output=None, defuzz_method='centroid', engine='skfuzzy',
+                     analytic=False):
+        """
+        Ambil system dari cache, atau build dan simpan jika belum ada
+
+        Returns:
+            tuple: (FuzzyLogicSystem, cached)
+        """
+        key = fuzzy_system_key(criteria, rules, output, defuzz_method, engine, analytic)
+
+        with self._lock:
+            fuzzy_sys = self._systems.get(key)
+            if fuzzy_sys is not None:
+                self._systems.move_to_end(key)
+                self.hits += 1
+                self._evict()
+                return fuzzy_sys, True
+            self.misses += 1
+
+        # Build di luar lock; jika dua request membangun system yang sama
+        # bersamaan, yang terakhir disimpan
+        with stage('fuzzy_build'):
+            fuzzy_sys = build_fuzzy_system(criteria, rules, output, defuzz_method, engine, analytic)
+
+        with self._lock:
+            self._systems[key] = fuzzy_sys
+            self._systems.move_to_end(key)
+            self._evict()
+
+        return fuzzy_sys, False
+
+    def clear(self):
+        """Kosongkan cache"""
+        with self._lock:
+            self._systems.clear()
+
+    def stats(self):
+        """Statistik cache (jumlah system, byte decision surface, hit/miss, eviction)"""
+        with self._lock:
+            return {
+                'systems': len(self._systems),
+                'max_entries': self.max_entries,
+                'surface_bytes': self._surface_bytes(),
+                'max_surface_bytes': self.max_surface_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _evict(self):
+        # Dipanggil dengan lock; system yang baru dipakai (paling akhir) tidak di-evict
+        while len(self._systems) > self.max_entries:
+            self._systems.popitem(last=False)
+            self.evictions += 1
+        surface_bytes = self._surface_bytes()
+        while surface_bytes > self.max_surface_bytes and len(self._systems) > 1:
+            _, evicted = self._systems.popitem(last=False)
+            surface_bytes -= evicted.surface_nbytes
+            self.evictions += 1
+
+    def _surface_bytes(self):
+        return sum(fuzzy_sys.surface_nbytes for fuzzy_sys in self._systems.values())
+
+
+# Cache default yang dipakai oleh Flask app
+fuzzy_system_cache = FuzzySystemCache()
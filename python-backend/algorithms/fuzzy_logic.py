@@ -3,10 +3,60 @@ Implementasi Fuzzy Logic untuk decision making dan klasifikasi.
 Menggunakan scikit-fuzzy untuk fuzzy inference system.
 """
 
+import threading
+from collections import OrderedDict
+
 import numpy as np
-import skfuzzy as fuzz
 from skfuzzy import control as ctrl
 
+from .fuzzy_numpy import MamdaniEngine, membership_function
+from .fuzzy_surface import MAX_SURFACES, DecisionSurface, grid_points
+
+
+# Output default yang dipakai endpoint /api/fuzzy/inference
+DEFAULT_OUTPUT = {
+    'name': 'hasil',
+    'range': (0, 100),
+    'memberships': {
+        'rendah': ['trimf', [0, 0, 50]],
+        'sedang': ['trimf', [25, 50, 75]],
+        'tinggi': ['trimf', [50, 100, 100]]
+    }
+}
+
+
+def make_universe(universe_range, resolution=None, num_points=None):
+    """
+    Buat universe of discourse untuk sebuah variabel fuzzy
+    
+    Args:
+        universe_range: Tuple (min, max)
+        resolution: Jarak antar titik (opsional)
+        num_points: Jumlah titik, termasuk min dan max (opsional)
+        
+    Returns:
+        numpy.ndarray: Universe. Tanpa resolution/num_points, langkah 1
+            seperti sebelumnya.
+    """
+    low, high = universe_range[0], universe_range[1]
+    
+    if num_points is not None:
+        if num_points < 2:
+            raise ValueError("num_points minimal 2.")
+        return np.linspace(low, high, int(num_points))
+    
+    if resolution is not None:
+        if resolution <= 0:
+            raise ValueError("resolution harus lebih besar dari 0.")
+        n_steps = int(np.floor((high - low) / resolution + 1e-9))
+        universe = low + resolution * np.arange(n_steps + 1)
+        # Pastikan batas atas selalu ikut
+        if universe[-1] < high:
+            universe = np.append(universe, high)
+        return universe
+    
+    return np.arange(low, high + 1, 1)
+
 
 class FuzzyLogicSystem:
     """
@@ -15,17 +65,50 @@ class FuzzyLogicSystem:
     - Fuzzy rules engine
     - Defuzzification
     - Multi-criteria decision making
+    - Engine skfuzzy.control atau evaluator NumPy tervektorisasi
     """
     
-    def __init__(self):
-        """Initialize Fuzzy Logic System"""
+    ENGINES = ('skfuzzy', 'numpy')
+    
+    def __init__(self, engine='skfuzzy', analytic=False):
+        """
+        Initialize Fuzzy Logic System
+        
+        Args:
+            engine: 'skfuzzy' - ControlSystemSimulation dari skfuzzy.control
+                    'numpy'   - MamdaniEngine, evaluasi array untuk N sampel sekaligus
+            analytic: Hanya untuk engine 'numpy'. Membership input dihitung langsung
+                dari parameter fungsi, dan centroid output trimf/trapmf dihitung dari
+                geometri poligon, sehingga hasil tidak bergantung pada resolusi universe.
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine harus salah satu dari {self.ENGINES}")
+        if analytic and engine != 'numpy':
+            raise ValueError("analytic hanya tersedia untuk engine='numpy'.")
+        
+        self.engine = engine
+        self.analytic = analytic
+        self.membership_definitions = {}
         self.inputs = {}
         self.output = None
         self.rules = []
         self.control_system = None
         self.simulation = None
+        self.batch_simulation = None
+        self.numpy_engine = None
+        self._rule_definitions = []
+        self._used_output_terms = set()
+        # ControlSystemSimulation menyimpan state, jadi compute() diserialisasi
+        # agar system yang di-cache aman dipakai bersama antar thread
+        self._compute_lock = threading.Lock()
+        # DecisionSurface per konfigurasi grid (LRU, maksimal MAX_SURFACES), dibuat
+        # saat pertama diminta
+        self._surfaces = OrderedDict()
+        self._surface_lock = threading.Lock()
+        self._array_engine = None
         
-    def add_input(self, name, universe_range, membership_functions):
+    def add_input(self, name, universe_range, membership_functions, resolution=None,
+                  num_points=None):
         """
         Tambah input variable dengan membership functions
         
@@ -35,24 +118,25 @@ class FuzzyLogicSystem:
             membership_functions: Dict {label: [type, params]}
                 Contoh: {'rendah': ['trimf', [0, 0, 50]], 
                          'sedang': ['trimf', [0, 50, 100]]}
+            resolution: Jarak antar titik universe (default: 1)
+            num_points: Jumlah titik universe, alternatif dari resolution
         """
         # Buat Antecedent
-        universe = np.arange(universe_range[0], universe_range[1] + 1, 1)
+        universe = make_universe(universe_range, resolution, num_points)
         antecedent = ctrl.Antecedent(universe, name)
         
         # Tambah membership functions
         for label, (func_type, params) in membership_functions.items():
-            if func_type == 'trimf':
-                antecedent[label] = fuzz.trimf(universe, params)
-            elif func_type == 'trapmf':
-                antecedent[label] = fuzz.trapmf(universe, params)
-            elif func_type == 'gaussmf':
-                antecedent[label] = fuzz.gaussmf(universe, params[0], params[1])
+            values = membership_function(universe, func_type, params)
+            if values is not None:
+                antecedent[label] = values
         
         self.inputs[name] = antecedent
+        self.membership_definitions[name] = membership_functions
         return antecedent
         
-    def add_output(self, name, universe_range, membership_functions, defuzz_method='centroid'):
+    def add_output(self, name, universe_range, membership_functions, defuzz_method='centroid',
+                   resolution=None, num_points=None):
         """
         Tambah output variable dengan membership functions
         
@@ -61,21 +145,21 @@ class FuzzyLogicSystem:
             universe_range: Tuple (min, max)
             membership_functions: Dict {label: [type, params]}
             defuzz_method: Metode defuzzifikasi ('centroid', 'bisector', 'mom', 'som', 'lom')
+            resolution: Jarak antar titik universe (default: 1)
+            num_points: Jumlah titik universe, alternatif dari resolution
         """
         # Buat Consequent
-        universe = np.arange(universe_range[0], universe_range[1] + 1, 1)
-        consequent = ctrl.Consequent(universe, name, defuzz_method=defuzz_method)
+        universe = make_universe(universe_range, resolution, num_points)
+        consequent = ctrl.Consequent(universe, name, defuzzify_method=defuzz_method)
         
         # Tambah membership functions
         for label, (func_type, params) in membership_functions.items():
-            if func_type == 'trimf':
-                consequent[label] = fuzz.trimf(universe, params)
-            elif func_type == 'trapmf':
-                consequent[label] = fuzz.trapmf(universe, params)
-            elif func_type == 'gaussmf':
-                consequent[label] = fuzz.gaussmf(universe, params[0], params[1])
+            values = membership_function(universe, func_type, params)
+            if values is not None:
+                consequent[label] = values
         
         self.output = consequent
+        self.membership_definitions[name] = membership_functions
         return consequent
         
     def add_rule(self, rule_definition):
@@ -116,6 +200,8 @@ class FuzzyLogicSystem:
         # Buat rule
         rule = ctrl.Rule(antecedent_combined, self.output[consequent[1]])
         self.rules.append(rule)
+        self._rule_definitions.append((antecedents, consequent[1], operator))
+        self._used_output_terms.add(consequent[1])
         
         return rule
         
@@ -124,8 +210,33 @@ class FuzzyLogicSystem:
         if not self.rules:
             raise ValueError("Belum ada rules. Tambahkan rules dengan add_rule().")
         
+        if self.engine == 'numpy':
+            self.numpy_engine = self._make_numpy_engine(analytic=self.analytic)
+            return
+        
         self.control_system = ctrl.ControlSystem(self.rules)
         self.simulation = ctrl.ControlSystemSimulation(self.control_system)
+        self.batch_simulation = None
+        self._array_engine = None
+    
+    def _make_numpy_engine(self, analytic=False):
+        return MamdaniEngine(
+            [
+                (name, antecedent.universe,
+                 {label: term.mf for label, term in antecedent.terms.items()})
+                for name, antecedent in self.inputs.items()
+            ],
+            (self.output.label, self.output.universe,
+             {label: term.mf for label, term in self.output.terms.items()}),
+            self._rule_definitions,
+            defuzz_method=self.output.defuzzify_method,
+            shapes=self.membership_definitions if analytic else None
+        )
+    
+    @property
+    def is_built(self):
+        """True jika build_system() sudah dipanggil"""
+        return self.simulation is not None or self.numpy_engine is not None
         
     def compute(self, inputs):
         """
@@ -138,26 +249,201 @@ class FuzzyLogicSystem:
         Returns:
             dict: Hasil perhitungan
         """
-        if self.simulation is None:
+        if not self.is_built:
             raise ValueError("System belum dibangun. Panggil build_system() terlebih dahulu.")
         
-        # Set input values
-        for var_name, value in inputs.items():
-            if var_name in self.inputs:
-                self.simulation.input[var_name] = value
-        
-        # Compute
-        self.simulation.compute()
+        # System bisa dipakai ulang, jadi input dari perhitungan sebelumnya
+        # tidak boleh terbawa
+        for var_name in self.inputs:
+            if var_name not in inputs:
+                raise ValueError(f"Input untuk '{var_name}' belum diberikan.")
         
-        # Get output
         output_name = self.output.label
-        output_value = self.simulation.output[output_name]
+        
+        if self.numpy_engine is not None:
+            output_value = self.numpy_engine.evaluate(
+                {var_name: [inputs[var_name]] for var_name in self.inputs}
+            )[0]
+            if np.isnan(output_value):
+                raise ValueError("Crisp output cannot be calculated, likely because the "
+                                 "system is too sparse.")
+            return {
+                'output_value': float(output_value),
+                'output_name': output_name,
+                'inputs': inputs
+            }
+        
+        with self._compute_lock:
+            # Set input values
+            for var_name, value in inputs.items():
+                if var_name in self.inputs:
+                    self.simulation.input[var_name] = value
+            
+            # Compute
+            self.simulation.compute()
+            
+            # Get output
+            output_value = self.simulation.output[output_name]
         
         return {
             'output_value': float(output_value),
             'output_name': output_name,
             'inputs': inputs
         }
+    
+    def decision_surface(self, points=None):
+        """
+        DecisionSurface untuk system ini (lihat algorithms/fuzzy_surface.py)
+        
+        Grid dievaluasi sekali per konfigurasi titik, lalu dipakai ulang selama
+        system ini ada di cache. Hanya MAX_SURFACES konfigurasi terakhir yang disimpan.
+        
+        Args:
+            points: Titik grid per input (int, list per input, atau None untuk default)
+            
+        Returns:
+            DecisionSurface
+        """
+        if not self.is_built:
+            raise ValueError("System belum dibangun. Panggil build_system() terlebih dahulu.")
+        
+        key = grid_points(points, len(self.inputs))
+        with self._surface_lock:
+            surface = self._surfaces.get(key)
+            if surface is None:
+                surface = DecisionSurface(self, key)
+                self._surfaces[key] = surface
+                while len(self._surfaces) > MAX_SURFACES:
+                    self._surfaces.popitem(last=False)
+            self._surfaces.move_to_end(key)
+        return surface
+    
+    @property
+    def surface_nbytes(self):
+        """Total ukuran DecisionSurface yang disimpan system ini"""
+        # Tanpa lock agar tidak menunggu surface yang sedang dibangun
+        return sum(surface.nbytes for surface in tuple(self._surfaces.values()))
+    
+    def evaluate_array(self, columns):
+        """
+        Evaluasi banyak titik sekaligus dengan MamdaniEngine NumPy
+        
+        Untuk engine 'skfuzzy' dipakai MamdaniEngine dari definisi yang sama
+        (hasil sama dengan skfuzzy, selisih < 1e-9), sehingga grid decision surface
+        tidak dievaluasi lewat ControlSystemSimulation yang lambat.
+        
+        Args:
+            columns: Dict kolom {variable_name: array}
+            
+        Returns:
+            numpy.ndarray: Nilai output, NaN jika tidak ada rule yang aktif
+        """
+        if not self.is_built:
+            raise ValueError("System belum dibangun. Panggil build_system() terlebih dahulu.")
+        
+        engine = self.numpy_engine
+        if engine is None:
+            # Dibuat sekali tanpa lock (dipanggil saat _surface_lock dipegang);
+            # jika dua thread membuatnya bersamaan hasilnya sama
+            if self._array_engine is None:
+                self._array_engine = self._make_numpy_engine()
+            engine = self._array_engine
+        columns = {name: np.asarray(columns[name], dtype=float) for name in self.inputs}
+        if not len(next(iter(columns.values()))):
+            return np.empty(0)
+        return np.asarray(engine.evaluate(columns), dtype=float)
+    
+    def compute_batch(self, rows):
+        """
+        Hitung fuzzy inference untuk banyak baris input sekaligus
+        
+        Args:
+            rows: List of dict [{variable_name: value}, ...] atau dict kolom
+                {variable_name: [value, ...]}
+                
+        Returns:
+            dict: Hasil perhitungan kolumnar. Baris yang tidak menghasilkan output
+                (misalnya tidak ada rule yang aktif) bernilai None.
+        """
+        if not self.is_built:
+            raise ValueError("System belum dibangun. Panggil build_system() terlebih dahulu.")
+        
+        columns = self._batch_columns(rows)
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        output_name = self.output.label
+        
+        if self.numpy_engine is not None:
+            output_values = self.numpy_engine.evaluate(columns) if n_rows else np.empty(0)
+            return {
+                'output_name': output_name,
+                'output_values': [None if np.isnan(v) else float(v) for v in output_values],
+                'total': n_rows
+            }
+        
+        with self._compute_lock:
+            # Simulation terpisah, karena mode array skfuzzy mematikan cache
+            # hasil pada simulation yang dipakai compute()
+            if self.batch_simulation is None:
+                self.batch_simulation = ctrl.ControlSystemSimulation(self.control_system)
+            
+            output_values = None
+            if n_rows and self._array_inputs_supported():
+                try:
+                    for var_name, values in columns.items():
+                        self.batch_simulation.input[var_name] = values
+                    self.batch_simulation.compute()
+                    output_values = np.asarray(
+                        self.batch_simulation.output[output_name], dtype=float
+                    ).reshape(n_rows)
+                except (ValueError, AssertionError):
+                    # Ada baris tanpa rule aktif, hitung per baris
+                    self.batch_simulation = ctrl.ControlSystemSimulation(self.control_system)
+            
+            if output_values is None:
+                output_values = self._compute_rows(columns, n_rows)
+        
+        return {
+            'output_name': output_name,
+            'output_values': [None if np.isnan(v) else float(v) for v in output_values],
+            'total': n_rows
+        }
+    
+    def _batch_columns(self, rows):
+        if isinstance(rows, dict):
+            columns = {name: rows.get(name) for name in self.inputs}
+        else:
+            columns = {name: [row.get(name) for row in rows] for name in self.inputs}
+        
+        lengths = set()
+        for var_name, values in columns.items():
+            if values is None or any(v is None for v in values):
+                raise ValueError(f"Input untuk '{var_name}' belum diberikan.")
+            columns[var_name] = np.asarray(values, dtype=float)
+            lengths.add(len(values))
+        
+        if len(lengths) > 1:
+            raise ValueError("Semua kolom input harus sama panjang.")
+        
+        return columns
+    
+    def _array_inputs_supported(self):
+        # skfuzzy 0.4.x gagal pada mode array jika ada term output tanpa rule
+        return set(self.output.terms) <= self._used_output_terms
+    
+    def _compute_rows(self, columns, n_rows):
+        output_name = self.output.label
+        output_values = np.full(n_rows, np.nan)
+        
+        for i in range(n_rows):
+            for var_name, values in columns.items():
+                self.batch_simulation.input[var_name] = values[i]
+            try:
+                self.batch_simulation.compute()
+                output_values[i] = self.batch_simulation.output[output_name]
+            except (ValueError, AssertionError):
+                continue
+        
+        return output_values
 
 
 def create_decision_system(criteria_config, rules_config):
@@ -199,13 +485,9 @@ def create_decision_system(criteria_config, rules_config):
     output_config = criteria_config[-1] if criteria_config else None
     if output_config:
         fuzzy_sys.add_output(
-            'hasil',
-            (0, 100),
-            {
-                'rendah': ['trimf', [0, 0, 50]],
-                'sedang': ['trimf', [25, 50, 75]],
-                'tinggi': ['trimf', [50, 100, 100]]
-            }
+            DEFAULT_OUTPUT['name'],
+            DEFAULT_OUTPUT['range'],
+            DEFAULT_OUTPUT['memberships']
         )
     
     # Add rules
@@ -218,47 +500,118 @@ def create_decision_system(criteria_config, rules_config):
     return fuzzy_sys
 
 
-def simple_fuzzy_inference(input_values, weights=None):
+def build_fuzzy_system(criteria, rules, output=None, defuzz_method='centroid', engine='skfuzzy',
+                       analytic=False):
     """
-    Simplified fuzzy inference untuk quick calculations
+    Bangun FuzzyLogicSystem lengkap dari konfigurasi request API
     
     Args:
-        input_values: List of nilai input
-        weights: List of bobot (optional)
+        criteria: List of dict {'name', 'range', 'memberships'} untuk input,
+            dengan 'resolution' atau 'num_points' opsional
+        rules: List of rule definitions (lihat FuzzyLogicSystem.add_rule)
+        output: Dict {'name', 'range', 'memberships'} untuk output
+            (default: DEFAULT_OUTPUT), dengan 'resolution' atau 'num_points' opsional
+        defuzz_method: Metode defuzzifikasi
+        engine: 'skfuzzy' atau 'numpy'
+        analytic: Membership dan centroid analitik (hanya engine 'numpy')
         
     Returns:
-        dict: Hasil agregasi fuzzy
+        FuzzyLogicSystem: System yang sudah di-build
     """
-    input_values = np.array(input_values)
+    output = output or DEFAULT_OUTPUT
+    fuzzy_sys = FuzzyLogicSystem(engine=engine, analytic=analytic)
     
+    for criterion in criteria:
+        fuzzy_sys.add_input(
+            criterion['name'],
+            tuple(criterion['range']),
+            criterion['memberships'],
+            resolution=criterion.get('resolution'),
+            num_points=criterion.get('num_points')
+        )
+    
+    fuzzy_sys.add_output(
+        output['name'],
+        tuple(output['range']),
+        output['memberships'],
+        defuzz_method=defuzz_method,
+        resolution=output.get('resolution'),
+        num_points=output.get('num_points')
+    )
+    
+    for rule in rules:
+        fuzzy_sys.add_rule(rule)
+    
+    fuzzy_sys.build_system()
+    
+    return fuzzy_sys
+
+
+def _normalize_weights(weights, n_criteria):
+    """
+    Sesuaikan panjang bobot dengan jumlah kriteria lalu normalisasi (jumlah = 1)
+
+    Args:
+        weights: List of bobot atau None
+        n_criteria: Jumlah kriteria
+
+    Returns:
+        numpy.ndarray: Bobot ternormalisasi dengan panjang n_criteria
+    """
     if weights is None:
-        weights = np.ones(len(input_values)) / len(input_values)
-    else:
-        weights = np.array(weights)
-        
+        return np.ones(n_criteria) / n_criteria
+
+    weights = np.asarray(weights, dtype=np.float64)
+
     # Pastikan input_values dan weights punya panjang sama
-    if len(weights) != len(input_values):
-        if len(weights) > len(input_values):
-            weights = weights[:len(input_values)]
+    if len(weights) != n_criteria:
+        if len(weights) > n_criteria:
+            weights = weights[:n_criteria]
         else:
-            padding = np.ones(len(input_values) - len(weights)) * (1.0 / len(input_values))
+            padding = np.ones(n_criteria - len(weights)) * (1.0 / n_criteria)
             weights = np.concatenate([weights, padding])
-            
+
     # Normalisasi weights (mencegah DivByZero)
     total_weight = np.sum(weights)
     if total_weight == 0:
-        weights = np.ones(len(input_values)) / len(input_values)
-    else:
-        weights = weights / total_weight
+        return np.ones(n_criteria) / n_criteria
+    return weights / total_weight
+
+
+# Urutan kategori juga menentukan pemenang saat membership sama besar
+SIMPLE_CATEGORIES = ('rendah', 'sedang', 'tinggi')
+
+
+def _simple_memberships(weighted_result):
+    """Membership rendah/sedang/tinggi untuk satu nilai atau array nilai agregasi"""
+    return {
+        'rendah': np.clip((50 - weighted_result) / 50, 0, 1),
+        'sedang': np.clip(1 - np.abs(weighted_result - 50) / 25, 0, 1),
+        'tinggi': np.clip((weighted_result - 50) / 50, 0, 1)
+    }
+
+
+def simple_fuzzy_inference(input_values, weights=None):
+    """
+    Simplified fuzzy inference untuk quick calculations
+    
+    Args:
+        input_values: List of nilai input
+        weights: List of bobot (optional)
+        
+    Returns:
+        dict: Hasil agregasi fuzzy
+    """
+    input_values = np.array(input_values)
+    weights = _normalize_weights(weights, len(input_values))
     
     # Weighted average (simplified fuzzy aggregation)
     weighted_result = np.sum(input_values * weights)
     
     # Membership degrees
     memberships = {
-        'rendah': float(max(0, min(1, (50 - weighted_result) / 50))),
-        'sedang': float(max(0, min(1, 1 - abs(weighted_result - 50) / 25))),
-        'tinggi': float(max(0, min(1, (weighted_result - 50) / 50)))
+        label: float(degree)
+        for label, degree in _simple_memberships(weighted_result).items()
     }
     
     # Defuzzification (max membership)
@@ -270,3 +623,39 @@ def simple_fuzzy_inference(input_values, weights=None):
         'memberships': memberships,
         'weights_used': weights.tolist()
     }
+
+
+def simple_fuzzy_inference_batch(input_matrix, weights=None):
+    """
+    Versi matriks dari simple_fuzzy_inference untuk banyak alternatif sekaligus
+
+    Bobot dinormalisasi satu kali, semua nilai agregasi dihitung dengan satu
+    perkalian matriks-vektor, lalu membership dan kategori diturunkan dengan
+    operasi array.
+
+    Args:
+        input_matrix: Array (n_items, n_criteria) nilai input
+        weights: List of bobot untuk setiap kriteria (optional)
+
+    Returns:
+        dict: Hasil kolom {'values', 'categories', 'memberships', 'weights_used', 'total'}
+    """
+    input_matrix = np.asarray(input_matrix, dtype=np.float64)
+    if input_matrix.ndim != 2:
+        raise ValueError("input_values harus berupa matriks (n_items x n_criteria).")
+
+    weights = _normalize_weights(weights, input_matrix.shape[1])
+    weighted_results = input_matrix @ weights
+
+    memberships = _simple_memberships(weighted_results)
+    # argmax mengambil kategori pertama saat seri, sama dengan max() di versi skalar
+    stacked = np.vstack([memberships[label] for label in SIMPLE_CATEGORIES])
+    categories = np.asarray(SIMPLE_CATEGORIES)[np.argmax(stacked, axis=0)]
+
+    return {
+        'values': weighted_results.tolist(),
+        'categories': categories.tolist(),
+        'memberships': {label: degrees.tolist() for label, degrees in memberships.items()},
+        'weights_used': weights.tolist(),
+        'total': len(weighted_results)
+    }
@@ -0,0 +1,373 @@
+"""
+Mamdani inference engine berbasis NumPy.
+Definisi input, output dan rules dikompilasi menjadi array padat sehingga
+fuzzifikasi, evaluasi rule, agregasi dan defuzzifikasi dihitung sekaligus
+untuk N sampel, tanpa graph dan bookkeeping skfuzzy.control.
+"""
+
+import numpy as np
+import skfuzzy as fuzz
+
+
+DEFUZZ_METHODS = ('centroid', 'bisector', 'mom', 'som', 'lom')
+
+# Membership function yang berbentuk poligon (piecewise-linear)
+PIECEWISE_LINEAR = ('trimf', 'trapmf')
+
+# Batas jumlah titik (sampel x titik universe) yang diproses per chunk
+_CHUNK_POINTS = 2_000_000
+
+
+def membership_function(x, func_type, params):
+    """
+    Hitung nilai membership function pada titik-titik x
+
+    Args:
+        x: Array titik
+        func_type: 'trimf', 'trapmf' atau 'gaussmf'
+        params: Parameter fungsi ([a, b, c], [a, b, c, d] atau [mean, sigma])
+
+    Returns:
+        numpy.ndarray atau None jika tipe fungsi tidak dikenal
+    """
+    x = np.asarray(x, dtype=float)
+    if func_type == 'trimf':
+        return fuzz.trimf(x, params)
+    elif func_type == 'trapmf':
+        return fuzz.trapmf(x, params)
+    elif func_type == 'gaussmf':
+        return fuzz.gaussmf(x, params[0], params[1])
+    return None
+
+
+def _polygon_vertices(func_type, params):
+    """Titik sudut poligon trimf/trapmf: (xs, ys)"""
+    if func_type == 'trimf':
+        return np.asarray(params, dtype=float), np.array([0.0, 1.0, 0.0])
+    return np.asarray(params, dtype=float), np.array([0.0, 1.0, 1.0, 0.0])
+
+
+def _right_limit(x, xs, ys):
+    # np.interp memakai titik duplikat paling kanan, jadi nilai pada
+    # diskontinuitas (mis. shoulder [0, 0, 50]) adalah limit dari kanan
+    return np.interp(x, xs, ys)
+
+
+def _left_limit(x, xs, ys):
+    return np.interp(-x, -xs[::-1], ys[::-1])
+
+
+class MamdaniEngine:
+    """
+    Evaluator Mamdani (min/max) yang mengikuti perilaku skfuzzy.control:
+    - input di-clip ke batas universe, membership dihitung dengan interpolasi linear
+    - AND = min, OR = max, akumulasi antar rule = max
+    - universe output ditambah titik potong setiap term dengan level aktivasinya
+      sebelum defuzzifikasi, seperti CrispValueCalculator.find_memberships
+    """
+
+    def __init__(self, inputs, output, rules, defuzz_method='centroid', shapes=None):
+        """
+        Args:
+            inputs: List of (name, universe, {label: mf_array})
+            output: Tuple (name, universe, {label: mf_array})
+            rules: List of (antecedents, consequent_label, operator), dengan
+                antecedents berupa list of (input_name, label)
+            defuzz_method: Metode defuzzifikasi
+            shapes: Opsional {variable_name: {label: [func_type, params]}}. Jika
+                diberikan, membership input dihitung langsung dari fungsinya dan
+                centroid output trimf/trapmf dihitung dari geometri poligon
+                tanpa sampling universe.
+        """
+        if defuzz_method not in DEFUZZ_METHODS:
+            raise ValueError(f"defuzz_method harus salah satu dari {DEFUZZ_METHODS}")
+        if not rules:
+            raise ValueError("Belum ada rules. Tambahkan rules dengan add_rule().")
+
+        self.defuzz_method = defuzz_method
+        self.input_names = [name for name, _, _ in inputs]
+
+        # Membership matrix per input: (n_terms, n_universe)
+        self._input_universes = []
+        self._input_mfs = []
+        term_index = {}
+        offset = 0
+        for name, universe, memberships in inputs:
+            labels = list(memberships)
+            self._input_universes.append(np.asarray(universe, dtype=float))
+            self._input_mfs.append(np.vstack([memberships[label] for label in labels]).astype(float))
+            for position, label in enumerate(labels):
+                term_index[(name, label)] = offset + position
+            offset += len(labels)
+        self._n_input_terms = offset
+
+        self.output_name, output_universe, output_memberships = output
+        self.output_labels = list(output_memberships)
+        self._output_universe = np.asarray(output_universe, dtype=float)
+        self._output_mfs = np.vstack(
+            [output_memberships[label] for label in self.output_labels]
+        ).astype(float)
+
+        # Bentuk analitik: fungsi membership input dan poligon term output
+        self._input_shapes = None
+        self._output_polygons = None
+        if shapes is not None:
+            self._input_shapes = [
+                [tuple(shapes[name][label]) for label in memberships]
+                for name, _, memberships in inputs
+            ]
+            output_shapes = [shapes[self.output_name][label] for label in self.output_labels]
+            if defuzz_method == 'centroid' and all(
+                func_type in PIECEWISE_LINEAR for func_type, _ in output_shapes
+            ):
+                self._output_polygons = [
+                    _polygon_vertices(func_type, params) for func_type, params in output_shapes
+                ]
+
+        # Rule antecedent index matrix (n_rules, max_antecedents), padding -1
+        antecedent_lists = []
+        for antecedents, _, _ in rules:
+            indices = [term_index[(var_name, label)] for var_name, label in antecedents
+                       if (var_name, label) in term_index]
+            if not indices:
+                raise ValueError("Rule harus memiliki minimal satu antecedent yang valid.")
+            antecedent_lists.append(indices)
+
+        width = max(len(indices) for indices in antecedent_lists)
+        self._rule_antecedents = np.full((len(rules), width), -1, dtype=np.intp)
+        for r, indices in enumerate(antecedent_lists):
+            self._rule_antecedents[r, :len(indices)] = indices
+        self._rule_is_and = np.array([operator == 'AND' for _, _, operator in rules])
+        self._rule_consequents = np.array(
+            [self.output_labels.index(label) for _, label, _ in rules], dtype=np.intp
+        )
+
+    def evaluate(self, columns):
+        """
+        Evaluasi N sampel sekaligus
+
+        Args:
+            columns: Dict {input_name: array nilai (N,)}
+
+        Returns:
+            numpy.ndarray: Output crisp (N,), NaN untuk sampel tanpa rule aktif
+        """
+        values = [np.atleast_1d(np.asarray(columns[name], dtype=float)) for name in self.input_names]
+        n_samples = len(values[0]) if values else 0
+        outputs = np.empty(n_samples)
+
+        if self._output_polygons is not None:
+            n_terms = len(self.output_labels)
+            n_points = (6 * n_terms + 2) * (1 + n_terms * (n_terms - 1) // 2)
+        else:
+            n_points = len(self._output_universe) * (len(self.output_labels) + 1)
+        chunk = max(1, _CHUNK_POINTS // max(n_points, 1))
+        for start in range(0, n_samples, chunk):
+            stop = min(start + chunk, n_samples)
+            cuts = self.activations([v[start:stop] for v in values])
+            if self._output_polygons is not None:
+                outputs[start:stop] = self._analytic_centroid(cuts)
+            else:
+                outputs[start:stop] = self._defuzzify(cuts)
+
+        return outputs
+
+    def activations(self, values):
+        """
+        Level aktivasi setiap term output (N, n_output_terms)
+
+        Args:
+            values: List array nilai input, urut sesuai input_names
+        """
+        n_samples = len(values[0])
+
+        # Fuzzifikasi: (N, total_input_terms)
+        memberships = np.empty((n_samples, self._n_input_terms))
+        column = 0
+        for position, (universe, mfs, value) in enumerate(
+                zip(self._input_universes, self._input_mfs, values)):
+            value = np.clip(value, universe.min(), universe.max())
+            if self._input_shapes is not None:
+                for func_type, params in self._input_shapes[position]:
+                    memberships[:, column] = membership_function(value, func_type, params)
+                    column += 1
+            else:
+                for mf in mfs:
+                    memberships[:, column] = np.interp(value, universe, mf)
+                    column += 1
+
+        # Firing strength: gather (N, n_rules, max_antecedents), padding diisi
+        # elemen netral (1 untuk min/AND, 0 untuk max/OR)
+        gathered = memberships[:, self._rule_antecedents]
+        padding = self._rule_antecedents < 0
+        neutral = np.where(self._rule_is_and, 1.0, 0.0)[:, None]
+        gathered = np.where(padding, np.broadcast_to(neutral, padding.shape), gathered)
+        firing = np.where(self._rule_is_and, gathered.min(axis=2), gathered.max(axis=2))
+
+        # Akumulasi per term output dengan max
+        cuts = np.zeros((n_samples, len(self.output_labels)))
+        for term in range(len(self.output_labels)):
+            rules = self._rule_consequents == term
+            if rules.any():
+                cuts[:, term] = firing[:, rules].max(axis=1)
+
+        return cuts
+
+    def _upsampled_memberships(self, cuts):
+        """
+        Universe output yang ditambah titik potong term dengan level cut-nya.
+
+        Returns:
+            tuple: (points (N, P), output_mf (N, P), valid (N, P)), titik terurut
+                naik; titik duplikat ditandai valid=False
+        """
+        x = self._output_universe
+        mfs = self._output_mfs
+        n_samples = len(cuts)
+        n_segments = len(x) - 1
+        n_terms = len(mfs)
+
+        if n_segments == 0:
+            points = np.broadcast_to(x, (n_samples, 1)).copy()
+        else:
+            # Setiap segmen [x_i, x_i+1) berisi x_i dan maksimal satu titik potong per term
+            segment_points = np.full((n_samples, n_segments, n_terms + 1), np.nan)
+            segment_points[:, :, 0] = x[:-1]
+            dx = np.diff(x)
+            for term, mf in enumerate(mfs):
+                level = cuts[:, term][:, None]
+                above = mf[None, :] >= level
+                crossing = above[:, :-1] != above[:, 1:]
+                dmf = np.diff(mf)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    position = x[:-1] + (level - mf[:-1]) * dx / dmf
+                inside = crossing & (level > 0) & (position > x[:-1]) & (position < x[1:])
+                segment_points[:, :, term + 1] = np.where(inside, position, np.nan)
+
+            segment_points.sort(axis=2)
+            # NaN (tidak ada titik potong) diganti titik akhir segmen: lebar nol
+            segment_points = np.where(np.isnan(segment_points), x[1:][None, :, None], segment_points)
+            points = np.concatenate(
+                [segment_points.reshape(n_samples, -1), np.full((n_samples, 1), x[-1])], axis=1
+            )
+
+        output_mf = np.zeros(points.shape)
+        for term, mf in enumerate(mfs):
+            clipped = np.minimum(cuts[:, term][:, None], np.interp(points, x, mf))
+            np.maximum(output_mf, clipped, out=output_mf)
+
+        valid = np.ones(points.shape, dtype=bool)
+        valid[:, 1:] = points[:, 1:] != points[:, :-1]
+        return points, output_mf, valid
+
+    def _defuzzify(self, cuts):
+        points, mf, valid = self._upsampled_memberships(cuts)
+        method = self.defuzz_method
+
+        if method in ('mom', 'som', 'lom'):
+            peak = np.where(valid, mf, -np.inf).max(axis=1, keepdims=True)
+            at_peak = valid & (mf == peak)
+            if method == 'som':
+                return np.where(at_peak, points, np.inf).min(axis=1)
+            if method == 'lom':
+                return np.where(at_peak, points, -np.inf).max(axis=1)
+            return (np.where(at_peak, points, 0.0).sum(axis=1) / at_peak.sum(axis=1))
+
+        x1, x2 = points[:, :-1], points[:, 1:]
+        y1, y2 = mf[:, :-1], mf[:, 1:]
+        width = x2 - x1
+        area = 0.5 * width * (y1 + y2)
+        total_area = area.sum(axis=1)
+        empty = mf.sum(axis=1) == 0
+
+        if method == 'centroid':
+            # Momen trapesium linear: integral x*f(x) pada [x1, x2]
+            moment = width * (x1 * (2 * y1 + y2) + x2 * (y1 + 2 * y2)) / 6.0
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = moment.sum(axis=1) / np.fmax(total_area, np.finfo(float).eps)
+            return np.where(empty, np.nan, result)
+
+        # Bisector: cari segmen yang membagi luas menjadi dua, lalu selesaikan
+        # posisi di dalam segmen tersebut
+        accumulated = np.cumsum(area, axis=1)
+        half = total_area / 2.0
+        index = np.argmax(accumulated >= half[:, None], axis=1)
+        rows = np.arange(len(points))
+        before = np.where(index > 0, accumulated[rows, index - 1], 0.0)
+        subarea = half - before
+
+        sx1, sx2 = x1[rows, index], x2[rows, index]
+        sy1, sy2 = y1[rows, index], y2[rows, index]
+        span = sx2 - sx1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (sy2 - sy1) / span
+            flat = sx1 + subarea / sy1
+            rising = sx1 + np.sqrt(2.0 * subarea * span / sy2)
+            falling = sx2 - np.sqrt(span * span - 2.0 * subarea * span / sy1)
+            general = sx1 - (sy1 - np.sqrt(sy1 * sy1 + 2.0 * slope * subarea)) / slope
+        result = np.select(
+            [sy1 == sy2, (sy1 == 0) & (sy2 != 0), (sy2 == 0) & (sy1 != 0)],
+            [flat, rising, falling],
+            general
+        )
+        return np.where(empty, np.nan, result)
+
+    def _analytic_centroid(self, cuts):
+        """
+        Centroid eksak dari agregasi term trimf/trapmf yang di-clip.
+
+        Agregasi max(min(cut, mf)) adalah fungsi piecewise-linear. Titik patahnya
+        adalah sudut poligon, titik potong setiap term dengan level cut-nya, dan
+        perpotongan antar term. Di antara titik-titik tersebut fungsi linear,
+        sehingga luas dan momen dihitung eksak dengan rumus trapesium.
+        """
+        low = self._output_universe.min()
+        high = self._output_universe.max()
+        polygons = self._output_polygons
+        n_samples = len(cuts)
+
+        # Titik patah: batas universe, sudut poligon, dan titik potong level cut
+        fixed = np.concatenate([[low, high]] + [xs for xs, _ in polygons])
+        cut_points = []
+        for term, (xs, _) in enumerate(polygons):
+            level = cuts[:, term]
+            cut_points.append(xs[0] + level * (xs[1] - xs[0]))
+            cut_points.append(xs[-1] - level * (xs[-1] - xs[-2]))
+        breakpoints = np.concatenate(
+            [np.broadcast_to(fixed, (n_samples, len(fixed))), np.column_stack(cut_points)], axis=1
+        )
+        breakpoints = np.sort(np.clip(breakpoints, low, high), axis=1)
+
+        def clipped(x, term, limit):
+            xs, ys = polygons[term]
+            return np.minimum(cuts[:, term][:, None], limit(x, xs, ys))
+
+        # Tambahkan perpotongan antar term di dalam setiap interval
+        x1, x2 = breakpoints[:, :-1], breakpoints[:, 1:]
+        start_values = [clipped(x1, term, _right_limit) for term in range(len(polygons))]
+        end_values = [clipped(x2, term, _left_limit) for term in range(len(polygons))]
+        extra = [x1]
+        for i in range(len(polygons)):
+            for j in range(i + 1, len(polygons)):
+                g1 = start_values[i] - start_values[j]
+                g2 = end_values[i] - end_values[j]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    position = x1 + g1 / (g1 - g2) * (x2 - x1)
+                extra.append(np.where(g1 * g2 < 0, position, np.nan))
+
+        segment_points = np.sort(np.stack(extra, axis=2), axis=2)
+        segment_points = np.where(np.isnan(segment_points), x2[:, :, None], segment_points)
+        points = np.concatenate(
+            [segment_points.reshape(n_samples, -1), breakpoints[:, -1:]], axis=1
+        )
+
+        # Nilai agregasi di ujung kiri (limit kanan) dan ujung kanan (limit kiri)
+        p1, p2 = points[:, :-1], points[:, 1:]
+        y1 = np.max([clipped(p1, term, _right_limit) for term in range(len(polygons))], axis=0)
+        y2 = np.max([clipped(p2, term, _left_limit) for term in range(len(polygons))], axis=0)
+
+        width = p2 - p1
+        area = (0.5 * width * (y1 + y2)).sum(axis=1)
+        moment = (width * (p1 * (2 * y1 + y2) + p2 * (y1 + 2 * y2)) / 6.0).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(area > 0, moment / area, np.nan)
@@ -0,0 +1,274 @@
+"""
+Decision surface untuk fuzzy system berdimensi rendah.
+
+FuzzyLogicSystem dievaluasi sekali pada grid reguler di atas universe setiap input,
+dan hasilnya disimpan sebagai array padat berbentuk (n_1, ..., n_d). Query berikutnya
+dijawab dengan interpolasi multilinear dari 2^d titik grid di sekitar input, bukan
+inference Mamdani penuh.
+
+Grid dan titik validasi dievaluasi dengan MamdaniEngine NumPy
+(FuzzyLogicSystem.evaluate_array), juga untuk system engine 'skfuzzy', karena
+ControlSystemSimulation terlalu lambat untuk ribuan titik. Total titik grid dibatasi
+MAX_GRID_POINTS dan setiap system menyimpan paling banyak MAX_SURFACES surface.
+
+Akurasi dilaporkan sebagai max_error: selisih absolut terbesar antara interpolasi
+dan inference exact pada titik validasi (pusat sel grid, tempat error interpolasi
+multilinear umumnya terbesar). Input di luar grid dan sel yang salah satu sudutnya
+tidak menghasilkan output (tidak ada rule aktif) dihitung dengan compute() exact.
+"""
+
+import itertools
+import os
+from bisect import bisect_right
+
+import numpy as np
+
+
+# Jumlah titik grid per input jika tidak ditentukan request
+DEFAULT_POINTS = int(os.environ.get('FUZZY_SURFACE_POINTS', 33))
+
+# Batas total titik grid (hasil kali titik per input), membatasi waktu build dan memori.
+# Grid dibangun sinkron di dalam request; 40000 cukup untuk 33 titik pada tiga input.
+MAX_GRID_POINTS = int(os.environ.get('FUZZY_SURFACE_MAX_POINTS', 40000))
+
+# Jumlah maksimum surface (konfigurasi grid) yang disimpan per system
+MAX_SURFACES = int(os.environ.get('FUZZY_SURFACE_MAX_PER_SYSTEM', 2))
+
+# Jumlah maksimum pusat sel yang dipakai untuk mengukur max_error
+VALIDATION_POINTS = int(os.environ.get('FUZZY_SURFACE_VALIDATION_POINTS', 4096))
+
+
+def grid_points(points, n_inputs):
+    """
+    Normalisasi jumlah titik grid per input
+
+    Args:
+        points: None (DEFAULT_POINTS), int untuk semua input, atau list per input
+
+    Returns:
+        tuple: Jumlah titik untuk setiap input
+
+    Raises:
+        ValueError: Jika jumlah titik < 2 atau total grid melebihi MAX_GRID_POINTS
+    """
+    if points is None:
+        points = DEFAULT_POINTS
+    if isinstance(points, (list, tuple)):
+        if len(points) != n_inputs:
+            raise ValueError(f"points harus berisi {n_inputs} nilai (satu per input).")
+        points = tuple(int(p) for p in points)
+    else:
+        points = (int(points),) * n_inputs
+
+    if any(p < 2 for p in points):
+        raise ValueError("points minimal 2 per input.")
+    total = int(np.prod(points, dtype=np.int64))
+    if total > MAX_GRID_POINTS:
+        raise ValueError(
+            f"Grid {'x'.join(map(str, points))} ({total} titik) melebihi batas "
+            f"{MAX_GRID_POINTS}; decision surface hanya untuk rule base berdimensi rendah."
+        )
+    return points
+
+
+def surface_from_option(fuzzy_sys, option):
+    """
+    DecisionSurface sesuai opsi "surface" di request API, atau None jika tidak dipakai
+
+    Args:
+        fuzzy_sys: FuzzyLogicSystem yang sudah di-build
+        option: None/False (nonaktif), True (grid default), jumlah titik per input
+            (angka atau list), atau {"points": ...}
+
+    Raises:
+        ValueError: Jika konfigurasi grid tidak valid atau terlalu besar
+    """
+    if option is None or option is False:
+        return None
+    if isinstance(option, dict):
+        points = option.get('points')
+    elif option is True:
+        points = None
+    else:
+        points = option
+    return fuzzy_sys.decision_surface(points)
+
+
+class DecisionSurface:
+    """Output fuzzy system pada grid reguler dengan interpolasi multilinear"""
+
+    def __init__(self, fuzzy_sys, points=None, validation_points=VALIDATION_POINTS, seed=0):
+        """
+        Evaluasi fuzzy system pada seluruh titik grid
+
+        Args:
+            fuzzy_sys: FuzzyLogicSystem yang sudah di-build
+            points: Titik grid per input (lihat grid_points)
+            validation_points: Jumlah pusat sel untuk mengukur max_error
+            seed: Seed pemilihan pusat sel jika jumlahnya melebihi validation_points
+        """
+        self.fuzzy_sys = fuzzy_sys
+        self.names = list(fuzzy_sys.inputs)
+        self.output_name = fuzzy_sys.output.label
+        self.points = grid_points(points, len(self.names))
+        self.axes = [
+            np.linspace(float(np.min(universe)), float(np.max(universe)), n)
+            for universe, n in zip(
+                (fuzzy_sys.inputs[name].universe for name in self.names), self.points
+            )
+        ]
+
+        mesh = np.meshgrid(*self.axes, indexing='ij')
+        columns = {name: grid.ravel() for name, grid in zip(self.names, mesh)}
+        self.values = fuzzy_sys.evaluate_array(columns).reshape(self.points)
+        self._corners = list(itertools.product((0, 1), repeat=len(self.names)))
+        self._axis_lists = [axis.tolist() for axis in self.axes]
+
+        self.max_error, self.validation_points = self._validate(validation_points, seed)
+
+    @property
+    def nbytes(self):
+        """Ukuran array surface"""
+        return int(self.values.nbytes + sum(axis.nbytes for axis in self.axes))
+
+    def describe(self):
+        """Ringkasan surface untuk response API"""
+        return {
+            'points': list(self.points),
+            'max_error': self.max_error,
+            'validation_points': self.validation_points
+        }
+
+    def interpolate(self, X):
+        """
+        Interpolasi multilinear untuk banyak titik
+
+        Args:
+            X: Array (n_rows, n_inputs) dengan urutan kolom self.names
+
+        Returns:
+            numpy.ndarray: Nilai output; NaN untuk titik di luar grid atau di sel
+                yang salah satu sudutnya tidak punya output
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, len(self.names))
+        lower = []
+        fractions = []
+        outside = np.zeros(len(X), dtype=bool)
+        for j, axis in enumerate(self.axes):
+            x = X[:, j]
+            outside |= (x < axis[0]) | (x > axis[-1]) | np.isnan(x)
+            i = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, len(axis) - 2)
+            lower.append(i)
+            fractions.append((x - axis[i]) / (axis[i + 1] - axis[i]))
+
+        result = np.zeros(len(X))
+        for corner in self._corners:
+            weight = np.ones(len(X))
+            for j, c in enumerate(corner):
+                weight *= fractions[j] if c else 1.0 - fractions[j]
+            result += weight * self.values[tuple(lower[j] + c for j, c in enumerate(corner))]
+        result[outside] = np.nan
+        return result
+
+    def interpolate_point(self, point):
+        """
+        Interpolasi satu titik tanpa overhead array (jalur compute())
+
+        Returns:
+            float: Nilai output, NaN jika di luar grid atau sel tanpa output
+        """
+        lower = []
+        fractions = []
+        for x, axis in zip(point, self._axis_lists):
+            if not axis[0] <= x <= axis[-1]:
+                return float('nan')
+            i = min(bisect_right(axis, x) - 1, len(axis) - 2)
+            lower.append(i)
+            fractions.append((x - axis[i]) / (axis[i + 1] - axis[i]))
+
+        total = 0.0
+        for corner in self._corners:
+            weight = 1.0
+            for c, t in zip(corner, fractions):
+                weight *= t if c else 1.0 - t
+            total += weight * self.values[tuple(i + c for i, c in zip(lower, corner))]
+        return float(total)
+
+    def compute(self, inputs):
+        """
+        Setara FuzzyLogicSystem.compute(), dijawab dari surface jika bisa
+
+        Returns:
+            dict: Hasil seperti compute() ditambah 'surface' (describe() dan
+                'exact_fallback')
+        """
+        for name in self.names:
+            if name not in inputs:
+                raise ValueError(f"Input untuk '{name}' belum diberikan.")
+
+        value = self.interpolate_point([float(inputs[name]) for name in self.names])
+        if np.isnan(value):
+            result = self.fuzzy_sys.compute(inputs)
+            fallback = True
+        else:
+            result = {
+                'output_value': float(value),
+                'output_name': self.output_name,
+                'inputs': inputs
+            }
+            fallback = False
+        result['surface'] = dict(self.describe(), exact_fallback=fallback)
+        return result
+
+    def compute_batch(self, rows):
+        """
+        Setara FuzzyLogicSystem.compute_batch(), dijawab dari surface jika bisa
+
+        Returns:
+            dict: Hasil seperti compute_batch() ditambah 'surface' (describe() dan
+                'exact_fallbacks', jumlah baris yang dihitung exact)
+        """
+        columns = self.fuzzy_sys._batch_columns(rows)
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        X = np.column_stack([columns[name] for name in self.names]) if n_rows \
+            else np.empty((0, len(self.names)))
+        values = self.interpolate(X)
+
+        missing = np.flatnonzero(np.isnan(values))
+        if len(missing):
+            exact = self.fuzzy_sys.compute_batch(
+                {name: columns[name][missing] for name in self.names}
+            )['output_values']
+            values[missing] = [np.nan if v is None else v for v in exact]
+
+        return {
+            'output_name': self.output_name,
+            'output_values': [None if np.isnan(v) else float(v) for v in values],
+            'total': n_rows,
+            'surface': dict(self.describe(), exact_fallbacks=int(len(missing)))
+        }
+
+    def _validate(self, validation_points, seed):
+        # Error diukur di pusat sel; sel dengan sudut tanpa output dilewati
+        centers = [(axis[:-1] + axis[1:]) / 2 for axis in self.axes]
+        n_cells = int(np.prod([len(c) for c in centers], dtype=np.int64))
+        if n_cells > validation_points:
+            rng = np.random.default_rng(seed)
+            cells = np.unravel_index(rng.choice(n_cells, validation_points, replace=False),
+                                     [len(c) for c in centers])
+        else:
+            cells = np.unravel_index(np.arange(n_cells), [len(c) for c in centers])
+        X = np.column_stack([c[i] for c, i in zip(centers, cells)])
+
+        approx = self.interpolate(X)
+        keep = ~np.isnan(approx)
+        if not keep.any():
+            return None, 0
+        exact = self.fuzzy_sys.evaluate_array(
+            {name: X[keep, j] for j, name in enumerate(self.names)}
+        )
+        errors = np.abs(approx[keep] - exact)
+        errors = errors[~np.isnan(errors)]
+        if not len(errors):
+            return None, 0
+        return float(errors.max()), int(len(errors))
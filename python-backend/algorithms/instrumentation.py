@@ -0,0 +1,401 @@
+"""
+Instrumentasi latency per stage (JSON decode, fit, query, build, ...) untuk /api/metrics.
+
+Stage timer mengumpulkan waktu ke collector milik request yang sedang berjalan
+(contextvar), lalu saat response selesai total per stage dimasukkan ke histogram
+(endpoint, stage). Stage yang berjalan di luar request (misalnya cross-validation
+async) dicatat dengan endpoint 'background'.
+
+Aktifkan dengan METRICS_ENABLED=1. Jika tidak aktif, stage() mengembalikan context
+manager kosong dan hook request tidak dipasang, sehingga overhead-nya diabaikan.
+
+Histogram dan counter disimpan per proses. Dengan METRICS_DIR, setiap proses menulis
+snapshot-nya ke METRICS_DIR/metrics-<pid>.json (paling sering sekali per
+METRICS_FLUSH_SECONDS dan saat proses selesai), dan render() menggabungkan semua file,
+sehingga satu scrape /api/metrics berisi total seluruh worker gunicorn. File worker
+yang sudah mati tetap dihitung agar counter tidak pernah turun; kosongkan folder saat
+server start (gunicorn.conf.py melakukannya di hook on_starting).
+"""
+
+import atexit
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Batas bucket histogram (detik), mengikuti default client Prometheus plus ekor panjang
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+BACKGROUND_ENDPOINT = 'background'
+
+# Jeda minimum antar penulisan snapshot ke METRICS_DIR
+FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 1.0))
+
+_NULL_STAGE = nullcontext()
+
+# Collector stage untuk request aktif: dict {stage: detik}
+_current_request = contextvars.ContextVar('rcount_metrics_request', default=None)
+
+
+class Histogram:
+    """Histogram kumulatif gaya Prometheus"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """List (le, jumlah kumulatif) termasuk +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((float('inf'), self.count))
+        return result
+
+
+class MetricsRegistry:
+    """Histogram latency per (endpoint, stage) dan counter request"""
+
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS, directory=None,
+                 flush_seconds=FLUSH_SECONDS):
+        """
+        Args:
+            enabled: Aktifkan pengukuran stage
+            buckets: Batas bucket histogram (detik)
+            directory: Folder snapshot bersama antar proses (None: hanya proses ini)
+            flush_seconds: Jeda minimum antar penulisan snapshot ke directory
+        """
+        self.enabled = enabled
+        self.buckets = buckets
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self._histograms = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._flush_timer = None
+        self._dirty = False
+        if directory:
+            atexit.register(self.flush)
+
+    def observe(self, endpoint, stage, seconds):
+        """Catat satu durasi untuk (endpoint, stage)"""
+        key = (endpoint, stage)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            self._dirty = True
+        if self.directory:
+            self._schedule_flush()
+
+    def observe_request(self, endpoint, status, total_seconds, stages):
+        """Catat satu request: durasi total, durasi per stage dan status code"""
+        with self._lock:
+            key = (endpoint, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+        self.observe(endpoint, 'total', total_seconds)
+        for stage_name, seconds in stages.items():
+            self.observe(endpoint, stage_name, seconds)
+
+    def reset(self):
+        """Hapus semua histogram dan counter"""
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+            self._dirty = True
+        if self.directory:
+            self.flush()
+
+    def snapshot(self):
+        """Salinan (histograms, requests) yang aman dibaca tanpa lock"""
+        with self._lock:
+            histograms = {
+                key: (histogram.cumulative(), histogram.sum, histogram.count)
+                for key, histogram in self._histograms.items()
+            }
+            return histograms, dict(self._requests)
+
+    def flush(self):
+        """Tulis snapshot proses ini ke directory (no-op tanpa directory atau perubahan)"""
+        if not self.directory:
+            return
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                state = {
+                    'buckets': list(self.buckets),
+                    'histograms': [
+                        [endpoint, stage_name, list(histogram.counts), histogram.sum,
+                         histogram.count]
+                        for (endpoint, stage_name), histogram in self._histograms.items()
+                    ],
+                    'requests': [[endpoint, status, count]
+                                 for (endpoint, status), count in self._requests.items()]
+                }
+            self._last_flush = time.monotonic()
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                path = os.path.join(self.directory, f'metrics-{os.getpid()}.json')
+                tmp_path = f'{path}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as handle:
+                    json.dump(state, handle)
+                os.replace(tmp_path, path)
+            except OSError:
+                # Metrics tidak boleh menggagalkan request; dicoba lagi pada flush berikutnya
+                with self._lock:
+                    self._dirty = True
+
+    def _schedule_flush(self):
+        # Flush langsung jika jeda sudah lewat, selain itu satu timer menulis sisanya
+        # agar worker yang menganggur tetap melaporkan request terakhirnya
+        wait = self._last_flush + self.flush_seconds - time.monotonic()
+        if wait <= 0:
+            self.flush()
+            return
+        with self._flush_lock:
+            if self._flush_timer is not None and self._flush_timer.is_alive():
+                return
+            timer = threading.Timer(wait, self.flush)
+            timer.daemon = True
+            self._flush_timer = timer
+        timer.start()
+
+    def aggregate(self):
+        """
+        Gabungan (histograms, requests) semua proses di directory
+
+        Tanpa directory, sama dengan snapshot() proses ini.
+        """
+        if not self.directory:
+            return self.snapshot()
+        self.flush()
+
+        counts, sums, requests = {}, {}, {}
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            try:
+                with open(path, encoding='utf-8') as handle:
+                    state = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            if tuple(state.get('buckets', ())) != tuple(self.buckets):
+                continue
+            for endpoint, stage_name, bucket_counts, total, count in state['histograms']:
+                key = (endpoint, stage_name)
+                merged = counts.setdefault(key, [0] * (len(self.buckets) + 1))
+                for i, value in enumerate(bucket_counts):
+                    merged[i] += value
+                merged[-1] += count
+                sums[key] = sums.get(key, 0.0) + total
+            for endpoint, status, count in state['requests']:
+                requests[(endpoint, status)] = requests.get((endpoint, status), 0) + count
+
+        if not counts and not requests:
+            # Folder belum berisi apa pun (misalnya tidak bisa ditulis)
+            return self.snapshot()
+
+        histograms = {}
+        for key, merged in counts.items():
+            histogram = Histogram(self.buckets)
+            histogram.counts = merged[:-1]
+            histogram.count = merged[-1]
+            histograms[key] = (histogram.cumulative(), sums[key], histogram.count)
+        return histograms, requests
+
+    def render(self, cache_stats=None):
+        """
+        Render metrics dalam format teks Prometheus (exposition format 0.0.4)
+
+        Histogram dan counter request adalah total semua proses jika directory
+        diatur; cache_stats tetap milik proses yang melayani scrape.
+
+        Args:
+            cache_stats: Dict {nama_cache: stats()} opsional, misalnya dari
+                ModelRegistry.stats() dan FuzzySystemCache.stats()
+
+        Returns:
+            str: Teks metrics
+        """
+        histograms, requests = self.aggregate()
+        lines = [
+            '# HELP rcount_stage_duration_seconds Durasi per stage per request (stage="total" '
+            'untuk seluruh request).',
+            '# TYPE rcount_stage_duration_seconds histogram',
+        ]
+        for (endpoint, stage_name), (buckets, total, count) in sorted(histograms.items()):
+            labels = f'endpoint="{_escape(endpoint)}",stage="{_escape(stage_name)}"'
+            for bound, cumulative in buckets:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'rcount_stage_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'rcount_stage_duration_seconds_sum{{{labels}}} {total!r}')
+            lines.append(f'rcount_stage_duration_seconds_count{{{labels}}} {count}')
+
+        lines += [
+            '# HELP rcount_requests_total Jumlah request per endpoint dan status code.',
+            '# TYPE rcount_requests_total counter',
+        ]
+        for (endpoint, status), count in sorted(requests.items()):
+            lines.append(
+                f'rcount_requests_total{{endpoint="{_escape(endpoint)}",status="{status}"}} {count}'
+            )
+
+        if cache_stats:
+            lines += _render_cache_stats(cache_stats)
+
+        lines.append(f'rcount_metrics_enabled {int(self.enabled)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _render_cache_stats(cache_stats):
+    counters = (
+        ('rcount_cache_hits_total', 'hits', 'Jumlah cache hit.'),
+        ('rcount_cache_misses_total', 'misses', 'Jumlah cache miss.'),
+        ('rcount_cache_evictions_total', 'evictions', 'Jumlah entry yang di-evict.'),
+    )
+    lines = []
+    for name, field, help_text in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for cache, stats in sorted(cache_stats.items()):
+            if field in stats:
+                lines.append(f'{name}{{cache="{_escape(cache)}"}} {stats[field]}')
+
+    lines += ['# HELP rcount_cache_entries Jumlah entry di cache.',
+              '# TYPE rcount_cache_entries gauge']
+    for cache, stats in sorted(cache_stats.items()):
+        if 'entries' in stats:
+            lines.append(f'rcount_cache_entries{{cache="{_escape(cache)}"}} {stats["entries"]}')
+    return lines
+
+
+# Registry default yang dipakai oleh Flask app dan modul algoritma
+metrics = MetricsRegistry(enabled=os.environ.get('METRICS_ENABLED', '0') == '1',
+                          directory=os.environ.get('METRICS_DIR') or None)
+
+
+class _StageTimer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def stage(name):
+    """
+    Context manager untuk mengukur satu stage
+
+        with stage('model_fit'):
+            model.fit(X, y)
+
+    Returns:
+        Context manager (no-op jika metrics tidak aktif)
+    """
+    if not metrics.enabled:
+        return _NULL_STAGE
+    return _StageTimer(name)
+
+
+def record_stage(name, seconds):
+    """Tambahkan durasi ke stage milik request aktif (atau langsung ke 'background')"""
+    collector = _current_request.get()
+    if collector is None:
+        metrics.observe(BACKGROUND_ENDPOINT, name, seconds)
+    else:
+        collector[name] = collector.get(name, 0.0) + seconds
+
+
+def timed_iter(iterable, name):
+    """
+    Bungkus iterator sehingga waktu di dalam next() dicatat sebagai satu stage
+
+    Berguna untuk generator bertahap seperti ekstraksi halaman PDF.
+    """
+    if not metrics.enabled:
+        return iterable
+    return _timed_iter(iterable, name)
+
+
+def _timed_iter(iterable, name):
+    iterator = iter(iterable)
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        record_stage(name, elapsed)
+
+
+def install_flask_hooks(app):
+    """
+    Pasang hook before/after request untuk mengukur setiap endpoint
+
+    Hook hanya dipasang jika metrics aktif. Response streaming (NDJSON) dicatat
+    saat response ditutup, sehingga ikut terukur sampai baris terakhir terkirim.
+    """
+    if not metrics.enabled:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_metrics():
+        g._metrics_collector = {}
+        g._metrics_start = time.perf_counter()
+        _current_request.set(g._metrics_collector)
+
+    @app.after_request
+    def _finish_request_metrics(response):
+        collector = g.get('_metrics_collector')
+        if collector is None:
+            return response
+        rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        start = g._metrics_start
+        status = response.status_code
+
+        def _observe():
+            metrics.observe_request(rule, status, time.perf_counter() - start, collector)
+            _current_request.set(None)
+
+        if response.is_streamed:
+            response.call_on_close(_observe)
+        else:
+            _observe()
+        return response
@@ -3,11 +3,93 @@ Implementasi algoritma K-Nearest Neighbors (KNN) untuk klasifikasi data.
 Menggunakan scikit-learn dengan kustomisasi untuk penelitian.
 """
 
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import cross_val_score
 
+from .ann import ANNKNeighborsClassifier
+from .executor import get_executor
+from .instrumentation import stage
+from .sharding import ShardedKNeighborsClassifier
+from .knn_sweep import (
+    neighbor_class_probabilities, neighbor_sweep_scores, parallel_cross_val_scores
+)
+
+
+# Mode perhitungan training metrics (cross-validation)
+METRICS_MODES = ('eager', 'lazy', 'async')
+
+# Backend pencarian tetangga: 'exact' (sklearn), 'ann' (index IVF aproksimasi)
+# atau 'sharded' (exact, data training dibagi ke beberapa proses shard)
+BACKENDS = ('exact', 'ann', 'sharded')
+
+# Field per prediksi yang bisa dipilih lewat fields=, dan layout hasil
+PREDICTION_FIELDS = ('prediction', 'confidence', 'probabilities', 'nearest_neighbors')
+PREDICTION_LAYOUTS = ('records', 'columnar')
+
+# Cache training metrics berdasarkan dataset fingerprint
+_METRICS_CACHE_SIZE = 1024
+_metrics_cache = OrderedDict()
+_metrics_cache_lock = threading.Lock()
+_metrics_cache_hits = 0
+_metrics_cache_misses = 0
+
+# Worker background untuk mode 'async', dibuat saat pertama dibutuhkan
+_metrics_executor = None
+_metrics_executor_lock = threading.Lock()
+
+
+class OperationCancelled(Exception):
+    """Dilempar oleh callback progress untuk menghentikan pekerjaan yang sedang berjalan"""
+
+
+def _get_metrics_executor():
+    global _metrics_executor
+    with _metrics_executor_lock:
+        if _metrics_executor is None:
+            _metrics_executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix='knn-metrics'
+            )
+        return _metrics_executor
+
+
+def _cached_metrics(fingerprint):
+    global _metrics_cache_hits, _metrics_cache_misses
+    with _metrics_cache_lock:
+        metrics = _metrics_cache.get(fingerprint)
+        if metrics is not None:
+            _metrics_cache.move_to_end(fingerprint)
+            _metrics_cache_hits += 1
+        else:
+            _metrics_cache_misses += 1
+        return metrics
+
+
+def training_metrics_cache_stats():
+    """Statistik cache training metrics (jumlah entry, hit/miss)"""
+    with _metrics_cache_lock:
+        return {
+            'entries': len(_metrics_cache),
+            'max_entries': _METRICS_CACHE_SIZE,
+            'hits': _metrics_cache_hits,
+            'misses': _metrics_cache_misses
+        }
+
+
+def _store_metrics(fingerprint, metrics):
+    with _metrics_cache_lock:
+        _metrics_cache[fingerprint] = metrics
+        _metrics_cache.move_to_end(fingerprint)
+        while len(_metrics_cache) > _METRICS_CACHE_SIZE:
+            _metrics_cache.popitem(last=False)
+
 
 class KNNAlgorithm:
     """
@@ -15,10 +97,13 @@ class KNNAlgorithm:
     - Dynamic K selection
     - Multiple distance metrics
     - Confidence scoring
-    - Cross-validation
+    - Cross-validation (eager, lazy, atau async)
+    - Backend exact atau approximate nearest neighbor
+    - Cross-validation dan pencarian K paralel di process pool bersama
     """
     
-    def __init__(self, k=3, metric='euclidean', weights='uniform'):
+    def __init__(self, k=3, metric='euclidean', weights='uniform', metrics_mode='eager',
+                 backend='exact', ann_params=None, n_shards=None, executor=None):
         """
         Initialize KNN algorithm
         
@@ -26,12 +111,40 @@ class KNNAlgorithm:
             k: Jumlah tetangga terdekat (default: 3)
             metric: Metrik jarak ('euclidean', 'manhattan', 'minkowski')
             weights: Bobot ('uniform' atau 'distance')
+            metrics_mode: Kapan cross-validation dijalankan
+                'eager' - di dalam train() (default)
+                'lazy'  - saat training_metrics pertama kali diakses
+                'async' - di background worker setelah train() selesai
+            backend: 'exact' (KNeighborsClassifier) atau 'ann' (index IVF,
+                lihat algorithms/ann.py) untuk training set besar
+            ann_params: Parameter ANNKNeighborsClassifier, misalnya
+                {'n_probe': 16, 'n_lists': 1024}
+            n_shards: Jumlah shard untuk backend 'sharded' (lihat
+                algorithms/sharding.py; default: KNN_SHARDS atau jumlah core)
+            executor: ParallelExecutor untuk fold dan nilai K (default:
+                executor bersama dari algorithms/executor.py)
         """
+        if metrics_mode not in METRICS_MODES:
+            raise ValueError(f"metrics_mode harus salah satu dari {METRICS_MODES}")
+        if backend not in BACKENDS:
+            raise ValueError(f"backend harus salah satu dari {BACKENDS}")
+        
         self.k = k
         self.metric = metric
         self.weights = weights
+        self.metrics_mode = metrics_mode
+        self.backend = backend
+        self.ann_params = dict(ann_params or {})
+        self.n_shards = n_shards
+        self.executor = executor
         self.model = None
         self.scaler = StandardScaler()
+        self.fingerprint = None
+        self._X_train_scaled = None
+        self._y_train = None
+        self._metrics = None
+        self._metrics_future = None
+        self._metrics_lock = threading.Lock()
         
     def train(self, X_train, y_train):
         """
@@ -42,29 +155,199 @@ class KNNAlgorithm:
             y_train: Label data (numpy array atau list)
             
         Returns:
-            dict: Training metrics
+            dict: Training metrics. Pada mode 'lazy' dan 'async', accuracy dan
+                std_dev bernilai None dengan status 'pending' sampai
+                cross-validation selesai (lihat get_training_metrics).
+        """
+        X_train, y_train, X_train_scaled = self.prepare(X_train, y_train)
+        return self.train_scaled(X_train_scaled, y_train, X_train=X_train)
+    
+    def prepare(self, X_train, y_train):
+        """
+        Konversi data training ke numpy array dan fit scaler, tanpa melatih model
+        
+        Returns:
+            tuple: (X_train, y_train, X_train_scaled)
         """
         # Convert ke numpy array
-        X_train = np.array(X_train)
-        y_train = np.array(y_train)
+        with stage('to_array'):
+            X_train = np.asarray(X_train)
+            y_train = np.asarray(y_train)
         
-        n_samples = len(X_train)
+        if len(X_train) == 0:
+            raise ValueError("Data training tidak boleh kosong.")
+        
+        # Normalisasi data
+        with stage('scaler_fit'):
+            X_train_scaled = self.scaler.fit_transform(X_train)
+        return X_train, y_train, X_train_scaled
+    
+    def train_scaled(self, X_train_scaled, y_train, X_train=None, fingerprint=None):
+        """
+        Latih model dari data yang sudah dinormalisasi dengan self.scaler
+        
+        Array dipakai apa adanya (tidak disalin), jadi array memory-mapped dari
+        DatasetStore tetap dibagi lewat page cache.
+        
+        Args:
+            X_train_scaled: Feature data hasil self.scaler
+            y_train: Label data
+            X_train: Feature data asli, untuk fingerprint pada mode lazy/async
+            fingerprint: Fingerprint dataset jika sudah diketahui (menggantikan X_train)
+            
+        Returns:
+            dict: Training metrics (lihat train)
+        """
+        n_samples = len(X_train_scaled)
         if n_samples == 0:
             raise ValueError("Data training tidak boleh kosong.")
             
         # Pastikan K tidak lebih besar dari jumlah sampel
         effective_k = min(self.k, n_samples)
         
-        # Normalisasi data
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        
         # Inisialisasi dan latih model
-        self.model = KNeighborsClassifier(
-            n_neighbors=effective_k,
-            metric=self.metric,
-            weights=self.weights
-        )
-        self.model.fit(X_train_scaled, y_train)
+        if self.backend == 'ann':
+            self.model = ANNKNeighborsClassifier(
+                n_neighbors=effective_k,
+                metric=self.metric,
+                weights=self.weights,
+                **self.ann_params
+            )
+        elif self.backend == 'sharded':
+            self.model = ShardedKNeighborsClassifier(
+                n_neighbors=effective_k,
+                metric=self.metric,
+                weights=self.weights,
+                n_shards=self.n_shards
+            )
+        else:
+            self.model = KNeighborsClassifier(
+                n_neighbors=effective_k,
+                metric=self.metric,
+                weights=self.weights
+            )
+        with stage('model_fit'):
+            self.model.fit(X_train_scaled, y_train)
+        if self.backend == 'sharded':
+            # Backend sharded memindahkan data ke file memory-mapped; versi itu yang
+            # disimpan agar worker tidak memegang salinan privat data training
+            X_train_scaled = self.model.training_data
+        
+        self._X_train_scaled = X_train_scaled
+        self._y_train = y_train
+        self._metrics = None
+        self._metrics_future = None
+        
+        if self.metrics_mode == 'eager':
+            self._metrics = self._compute_training_metrics()
+            return self._metrics
+        
+        # Mode lazy/async: cek cache berdasarkan fingerprint dataset
+        if fingerprint is None:
+            with stage('fingerprint'):
+                fingerprint = dataset_fingerprint(X_train, y_train, self.k, self.metric,
+                                                  self.weights, self.backend, self.ann_params)
+        self.fingerprint = fingerprint
+        cached = _cached_metrics(self.fingerprint)
+        if cached is not None:
+            self._metrics = cached
+            return cached
+        
+        if self.metrics_mode == 'async':
+            self.start_training_metrics()
+        
+        return self._pending_metrics()
+    
+    @property
+    def training_metrics(self):
+        """Training metrics, menunggu/menghitung cross-validation jika belum selesai"""
+        return self.get_training_metrics(wait=True)
+    
+    @property
+    def metrics_status(self):
+        """Status training metrics: 'ready', 'running', atau 'pending'"""
+        if self._metrics is not None:
+            return 'ready'
+        if self._metrics_future is not None:
+            return 'running'
+        return 'pending'
+    
+    def get_training_metrics(self, wait=False):
+        """
+        Ambil training metrics
+        
+        Args:
+            wait: Jika True, hitung (mode lazy) atau tunggu worker (mode async)
+                sampai metrics tersedia. Jika False, langsung kembali dengan
+                status 'pending' bila belum selesai.
+            
+        Returns:
+            dict: Training metrics
+        """
+        if self.model is None:
+            raise ValueError("Model belum dilatih. Panggil train() terlebih dahulu.")
+        
+        if self._metrics is not None:
+            return self._metrics
+        
+        if not wait:
+            return self._pending_metrics()
+        
+        future = self._metrics_future
+        if future is not None:
+            return future.result()
+        
+        return self._resolve_training_metrics()
+    
+    def start_training_metrics(self):
+        """Jalankan cross-validation di background worker jika belum berjalan"""
+        if self.model is None:
+            raise ValueError("Model belum dilatih. Panggil train() terlebih dahulu.")
+        
+        with self._metrics_lock:
+            if self._metrics is None and self._metrics_future is None:
+                self._metrics_future = _get_metrics_executor().submit(
+                    self._resolve_training_metrics
+                )
+    
+    def _resolve_training_metrics(self):
+        with self._metrics_lock:
+            if self._metrics is None:
+                metrics = self._compute_training_metrics()
+                if self.fingerprint is not None:
+                    _store_metrics(self.fingerprint, metrics)
+                self._metrics = metrics
+            return self._metrics
+    
+    def _get_executor(self):
+        return self.executor or get_executor()
+    
+    def _pending_metrics(self):
+        return {
+            'accuracy': None,
+            'std_dev': None,
+            'k': self.k,
+            'metric': self.metric,
+            'n_samples': len(self._X_train_scaled),
+            'status': self.metrics_status
+        }
+    
+    def _compute_training_metrics(self):
+        with stage('cross_validation'):
+            return self._cross_validate()
+    
+    def _cv_estimator(self):
+        # Backend sharded identik dengan exact; fold dilatih dengan KNeighborsClassifier
+        # agar setiap fold tidak menjalankan proses shard sendiri
+        if self.backend == 'sharded':
+            return KNeighborsClassifier(n_neighbors=self.model.n_neighbors,
+                                        metric=self.metric, weights=self.weights)
+        return self.model
+    
+    def _cross_validate(self):
+        X_train_scaled = self._X_train_scaled
+        y_train = self._y_train
+        n_samples = len(X_train_scaled)
         
         # Hitung accuracy dengan cross-validation (dinamis cv)
         try:
@@ -74,7 +357,14 @@ class KNNAlgorithm:
             unique_classes = len(np.unique(y_train))
             
             if cv_value >= 2 and unique_classes >= 2:
-                cv_scores = cross_val_score(self.model, X_train_scaled, y_train, cv=cv_value)
+                executor = self._get_executor()
+                estimator = self._cv_estimator()
+                if executor.should_parallelize(n_samples):
+                    cv_scores = parallel_cross_val_scores(
+                        [estimator], X_train_scaled, y_train, cv_value, executor
+                    )[0]
+                else:
+                    cv_scores = cross_val_score(estimator, X_train_scaled, y_train, cv=cv_value)
                 accuracy = float(np.mean(cv_scores))
                 std_dev = float(np.std(cv_scores))
             else:
@@ -91,58 +381,54 @@ class KNNAlgorithm:
             'std_dev': std_dev,
             'k': self.k,
             'metric': self.metric,
-            'n_samples': len(X_train)
+            'n_samples': n_samples
         }
     
-    def predict(self, X_test):
+    def predict(self, X_test, fused=True, fields=None, layout='records'):
         """
         Prediksi label untuk data test
         
         Args:
             X_test: Feature data untuk prediksi
+            fused: True untuk menurunkan label, probabilitas dan tetangga dari satu
+                   kali kneighbors; False memakai predict, predict_proba dan
+                   kneighbors sklearn secara terpisah
+            fields: Field hasil yang disertakan (lihat PREDICTION_FIELDS)
+            layout: 'records' atau 'columnar' (lihat format_predictions)
             
         Returns:
             dict: Hasil prediksi dengan confidence scores
         """
         if self.model is None:
             raise ValueError("Model belum dilatih. Panggil train() terlebih dahulu.")
+        fields, layout = parse_prediction_format(fields, layout)
         
         # Convert dan normalisasi
-        X_test = np.array(X_test)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Prediksi
-        predictions = self.model.predict(X_test_scaled)
-        probabilities = self.model.predict_proba(X_test_scaled)
+        with stage('scaler_transform'):
+            X_test_scaled = self.scaler.transform(np.asarray(X_test))
         
-        # Dapatkan jarak ke tetangga terdekat
-        distances, indices = self.model.kneighbors(X_test_scaled)
-        
-        # Format hasil
-        results = []
-        for i, pred in enumerate(predictions):
-            # Confidence adalah max probability
-            confidence = float(np.max(probabilities[i]))
-            
-            results.append({
-                'prediction': int(pred) if isinstance(pred, (np.integer, int)) else str(pred),
-                'confidence': confidence,
-                'probabilities': {
-                    str(cls): float(prob) 
-                    for cls, prob in zip(self.model.classes_, probabilities[i])
-                },
-                'nearest_neighbors': {
-                    'distances': distances[i].tolist(),
-                    'indices': indices[i].tolist()
-                }
-            })
+        if fused:
+            # Satu pencarian tetangga untuk label, probabilitas dan jarak
+            with stage('kneighbors'):
+                distances, indices = self.model.kneighbors(X_test_scaled)
+            with stage('vote'):
+                probabilities = neighbor_class_probabilities(
+                    distances, indices, self.model._y, len(self.model.classes_), self.weights
+                )
+                predictions = self.model.classes_[np.argmax(probabilities, axis=1)]
+        else:
+            with stage('predict'):
+                predictions = self.model.predict(X_test_scaled)
+            with stage('predict_proba'):
+                probabilities = self.model.predict_proba(X_test_scaled)
+            with stage('kneighbors'):
+                distances, indices = self.model.kneighbors(X_test_scaled)
         
-        return {
-            'predictions': results,
-            'total_predictions': len(results)
-        }
+        with stage('format_predictions'):
+            return format_predictions(predictions, probabilities, self.model.classes_,
+                                      distances, indices, fields, layout)
     
-    def find_optimal_k(self, X_train, y_train, k_range=(1, 20)):
+    def find_optimal_k(self, X_train, y_train, k_range=(1, 20), engine='sweep', progress=None):
         """
         Cari nilai K optimal dengan cross-validation
         
@@ -150,12 +436,25 @@ class KNNAlgorithm:
             X_train: Training features
             y_train: Training labels
             k_range: Tuple (min_k, max_k)
+            engine: 'sweep' - satu pencarian tetangga per fold untuk semua K
+                    'cv'    - cross_val_score terpisah untuk setiap K
+            
+            Kedua engine menghasilkan accuracy yang sama persis, termasuk pada fitur
+            integer dengan banyak jarak sama (lihat knn_sweep._boundary_ties).
+            Pada dataset besar, fold dan nilai K dibagi ke process pool; hasilnya
+            sama persis dengan eksekusi serial.
+            progress: Callback opsional progress(done, total), dipanggil setelah
+                setiap K (engine 'cv') atau setiap pasangan (fold, K) (engine
+                'sweep'). Di process pool, progress dilaporkan per task yang selesai
+                (potongan fold untuk 'sweep', kombinasi K dan fold untuk 'cv').
+                Callback boleh melempar OperationCancelled untuk menghentikan
+                pencarian; task yang belum berjalan dibatalkan.
             
         Returns:
             dict: K optimal dan accuracy scores
         """
-        X_train = np.array(X_train)
-        y_train = np.array(y_train)
+        X_train = np.asarray(X_train)
+        y_train = np.asarray(y_train)
         n_samples = len(X_train)
         
         if n_samples < 2:
@@ -165,7 +464,8 @@ class KNNAlgorithm:
                 'all_scores': []
             }
 
-        X_train_scaled = self.scaler.fit_transform(X_train)
+        with stage('scaler_fit'):
+            X_train_scaled = self.scaler.fit_transform(X_train)
         
         k_scores = []
         # K tidak boleh lebih besar dari n_samples
@@ -176,7 +476,58 @@ class KNNAlgorithm:
         cv_value = min(5, n_samples)
         unique_classes = len(np.unique(y_train))
         
-        for k in k_values:
+        if engine not in ('sweep', 'cv'):
+            raise ValueError("engine harus 'sweep' atau 'cv'")
+        
+        with stage('k_search'):
+            k_scores = self._score_k_values(X_train_scaled, y_train, k_values, cv_value,
+                                            unique_classes, engine, progress)
+        
+        if not k_scores:
+            raise ValueError(f"Tidak ada nilai K dalam rentang {tuple(k_range)} yang bisa dinilai.")
+        
+        # Cari K dengan accuracy tertinggi
+        best_k = max(k_scores, key=lambda x: x['accuracy'])
+        
+        return {
+            'optimal_k': best_k['k'],
+            'optimal_accuracy': best_k['accuracy'],
+            'all_scores': k_scores
+        }
+    
+    def _score_k_values(self, X_train_scaled, y_train, k_values, cv_value, unique_classes,
+                        engine, progress=None):
+        # Accuracy cross-validation untuk setiap K, list [{'k', 'accuracy', 'std_dev'}]
+        k_scores = []
+        n_samples = len(X_train_scaled)
+        executor = self._get_executor()
+        
+        if engine == 'sweep':
+            # Error dilempar apa adanya; menelannya hanya menghasilkan all_scores kosong
+            k_scores = neighbor_sweep_scores(
+                X_train_scaled, y_train, k_values,
+                cv=cv_value if unique_classes >= 2 else 0,
+                metric=self.metric,
+                weights=self.weights,
+                executor=executor,
+                progress=progress
+            )
+            k_values = []
+        elif (cv_value >= 2 and unique_classes >= 2
+              and executor.should_parallelize(n_samples)):
+            # Semua kombinasi (K, fold) dijalankan sekaligus di process pool
+            fold_scores = parallel_cross_val_scores(
+                [KNeighborsClassifier(n_neighbors=k, metric=self.metric, weights=self.weights)
+                 for k in k_values],
+                X_train_scaled, y_train, cv_value, executor, progress=progress
+            )
+            k_scores = [
+                {'k': k, 'accuracy': float(np.mean(scores)), 'std_dev': float(np.std(scores))}
+                for k, scores in zip(k_values, fold_scores)
+            ]
+            k_values = []
+        
+        for done, k in enumerate(k_values, start=1):
             try:
                 temp_model = KNeighborsClassifier(
                     n_neighbors=k,
@@ -199,18 +550,186 @@ class KNNAlgorithm:
                 })
             except Exception:
                 continue
+            finally:
+                if progress is not None:
+                    progress(done, len(k_values))
         
-        # Cari K dengan accuracy tertinggi
-        best_k = max(k_scores, key=lambda x: x['accuracy'])
+        return k_scores
+
+
+def parse_prediction_format(fields=None, layout='records'):
+    """
+    Validasi pilihan format hasil prediksi
+    
+    Args:
+        fields: List atau string dipisah koma berisi nama field dari
+            PREDICTION_FIELDS (default: semua)
+        layout: 'records' (list of dict) atau 'columnar' (array paralel)
+        
+    Returns:
+        tuple: (fields sebagai tuple, layout)
+    """
+    if fields is None or fields == '':
+        fields = PREDICTION_FIELDS
+    elif isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    fields = tuple(fields)
+    
+    unknown = [field for field in fields if field not in PREDICTION_FIELDS]
+    if unknown:
+        raise ValueError(f"fields tidak dikenal: {unknown}. Pilihan: {list(PREDICTION_FIELDS)}")
+    if layout not in PREDICTION_LAYOUTS:
+        raise ValueError(f"layout harus salah satu dari {PREDICTION_LAYOUTS}")
+    return fields, layout
+
+
+def _prediction_labels(predictions):
+    # Label numpy -> tipe Python: integer tetap int, selain itu string
+    if predictions.dtype.kind in 'iu':
+        return predictions.tolist()
+    if predictions.dtype.kind == 'O':
+        return [int(pred) if isinstance(pred, (np.integer, int)) else str(pred)
+                for pred in predictions]
+    return [str(pred) for pred in predictions.tolist()]
+
+
+def format_predictions(predictions, probabilities, classes, distances, indices, fields=None,
+                       layout='records'):
+    """
+    Format hasil prediksi KNN untuk response API
+    
+    Hanya field yang diminta yang dikonversi, jadi biaya serialisasi mengikuti
+    permintaan client.
+    
+    Args:
+        predictions: Label prediksi per query
+        probabilities: Array (n_queries, n_classes)
+        classes: Label kelas sesuai kolom probabilities
+        distances: Jarak ke tetangga terdekat (n_queries, n_neighbors)
+        indices: Indeks tetangga terdekat (n_queries, n_neighbors)
+        fields: Field yang disertakan (lihat PREDICTION_FIELDS, default: semua)
+        layout: 'records' - list of dict per query (default)
+                'columnar' - dict berisi array paralel, misalnya
+                {'prediction': [...], 'confidence': [...],
+                 'probabilities': {'classes': [...], 'values': [[...]]},
+                 'nearest_neighbors': {'distances': [[...]], 'indices': [[...]]}}
         
+    Returns:
+        dict: {'predictions', 'total_predictions'} (+ 'layout' untuk columnar)
+    """
+    fields, layout = parse_prediction_format(fields, layout)
+    n_queries = len(predictions)
+    
+    columns = {}
+    if 'prediction' in fields:
+        columns['prediction'] = _prediction_labels(np.asarray(predictions))
+    if 'confidence' in fields:
+        # Confidence adalah max probability
+        columns['confidence'] = np.max(probabilities, axis=1).tolist()
+    if 'probabilities' in fields:
+        class_keys = [str(cls) for cls in classes]
+        columns['probabilities'] = {'classes': class_keys, 'values': probabilities.tolist()}
+    if 'nearest_neighbors' in fields:
+        columns['nearest_neighbors'] = {
+            'distances': distances.tolist(),
+            'indices': indices.tolist()
+        }
+    
+    if layout == 'columnar':
         return {
-            'optimal_k': best_k['k'],
-            'optimal_accuracy': best_k['accuracy'],
-            'all_scores': k_scores
+            'predictions': columns,
+            'total_predictions': n_queries,
+            'layout': 'columnar'
         }
+    
+    results = [{} for _ in range(n_queries)]
+    if 'prediction' in columns:
+        for result, value in zip(results, columns['prediction']):
+            result['prediction'] = value
+    if 'confidence' in columns:
+        for result, value in zip(results, columns['confidence']):
+            result['confidence'] = value
+    if 'probabilities' in columns:
+        class_keys = columns['probabilities']['classes']
+        for result, row in zip(results, columns['probabilities']['values']):
+            result['probabilities'] = dict(zip(class_keys, row))
+    if 'nearest_neighbors' in columns:
+        neighbors = columns['nearest_neighbors']
+        for result, row_distances, row_indices in zip(results, neighbors['distances'],
+                                                       neighbors['indices']):
+            result['nearest_neighbors'] = {'distances': row_distances, 'indices': row_indices}
+    
+    return {
+        'predictions': results,
+        'total_predictions': n_queries
+    }
 
 
-def calculate_knn(train_data, train_labels, test_data, k=3, metric='euclidean'):
+def dataset_fingerprint(X_train, y_train, k=3, metric='euclidean', weights='uniform',
+                        backend='exact', ann_params=None):
+    """
+    Hitung content hash untuk kombinasi dataset dan parameter model
+    
+    Args:
+        X_train: Feature data (numpy array atau list)
+        y_train: Label data (numpy array atau list)
+        k: Jumlah tetangga
+        metric: Metrik jarak
+        weights: Bobot ('uniform' atau 'distance')
+        backend: 'exact', 'ann' atau 'sharded'
+        ann_params: Parameter index ANN
+        
+    Returns:
+        str: Hex digest SHA-256 yang stabil untuk input yang sama
+    """
+    X_train = np.ascontiguousarray(X_train, dtype=np.float64)
+    y_train = np.asarray(y_train)
+    
+    digest = hashlib.sha256()
+    digest.update(repr((X_train.shape, k, metric, weights)).encode('utf-8'))
+    if backend != 'exact':
+        # Backend exact tidak ikut di-hash agar fingerprint lama tetap sama
+        digest.update(json.dumps([backend, ann_params or {}], sort_keys=True).encode('utf-8'))
+    digest.update(X_train.tobytes())
+    _update_label_digest(digest, y_train)
+    
+    return digest.hexdigest()
+
+
+def data_fingerprint(X_train, y_train):
+    """
+    Hitung content hash untuk dataset saja (tanpa parameter model)
+    
+    Dipakai DatasetStore agar model dengan data sama tetapi parameter berbeda
+    berbagi file dataset yang sama.
+    
+    Returns:
+        str: Hex digest SHA-256 yang stabil untuk input yang sama
+    """
+    X_train = np.ascontiguousarray(X_train, dtype=np.float64)
+    y_train = np.asarray(y_train)
+    
+    digest = hashlib.sha256()
+    digest.update(repr(('data', X_train.shape)).encode('utf-8'))
+    digest.update(X_train.tobytes())
+    _update_label_digest(digest, y_train)
+    
+    return digest.hexdigest()
+
+
+def _update_label_digest(digest, y_train):
+    # Label bisa berupa angka atau string, dtype ikut di-hash karena
+    # menentukan format 'prediction' di hasil
+    digest.update(y_train.dtype.str.encode('utf-8'))
+    if y_train.dtype.kind == 'O':
+        digest.update(json.dumps(y_train.tolist(), default=str).encode('utf-8'))
+    else:
+        digest.update(np.ascontiguousarray(y_train).tobytes())
+
+
+def calculate_knn(train_data, train_labels, test_data, k=3, metric='euclidean',
+                  weights='uniform', registry=None, metrics_mode='eager', backend='exact',
+                  ann_params=None, n_shards=None, fields=None, layout='records'):
     """
     Helper function untuk perhitungan KNN langsung
     
@@ -220,20 +739,50 @@ def calculate_knn(train_data, train_labels, test_data, k=3, metric='euclidean'):
         test_data: Data test untuk prediksi (list of lists)
         k: Jumlah tetangga
         metric: Metrik jarak
+        weights: Bobot ('uniform' atau 'distance')
+        registry: ModelRegistry opsional. Jika diberikan, model yang sudah
+            dilatih dengan dataset dan parameter yang sama dipakai ulang.
+        metrics_mode: 'eager' menunggu cross-validation, 'lazy'/'async'
+            langsung memprediksi dan mengembalikan metrics berstatus 'pending'.
+        backend: 'exact', 'ann' atau 'sharded'
+        ann_params: Parameter index ANN (n_lists, n_probe, ...)
+        n_shards: Jumlah shard untuk backend 'sharded'
+        fields: Field prediksi yang disertakan (lihat PREDICTION_FIELDS)
+        layout: 'records' atau 'columnar' (lihat format_predictions)
         
     Returns:
         dict: Hasil prediksi dan metrics
     """
-    knn = KNNAlgorithm(k=k, metric=metric)
-    
-    # Train model
-    train_metrics = knn.train(train_data, train_labels)
+    if registry is not None:
+        entry, _ = registry.get_or_train(train_data, train_labels, k=k,
+                                         metric=metric, weights=weights,
+                                         metrics_mode=metrics_mode, backend=backend,
+                                         ann_params=ann_params, n_shards=n_shards)
+        knn = entry.knn
+        if metrics_mode == 'eager':
+            train_metrics = knn.get_training_metrics(wait=True)
+        else:
+            if metrics_mode == 'async':
+                knn.start_training_metrics()
+            train_metrics = knn.get_training_metrics(wait=False)
+    else:
+        knn = KNNAlgorithm(k=k, metric=metric, weights=weights, metrics_mode=metrics_mode,
+                           backend=backend, ann_params=ann_params, n_shards=n_shards)
+        
+        # Train model
+        train_metrics = knn.train(train_data, train_labels)
     
     # Predict
-    predictions = knn.predict(test_data)
+    predictions = knn.predict(test_data, fields=fields, layout=layout)
     
-    return {
+    result = {
         'training_metrics': train_metrics,
         'predictions': predictions['predictions'],
         'total_predictions': predictions['total_predictions']
     }
+    if layout == 'columnar':
+        result['layout'] = layout
+    if registry is not None:
+        result['model_id'] = entry.model_id
+    
+    return result
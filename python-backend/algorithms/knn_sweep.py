@@ -0,0 +1,346 @@
+"""
+Neighbor-sweep engine untuk pencarian K optimal.
+Setiap fold cross-validation hanya melakukan satu pencarian tetangga sampai max_k,
+lalu semua nilai K dinilai dari matriks tetangga yang sama dengan akumulasi vote.
+Baris yang tetangga ke-K-nya berjarak sama dengan tetangga berikutnya diprediksi
+ulang dengan KNeighborsClassifier agar pilihan tetangga sama dengan sklearn.
+"""
+
+import math
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import check_cv
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+
+from .executor import split_rows
+
+
+# Selisih jarak relatif yang masih dianggap sama saat mendeteksi kelompok jarak sama
+_TIE_RTOL = 1e-9
+
+
+def neighbor_votes_weights(distances, weights='uniform'):
+    """
+    Bobot vote untuk setiap tetangga, sama dengan aturan KNeighborsClassifier
+
+    Args:
+        distances: Array (n_queries, n_neighbors) jarak terurut naik
+        weights: 'uniform' atau 'distance'
+
+    Returns:
+        numpy.ndarray: Bobot dengan shape yang sama dengan distances
+    """
+    if weights == 'uniform':
+        return np.ones_like(distances, dtype=np.float64)
+    if weights != 'distance':
+        raise ValueError("weights harus 'uniform' atau 'distance'")
+
+    with np.errstate(divide='ignore'):
+        vote_weights = 1.0 / distances
+
+    # Jika ada tetangga dengan jarak 0, hanya tetangga tersebut yang dihitung.
+    # Karena jarak terurut, cukup cek kolom pertama dan hasilnya berlaku untuk semua K.
+    zero_rows = distances[:, 0] == 0
+    vote_weights[zero_rows] = distances[zero_rows] == 0
+    return vote_weights
+
+
+def neighbor_class_probabilities(distances, indices, y_encoded, n_classes, weights='uniform'):
+    """
+    Probabilitas kelas dari hasil kneighbors, sama dengan KNeighborsClassifier.predict_proba
+
+    Args:
+        distances: Array (n_queries, n_neighbors) jarak terurut naik
+        indices: Array (n_queries, n_neighbors) indeks tetangga di data training
+        y_encoded: Label training yang sudah di-encode ke 0..n_classes-1
+        n_classes: Jumlah kelas
+        weights: 'uniform' atau 'distance'
+
+    Returns:
+        numpy.ndarray: Probabilitas (n_queries, n_classes)
+    """
+    neighbor_labels = y_encoded[indices]
+    vote_weights = neighbor_votes_weights(distances, weights)
+
+    probabilities = np.zeros((len(indices), n_classes))
+    rows = np.arange(len(indices))
+    # Akumulasi per kolom tetangga dengan urutan yang sama seperti sklearn
+    for j in range(indices.shape[1]):
+        probabilities[rows, neighbor_labels[:, j]] += vote_weights[:, j]
+
+    probabilities /= probabilities.sum(axis=1)[:, np.newaxis]
+    return probabilities
+
+
+def _boundary_ties(distances, k):
+    """
+    Baris yang tetangga ke-k dan ke-(k+1)-nya berjarak sama
+
+    Pada baris ini sklearn bebas memilih anggota kelompok jarak sama mana yang
+    masuk ke K tetangga, dan pilihannya bergantung pada n_neighbors serta algoritma
+    pencarian. Toleransi relatif kecil dipakai karena kd_tree dan brute bisa
+    menghasilkan jarak yang berbeda di digit terakhir untuk pasangan titik yang sama.
+    """
+    if k >= distances.shape[1]:
+        return np.zeros(len(distances), dtype=bool)
+    kth, following = distances[:, k - 1], distances[:, k]
+    return following - kth <= _TIE_RTOL * np.maximum(np.abs(following), 1.0)
+
+
+def _vote_ties(votes):
+    """
+    Baris yang dua kelas teratasnya punya total bobot (hampir) sama
+
+    Dengan weights='distance', urutan penjumlahan tetangga berjarak sama menentukan
+    digit terakhir total bobot, sehingga argmax pada seri seperti ini bisa berbeda
+    dari urutan tetangga sklearn.
+    """
+    if votes.shape[1] < 2:
+        return np.zeros(len(votes), dtype=bool)
+    top = np.partition(votes, -2, axis=1)
+    first, second = top[:, -1], top[:, -2]
+    return first - second <= _TIE_RTOL * np.maximum(first, 1.0)
+
+
+class _ExactTieModels:
+    """KNeighborsClassifier per K untuk baris yang jatuh di kelompok jarak sama"""
+
+    def __init__(self, X_train, y_train, metric, weights):
+        self.X_train = X_train
+        self.y_train = y_train
+        self.metric = metric
+        self.weights = weights
+        # Index tidak bergantung pada K, hanya pilihan algoritma 'auto' yang bergantung
+        # (K >= n_samples // 2 memaksa brute), jadi cukup satu fit per pilihan
+        self._models = {}
+
+    def predict(self, X, k):
+        key = k >= len(self.X_train) // 2
+        model = self._models.get(key)
+        if model is None:
+            model = KNeighborsClassifier(n_neighbors=k, metric=self.metric, weights=self.weights)
+            model.fit(self.X_train, self.y_train)
+            self._models[key] = model
+        model.set_params(n_neighbors=k)
+        return model.predict(X)
+
+
+def _fold_correct_counts(X_train, y_train, X_test, y_test, k_values, n_classes, metric,
+                         weights, on_k=None):
+    """
+    Hitung jumlah prediksi benar satu fold untuk semua K dengan satu kali kneighbors
+
+    Jumlah (bukan rata-rata) dipakai agar hasil potongan query yang diproses
+    paralel bisa dijumlahkan tanpa selisih pembulatan.
+
+    Tetangga dicari sampai max_k + 1 untuk mendeteksi kelompok jarak sama di batas
+    K, serta (untuk weights='distance') seri total bobot antar kelas. Baris seperti
+    itu (umum pada fitur integer/skala Likert) diprediksi ulang dengan
+    KNeighborsClassifier(n_neighbors=K), sehingga hasil sama persis dengan
+    cross_val_score per K.
+
+    Args:
+        on_k: Callback opsional on_k(position) setelah K ke-position dinilai
+
+    Returns:
+        numpy.ndarray: Jumlah benar per K (NaN jika K lebih besar dari data training fold)
+    """
+    counts = np.full(len(k_values), np.nan)
+    max_k = min(k_values[-1], len(X_train))
+
+    nn = NearestNeighbors(n_neighbors=min(max_k + 1, len(X_train)), metric=metric)
+    nn.fit(X_train)
+    distances, indices = nn.kneighbors(X_test)
+
+    neighbor_labels = y_train[indices]
+    vote_weights = neighbor_votes_weights(distances, weights)
+    tie_models = _ExactTieModels(X_train, y_train, metric, weights)
+
+    votes = np.zeros((len(X_test), n_classes))
+    rows = np.arange(len(X_test))
+    position = 0
+
+    # Akumulasi vote tetangga ke-j, lalu nilai setiap K yang diminta
+    for j in range(max_k):
+        votes[rows, neighbor_labels[:, j]] += vote_weights[:, j]
+        k = j + 1
+        while position < len(k_values) and k_values[position] == k:
+            predictions = np.argmax(votes, axis=1)
+            ties = _boundary_ties(distances, k)
+            if weights == 'distance':
+                ties |= _vote_ties(votes)
+            if ties.any():
+                predictions[ties] = tie_models.predict(X_test[ties], k)
+            counts[position] = np.count_nonzero(predictions == y_test)
+            position += 1
+            if on_k is not None:
+                on_k(position)
+
+    # K yang lebih besar dari data training fold tetap dihitung sebagai selesai
+    if on_k is not None and position < len(k_values):
+        on_k(len(k_values))
+
+    return counts
+
+
+def _sweep_chunk_task(X, y_encoded, train_idx, test_idx, k_values, n_classes, metric, weights):
+    # Task process pool: satu potongan query dari satu fold
+    return _fold_correct_counts(
+        X[train_idx], y_encoded[train_idx], X[test_idx], y_encoded[test_idx],
+        k_values, n_classes, metric, weights
+    )
+
+
+def _chunks_per_group(executor, n_rows, n_groups):
+    # Jumlah task dibuat kelipatan jumlah worker agar putaran terakhir tidak
+    # menyisakan worker menganggur; grup yang sudah banyak tidak perlu dipotong
+    workers = executor.max_workers
+    if n_groups >= 4 * workers:
+        return 1
+    chunks = workers // math.gcd(n_groups, workers)
+    return max(1, min(chunks, executor.chunk_count(n_rows)))
+
+
+def _offset_progress(progress, offset, total):
+    # Progress per K di dalam satu fold -> progress(done, total) seluruh sweep
+    if progress is None:
+        return None
+    return lambda position: progress(offset + position, total)
+
+
+def _split_folds(X_train, y_train, cv, n_classes):
+    if cv >= 2 and n_classes >= 2:
+        splitter = check_cv(cv, y_train, classifier=True)
+        return list(splitter.split(X_train, y_train))
+    all_rows = np.arange(len(X_train))
+    return [(all_rows, all_rows)]
+
+
+def neighbor_sweep_scores(X_train, y_train, k_values, cv=5, metric='euclidean',
+                          weights='uniform', executor=None, progress=None):
+    """
+    Accuracy cross-validation untuk banyak nilai K sekaligus
+
+    Fold yang dipakai sama dengan cross_val_score (StratifiedKFold untuk label
+    klasifikasi). Jika cv < 2 atau hanya ada 1 kelas, model dinilai pada data
+    training itu sendiri seperti KNNAlgorithm.find_optimal_k.
+
+    Args:
+        X_train: Training features yang sudah dinormalisasi
+        y_train: Training labels
+        k_values: Daftar nilai K (akan diurutkan)
+        cv: Jumlah fold
+        metric: Metrik jarak
+        weights: 'uniform' atau 'distance'
+        executor: ParallelExecutor opsional; fold dan potongan query dikirim ke
+            process pool jika dataset cukup besar
+        progress: Callback opsional progress(done, total). Eksekusi serial
+            melaporkan setiap pasangan (fold, K) yang selesai dinilai (total =
+            jumlah fold x jumlah K); di process pool setiap task (potongan query
+            satu fold) yang selesai. Callback boleh melempar exception untuk
+            menghentikan pencarian di antara task.
+
+    Returns:
+        list: [{'k', 'accuracy', 'std_dev'}] terurut berdasarkan K
+    """
+    X_train = np.asarray(X_train, dtype=np.float64)
+    k_values = sorted(set(int(k) for k in k_values))
+    if not k_values or k_values[0] < 1:
+        raise ValueError("Nilai K harus >= 1.")
+
+    classes, y_encoded = np.unique(y_train, return_inverse=True)
+    n_classes = len(classes)
+
+    folds = _split_folds(X_train, y_train, cv, n_classes)
+
+    if executor is not None and executor.should_parallelize(len(X_train)):
+        fold_counts = np.zeros((len(folds), len(k_values)))
+        with executor.share(X_train, y_encoded) as (X_shared, y_shared):
+            tasks, owners = [], []
+            for fold, (train_idx, test_idx) in enumerate(folds):
+                n_chunks = _chunks_per_group(executor, len(test_idx), len(folds))
+                for chunk in split_rows(test_idx, n_chunks):
+                    tasks.append((X_shared, y_shared, train_idx, chunk, k_values, n_classes,
+                                  metric, weights))
+                    owners.append(fold)
+            results = executor.map(_sweep_chunk_task, tasks, progress=progress)
+            for fold, counts in zip(owners, results):
+                fold_counts[fold] += counts
+    else:
+        fold_counts = np.zeros((len(folds), len(k_values)))
+        total = len(folds) * len(k_values)
+        for fold, (train_idx, test_idx) in enumerate(folds):
+            fold_counts[fold] = _fold_correct_counts(
+                X_train[train_idx], y_encoded[train_idx],
+                X_train[test_idx], y_encoded[test_idx],
+                k_values, n_classes, metric, weights,
+                on_k=_offset_progress(progress, fold * len(k_values), total)
+            )
+
+    fold_sizes = np.array([len(test_idx) for _, test_idx in folds], dtype=np.float64)
+    fold_scores = fold_counts / fold_sizes[:, np.newaxis]
+
+    results = []
+    for position, k in enumerate(k_values):
+        scores = fold_scores[:, position]
+        results.append({
+            'k': k,
+            'accuracy': float(np.mean(scores)),
+            'std_dev': float(np.std(scores)) if len(folds) > 1 else 0.0
+        })
+
+    return results
+
+
+def _holdout_correct_task(estimator, X, y_encoded, train_idx, test_idx):
+    # Task process pool: fit pada train_idx lalu hitung prediksi benar pada test_idx.
+    # Error menghasilkan NaN seperti error_score default cross_val_score.
+    try:
+        model = clone(estimator).fit(X[train_idx], y_encoded[train_idx])
+        return float(np.count_nonzero(model.predict(X[test_idx]) == y_encoded[test_idx]))
+    except Exception:
+        return np.nan
+
+
+def parallel_cross_val_scores(estimators, X_train, y_train, cv, executor, progress=None):
+    """
+    Accuracy per fold untuk beberapa estimator, sama dengan cross_val_score
+
+    Setiap kombinasi (estimator, fold, potongan query) menjadi satu task di
+    process pool; jumlah prediksi benar digabung per fold sesuai urutan task.
+
+    Args:
+        estimators: List estimator klasifikasi (belum perlu di-fit)
+        X_train: Training features yang sudah dinormalisasi
+        y_train: Training labels
+        cv: Jumlah fold (>= 2)
+        executor: ParallelExecutor
+        progress: Callback opsional progress(done, total) per task (estimator,
+            fold, potongan query) yang selesai; lihat ParallelExecutor.map
+
+    Returns:
+        numpy.ndarray: Accuracy (n_estimators, n_folds)
+    """
+    X_train = np.asarray(X_train, dtype=np.float64)
+    # Label di-encode agar bisa ditaruh di shared memory; urutan kelas sama
+    # dengan classes_ estimator sehingga prediksi tidak berubah
+    classes, y_encoded = np.unique(y_train, return_inverse=True)
+    folds = _split_folds(X_train, y_train, cv, len(classes))
+
+    n_groups = len(estimators) * len(folds)
+    correct = np.zeros((len(estimators), len(folds)))
+    with executor.share(X_train, y_encoded) as (X_shared, y_shared):
+        tasks, owners = [], []
+        for position, estimator in enumerate(estimators):
+            for fold, (train_idx, test_idx) in enumerate(folds):
+                n_chunks = _chunks_per_group(executor, len(test_idx), n_groups)
+                for chunk in split_rows(test_idx, n_chunks):
+                    tasks.append((estimator, X_shared, y_shared, train_idx, chunk))
+                    owners.append((position, fold))
+        results = executor.map(_holdout_correct_task, tasks, progress=progress)
+        for (position, fold), count in zip(owners, results):
+            correct[position, fold] += count
+
+    fold_sizes = np.array([len(test_idx) for _, test_idx in folds], dtype=np.float64)
+    return correct / fold_sizes
@@ -0,0 +1,281 @@
+"""
+Registry model KNN yang sudah dilatih.
+Menyimpan scaler + model + training metrics dalam LRU in-process dengan batas byte,
+sehingga dataset yang sama tidak perlu di-fit dan di-cross-validate ulang.
+
+Jika KNN_DATASET_DIR diatur (default di gunicorn.conf.py), data training disimpan ke
+DatasetStore dan model dilatih langsung dari array memory-mapped: semua worker berbagi
+satu salinan data di page cache, model dengan data sama tetapi parameter berbeda
+memakai file yang sama, dan model yang tidak ada di memori worker dibangun ulang dari disk.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .dataset_store import default_dataset_store, is_memory_mapped, scaler_state
+from .instrumentation import stage
+from .knn import KNNAlgorithm, data_fingerprint, dataset_fingerprint
+
+
+# Default 256 MiB, bisa diatur lewat environment variable
+DEFAULT_MAX_BYTES = int(os.environ.get('KNN_REGISTRY_MAX_BYTES', 256 * 1024 * 1024))
+
+
+class RegisteredModel:
+    """Satu entry di registry: model yang sudah dilatih beserta metadata"""
+
+    def __init__(self, model_id, knn, nbytes, n_features):
+        self.model_id = model_id
+        self.knn = knn
+        self.nbytes = nbytes
+        self.n_features = n_features
+
+    @property
+    def training_metrics(self):
+        """Training metrics terkini tanpa menunggu cross-validation selesai"""
+        return self.knn.get_training_metrics(wait=False)
+
+    def describe(self):
+        """Ringkasan entry untuk response API"""
+        return {
+            'model_id': self.model_id,
+            'k': self.knn.k,
+            'metric': self.knn.metric,
+            'weights': self.knn.weights,
+            'backend': self.knn.backend,
+            'n_samples': len(self.knn.model._y),
+            'n_features': self.n_features,
+            'nbytes': self.nbytes
+        }
+
+
+def _private_nbytes(array):
+    # Array memory-mapped ada di page cache bersama, bukan memori proses ini
+    array = np.asarray(array)
+    return 0 if is_memory_mapped(array) else array.nbytes
+
+
+def estimate_model_nbytes(knn):
+    """
+    Estimasi memori yang dipakai model KNN yang sudah dilatih
+
+    Array yang memory-mapped dari DatasetStore tidak dihitung.
+
+    Args:
+        knn: KNNAlgorithm yang sudah di-train
+
+    Returns:
+        int: Perkiraan ukuran dalam byte
+    """
+    model = knn.model
+    nbytes = 0
+
+    # Index ANN melaporkan ukurannya sendiri (data terurut, centroid, offset)
+    if hasattr(model, 'index_nbytes'):
+        nbytes += model.index_nbytes
+    else:
+        for attr in ('_fit_X', '_y', 'classes_'):
+            value = getattr(model, attr, None)
+            if isinstance(value, np.ndarray):
+                nbytes += _private_nbytes(value)
+
+    # KD-tree / Ball-tree menyimpan index sendiri (data dipakai tanpa salinan jika bisa)
+    tree = getattr(model, '_tree', None)
+    if tree is not None:
+        for arr in tree.get_arrays():
+            nbytes += _private_nbytes(arr)
+
+    for attr in ('mean_', 'scale_', 'var_'):
+        value = getattr(knn.scaler, attr, None)
+        if isinstance(value, np.ndarray):
+            nbytes += value.nbytes
+
+    return nbytes
+
+
+class ModelRegistry:
+    """
+    LRU cache untuk model KNN yang sudah dilatih, dibatasi total byte.
+
+    Key adalah content hash dari (train_data, train_labels, k, metric, weights),
+    jadi client yang mengirim dataset yang sama akan mendapat model_id yang sama.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, store=None):
+        """
+        Args:
+            max_bytes: Batas total memori model yang disimpan (model terbaru tetap
+                disimpan meskipun sendirian melebihi batas ini)
+            store: DatasetStore opsional untuk data training di disk (memory-mapped)
+        """
+        self.max_bytes = max_bytes
+        self.store = store
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_id):
+        """
+        Ambil model berdasarkan model_id
+
+        Model yang tidak ada di memori dibangun ulang dari DatasetStore jika ada.
+
+        Returns:
+            RegisteredModel atau None jika tidak ada / sudah di-evict
+        """
+        with self._lock:
+            entry = self._entries.get(model_id)
+            if entry is not None:
+                self._entries.move_to_end(model_id)
+                return entry
+        return self._load_stored(model_id)
+
+    def get_or_train(self, train_data, train_labels, k=3, metric='euclidean', weights='uniform',
+                     metrics_mode='eager', backend='exact', ann_params=None, n_shards=None):
+        """
+        Ambil model dari registry, atau latih dan simpan jika belum ada
+
+        Args:
+            train_data: Data training (list of lists atau numpy array)
+            train_labels: Label training
+            k: Jumlah tetangga
+            metric: Metrik jarak
+            weights: Bobot ('uniform' atau 'distance')
+            metrics_mode: Mode cross-validation untuk model baru ('eager', 'lazy', 'async')
+            backend: 'exact', 'ann' atau 'sharded'
+            ann_params: Parameter index ANN
+            n_shards: Jumlah shard untuk backend 'sharded'. Tidak ikut fingerprint
+                karena tidak mengubah hasil; model yang sudah ada dipakai apa adanya.
+
+        Returns:
+            tuple: (RegisteredModel, cached) dengan cached=True jika model dipakai ulang
+        """
+        X_train = np.asarray(train_data)
+        y_train = np.asarray(train_labels)
+        with stage('fingerprint'):
+            model_id = dataset_fingerprint(X_train, y_train, k, metric, weights, backend,
+                                           ann_params)
+
+        with self._lock:
+            entry = self._entries.get(model_id)
+            if entry is not None:
+                self._entries.move_to_end(model_id)
+                self.hits += 1
+                return entry, True
+            self.misses += 1
+
+        entry = self._load_stored(model_id, metrics_mode)
+        if entry is not None:
+            return entry, True
+
+        # Training dilakukan di luar lock agar request lain tidak tertahan
+        params = {'k': k, 'metric': metric, 'weights': weights, 'backend': backend,
+                  'ann_params': ann_params, 'n_shards': n_shards}
+        knn = KNNAlgorithm(metrics_mode=metrics_mode, **params)
+        if self.store is None:
+            knn.train(X_train, y_train)
+        else:
+            with stage('fingerprint'):
+                data_id = data_fingerprint(X_train, y_train)
+            with stage('dataset_store'):
+                # Data yang sama mungkin sudah disimpan untuk model dengan parameter lain
+                stored = self.store.get(data_id)
+                if stored is None:
+                    X_train, y_train, X_train_scaled = knn.prepare(X_train, y_train)
+                    stored = self.store.put(data_id, X_train, X_train_scaled, y_train, {
+                        'scaler': scaler_state(knn.scaler)
+                    })
+                else:
+                    knn.scaler = stored.scaler
+                self.store.put_model(model_id, data_id, params)
+            knn.train_scaled(stored.X_scaled, stored.y, fingerprint=model_id)
+        n_features = X_train.shape[1] if X_train.ndim > 1 else 1
+        entry = RegisteredModel(model_id, knn, estimate_model_nbytes(knn), n_features)
+
+        self._store(entry)
+        return entry, False
+
+    def _load_stored(self, model_id, metrics_mode='lazy'):
+        """
+        Bangun model dari DatasetStore (misalnya dilatih worker lain atau sebelum restart)
+
+        Returns:
+            RegisteredModel atau None jika store tidak aktif / dataset tidak ada
+        """
+        if self.store is None:
+            return None
+        with stage('dataset_store'):
+            stored = self.store.get_model(model_id)
+        if stored is None:
+            return None
+
+        knn = KNNAlgorithm(metrics_mode=metrics_mode, **stored.params)
+        knn.scaler = stored.scaler
+        knn.train_scaled(stored.X_scaled, stored.y, fingerprint=model_id)
+        n_features = stored.X.shape[1] if stored.X.ndim > 1 else 1
+        entry = RegisteredModel(model_id, knn, estimate_model_nbytes(knn), n_features)
+        self._store(entry)
+        return entry
+
+    def remove(self, model_id):
+        """
+        Hapus model dari registry
+
+        Model di DatasetStore ikut dihapus, beserta datasetnya jika tidak dipakai model lain.
+
+        Returns:
+            bool: True jika model ditemukan dan dihapus
+        """
+        with self._lock:
+            entry = self._entries.pop(model_id, None)
+            if entry is not None:
+                self._total_bytes -= entry.nbytes
+        stored = self.store is not None and self.store.remove_model(model_id)
+        return entry is not None or stored
+
+    def clear(self):
+        """Kosongkan registry (dan DatasetStore jika aktif)"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self):
+        """Statistik registry (jumlah model, byte terpakai, hit/miss)"""
+        with self._lock:
+            return {
+                'models': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def _store(self, entry):
+        # Model terbaru selalu disimpan, meskipun sendirian melebihi budget: model_id
+        # yang baru dikembalikan ke client harus bisa dipakai untuk request berikutnya
+        with self._lock:
+            existing = self._entries.pop(entry.model_id, None)
+            if existing is not None:
+                self._total_bytes -= existing.nbytes
+
+            self._entries[entry.model_id] = entry
+            self._total_bytes += entry.nbytes
+
+            # Evict model yang paling lama tidak dipakai sampai muat di budget
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.nbytes
+                self.evictions += 1
+
+
+# Registry default yang dipakai oleh Flask app
+model_registry = ModelRegistry(store=default_dataset_store())
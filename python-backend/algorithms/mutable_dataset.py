@@ -0,0 +1,825 @@
+"""
+Dataset KNN yang bisa diubah per baris tanpa training ulang dari nol.
+
+Statistik StandardScaler (mean/varians) diperbarui secara incremental dengan
+Welford, sedangkan index tetangga dibangun ulang secara lazy: baris baru ditampung
+di buffer (dicari brute-force) dan baris yang dihapus ditandai tombstone sampai
+jumlahnya melewati threshold rebuild.
+
+Index dibangun di ruang ternormalisasi dengan skala saat build (s0). Karena jarak
+tidak dipengaruhi mean, hanya perubahan skala yang membuat index "basi". Untuk
+metrik norma (euclidean, manhattan, chebyshev, minkowski) berlaku
+d_s(x, y) >= min(s0 / s) * d_s0(x, y), sehingga radius query di index lama tetap
+menemukan semua tetangga sebenarnya dengan skala terkini.
+
+Baris dan versi setiap dataset disimpan di file SQLite (KNN_MUTABLE_DB) yang
+dibagi semua worker gunicorn, sehingga request untuk satu dataset_id boleh sampai
+ke worker mana pun. Setiap worker menyimpan salinan MutableDataset di memori (LRU
+dengan batas byte, KNN_MUTABLE_MAX_BYTES). Perubahan ditulis di dalam transaksi
+BEGIN IMMEDIATE: worker yang salinannya masih sesuai versi terakhir menerapkan
+perubahan secara incremental, sedangkan worker dengan salinan lama memuat ulang
+dataset dari SQLite saat pertama dipakai.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from .knn import format_predictions
+from .knn_sweep import neighbor_class_probabilities
+
+
+# Metrik yang bisa memakai index KD-tree dengan batas skala di atas
+INDEXED_METRICS = ('euclidean', 'manhattan', 'chebyshev', 'minkowski')
+
+# Rebuild index jika buffer + tombstone melebihi fraksi ini dari baris ter-index
+DEFAULT_REBUILD_FRACTION = 0.1
+DEFAULT_REBUILD_MIN = 64
+# Rebuild juga jika rasio skala lama/baru terlalu jauh (radius query membengkak)
+DEFAULT_MAX_SCALE_DRIFT = 1.25
+
+_INITIAL_CAPACITY = 64
+
+DEFAULT_DB = os.environ.get(
+    'KNN_MUTABLE_DB', os.path.join(tempfile.gettempdir(), 'rcount-mutable-datasets.sqlite3')
+)
+
+# Batas dataset di SQLite (paling lama tidak dipakai dihapus) dan memori salinan per worker
+DEFAULT_MAX_DATASETS = int(os.environ.get('KNN_MUTABLE_MAX_DATASETS', 64))
+DEFAULT_MAX_BYTES = int(os.environ.get('KNN_MUTABLE_MAX_BYTES', 256 * 1024 * 1024))
+
+# accessed_at (untuk eviction di SQLite) hanya ditulis ulang jika lebih tua dari ini
+_TOUCH_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mutable_datasets (
+    dataset_id TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    next_row_id INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mutable_dataset_rows (
+    dataset_id TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    features BLOB NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (dataset_id, row_id)
+) WITHOUT ROWID;
+"""
+
+
+def _scale_from_variance(variance, mean, n_samples):
+    # Sama dengan StandardScaler: fitur (hampir) konstan memakai skala 1
+    scale = np.sqrt(variance)
+    eps = np.finfo(np.float64).eps
+    constant = variance <= n_samples * eps * variance + (n_samples * mean * eps) ** 2
+    scale[constant] = 1.0
+    return scale
+
+
+def _row_distances(query, rows, metric):
+    diff = np.abs(rows - query)
+    if metric in ('euclidean', 'minkowski'):
+        return np.sqrt(np.einsum('ij,ij->i', diff, diff))
+    if metric == 'manhattan':
+        return diff.sum(axis=1)
+    return diff.max(axis=1)
+
+
+class MutableDataset:
+    """
+    Dataset training KNN dengan operasi append/update/delete per baris.
+
+    Setiap baris punya row_id yang stabil; nearest_neighbors.indices pada hasil
+    prediksi berisi row_id, bukan posisi.
+    """
+
+    def __init__(self, n_features, k=3, metric='euclidean', weights='uniform',
+                 rebuild_fraction=DEFAULT_REBUILD_FRACTION, rebuild_min=DEFAULT_REBUILD_MIN,
+                 max_scale_drift=DEFAULT_MAX_SCALE_DRIFT):
+        """
+        Args:
+            n_features: Jumlah fitur per baris
+            k: Jumlah tetangga
+            metric: Metrik jarak
+            weights: Bobot ('uniform' atau 'distance')
+            rebuild_fraction: Fraksi perubahan sebelum index dibangun ulang
+            rebuild_min: Jumlah minimum perubahan sebelum index dibangun ulang
+            max_scale_drift: Rasio skala maksimum sebelum index dibangun ulang
+        """
+        if weights not in ('uniform', 'distance'):
+            raise ValueError("weights harus 'uniform' atau 'distance'")
+
+        self.n_features = int(n_features)
+        self.k = k
+        self.metric = metric
+        self.weights = weights
+        self.rebuild_fraction = rebuild_fraction
+        self.rebuild_min = rebuild_min
+        self.max_scale_drift = max_scale_drift
+
+        # Storage baris (slot), tumbuh dua kali lipat saat penuh
+        self._X = np.empty((_INITIAL_CAPACITY, self.n_features))
+        self._codes = np.empty(_INITIAL_CAPACITY, dtype=np.int64)
+        self._row_ids = np.empty(_INITIAL_CAPACITY, dtype=np.int64)
+        self._alive = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self._n_slots = 0
+        self._slot_of = {}
+        self._next_row_id = 0
+
+        # Kamus label: kode -> label dan jumlah baris hidup per kode
+        self._label_values = []
+        self._label_codes = {}
+        self._label_counts = []
+
+        # Statistik Welford untuk baris hidup
+        self._count = 0
+        self._mean = np.zeros(self.n_features)
+        self._m2 = np.zeros(self.n_features)
+
+        # Index: slot [0, _n_indexed) ada di tree dengan mean/skala saat build
+        self._tree = None
+        self._n_indexed = 0
+        self._indexed_dead = 0
+        self._index_mean = None
+        self._index_scale = None
+        self.rebuilds = 0
+
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_rows(cls, n_features, rows, labels, row_ids, next_row_id, **params):
+        """
+        Bangun ulang dataset dari baris tersimpan dengan row_id yang sama
+
+        Args:
+            n_features: Jumlah fitur per baris
+            rows: Array (n_rows, n_features), urut row_id
+            labels: Label per baris
+            row_ids: row_id per baris
+            next_row_id: row_id untuk baris baru berikutnya
+            **params: Parameter MutableDataset (k, metric, weights, ...)
+        """
+        dataset = cls(n_features, **params)
+        if len(rows):
+            dataset.append(rows, labels)
+        n_rows = len(row_ids)
+        dataset._row_ids[:n_rows] = row_ids
+        dataset._slot_of = {int(row_id): slot for slot, row_id in enumerate(row_ids)}
+        dataset._next_row_id = int(next_row_id)
+        return dataset
+
+    # ----- Mutasi -----
+
+    def append(self, rows, labels):
+        """
+        Tambah baris baru
+
+        Args:
+            rows: Array (n_rows, n_features)
+            labels: Label per baris
+
+        Returns:
+            list: row_id untuk setiap baris baru
+        """
+        rows = self._validate_rows(rows)
+        if len(labels) != len(rows):
+            raise ValueError("Jumlah label harus sama dengan jumlah baris.")
+
+        with self._lock:
+            n_new = len(rows)
+            self._reserve(self._n_slots + n_new)
+            codes = [self._encode_label(label) for label in labels]
+            for code in codes:
+                self._label_counts[code] += 1
+
+            slots = slice(self._n_slots, self._n_slots + n_new)
+            row_ids = np.arange(self._next_row_id, self._next_row_id + n_new)
+            self._X[slots] = rows
+            self._codes[slots] = codes
+            self._row_ids[slots] = row_ids
+            self._alive[slots] = True
+            self._slot_of.update(zip(row_ids.tolist(), range(self._n_slots, self._n_slots + n_new)))
+            self._n_slots += n_new
+            self._next_row_id += n_new
+            self._merge_stats(rows)
+            return row_ids.tolist()
+
+    def update(self, row_id, features=None, label=None):
+        """
+        Ubah fitur dan/atau label satu baris
+
+        Baris lama ditandai tombstone dan versi baru masuk buffer, sehingga
+        row_id tetap sama.
+        """
+        with self._lock:
+            slot = self._require_slot(row_id)
+            if features is None:
+                row = self._X[slot].copy()
+            else:
+                row = self._validate_rows([features])[0]
+            if label is None:
+                label = self._label_values[self._codes[slot]]
+
+            self._kill_slot(slot)
+            self._reserve(self._n_slots + 1)
+            self._place_row(row, label, row_id)
+
+    def delete(self, row_id):
+        """Hapus satu baris berdasarkan row_id"""
+        with self._lock:
+            slot = self._require_slot(row_id)
+            self._kill_slot(slot)
+            del self._slot_of[row_id]
+
+    # ----- Query -----
+
+    @property
+    def n_rows(self):
+        """Jumlah baris hidup"""
+        return self._count
+
+    @property
+    def classes_(self):
+        """Label kelas yang masih punya baris, terurut seperti sklearn"""
+        with self._lock:
+            return self._class_positions()[0]
+
+    def scaler_stats(self):
+        """Mean dan skala StandardScaler terkini (population variance)"""
+        with self._lock:
+            variance = self._m2 / self._count if self._count else np.zeros(self.n_features)
+            return self._mean.copy(), _scale_from_variance(np.maximum(variance, 0), self._mean, self._count)
+
+    @property
+    def nbytes(self):
+        """Perkiraan memori storage baris dan index KD-tree"""
+        with self._lock:
+            total = sum(getattr(self, name).nbytes
+                        for name in ('_X', '_codes', '_row_ids', '_alive'))
+            if self._tree is not None:
+                total += sum(np.asarray(array).nbytes for array in self._tree.get_arrays())
+            return int(total)
+
+    def rows_by_id(self, row_ids):
+        """
+        Fitur dan label baris hidup berdasarkan row_id
+
+        Returns:
+            tuple: (X, labels)
+        """
+        with self._lock:
+            slots = [self._require_slot(row_id) for row_id in row_ids]
+            return (self._X[slots].copy(),
+                    [self._label_values[code] for code in self._codes[slots]])
+
+    def to_arrays(self):
+        """
+        Salinan baris hidup dengan urutan row_id
+
+        Returns:
+            tuple: (X, labels, row_ids)
+        """
+        with self._lock:
+            slots = np.flatnonzero(self._alive[:self._n_slots])
+            slots = slots[np.argsort(self._row_ids[slots], kind='stable')]
+            labels = np.asarray(self._label_values)[self._codes[slots]]
+            return self._X[slots].copy(), labels, self._row_ids[slots].copy()
+
+    def kneighbors(self, X_test):
+        """
+        Tetangga terdekat dengan skala StandardScaler terkini
+
+        Returns:
+            tuple: (distances, slots) masing-masing (n_queries, k)
+        """
+        X_test = self._validate_rows(X_test)
+
+        with self._lock:
+            if self._count == 0:
+                raise ValueError("Dataset kosong.")
+            k = min(self.k, self._count)
+            mean, scale = self.scaler_stats()
+
+            if self.metric not in INDEXED_METRICS:
+                return self._brute_kneighbors(X_test, k, mean, scale)
+
+            if self._needs_rebuild(scale):
+                self._rebuild()
+                mean, scale = self.scaler_stats()
+            return self._indexed_kneighbors(X_test, k, scale)
+
+    def predict(self, X_test, fields=None, layout='records'):
+        """
+        Prediksi label, format sama dengan KNNAlgorithm.predict
+
+        Args:
+            X_test: Feature data untuk prediksi
+            fields: Field hasil yang disertakan (lihat knn.PREDICTION_FIELDS)
+            layout: 'records' atau 'columnar'
+
+        Returns:
+            dict: Hasil prediksi (nearest_neighbors.indices berisi row_id)
+        """
+        with self._lock:
+            distances, slots = self.kneighbors(X_test)
+
+            # Encode ulang label ke urutan kelas terurut seperti sklearn
+            classes, codes, positions = self._class_positions()
+            remap = np.full(len(self._label_values), -1, dtype=np.int64)
+            remap[codes] = positions
+            y_encoded = remap[self._codes[:self._n_slots]]
+
+            probabilities = neighbor_class_probabilities(
+                distances, slots, y_encoded, len(classes), self.weights
+            )
+            predictions = classes[np.argmax(probabilities, axis=1)]
+            row_ids = self._row_ids[slots]
+
+        return format_predictions(predictions, probabilities, classes, distances, row_ids,
+                                  fields, layout)
+
+    def describe(self):
+        """Ringkasan dataset dan kondisi index"""
+        with self._lock:
+            return {
+                'n_rows': self._count,
+                'n_features': self.n_features,
+                'k': self.k,
+                'metric': self.metric,
+                'weights': self.weights,
+                'classes': [str(cls) for cls in self.classes_],
+                'index': {
+                    'indexed_rows': self._n_indexed - self._indexed_dead,
+                    'buffered_rows': self._n_slots - self._n_indexed,
+                    'tombstones': self._indexed_dead,
+                    'rebuilds': self.rebuilds
+                }
+            }
+
+    # ----- Internal: storage dan statistik -----
+
+    def _validate_rows(self, rows):
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        if rows.ndim != 2 or rows.shape[1] != self.n_features:
+            raise ValueError(f"Setiap baris harus memiliki {self.n_features} fitur.")
+        if not np.all(np.isfinite(rows)):
+            raise ValueError("Fitur tidak boleh NaN atau infinity.")
+        return rows
+
+    def _require_slot(self, row_id):
+        slot = self._slot_of.get(row_id)
+        if slot is None:
+            raise KeyError(f"Row {row_id} tidak ditemukan.")
+        return slot
+
+    def _reserve(self, capacity):
+        if capacity <= len(self._alive):
+            return
+        new_capacity = max(capacity, 2 * len(self._alive))
+        for name in ('_X', '_codes', '_row_ids', '_alive'):
+            old = getattr(self, name)
+            grown = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:self._n_slots] = old[:self._n_slots]
+            setattr(self, name, grown)
+
+    def _encode_label(self, label):
+        if isinstance(label, np.generic):
+            label = label.item()
+        code = self._label_codes.get(label)
+        if code is None:
+            code = len(self._label_values)
+            self._label_codes[label] = code
+            self._label_values.append(label)
+            self._label_counts.append(0)
+        return code
+
+    def _class_positions(self):
+        # Kelas dibangun dari label yang tersimpan dengan konversi np.asarray yang sama
+        # seperti KNNAlgorithm (label campuran [1, 'a'] menjadi string), lalu setiap kode
+        # label dipetakan ke posisinya; beberapa kode bisa jatuh ke kelas yang sama
+        codes = [code for code, count in enumerate(self._label_counts) if count > 0]
+        classes, positions = np.unique(
+            np.asarray([self._label_values[code] for code in codes]), return_inverse=True
+        )
+        return classes, np.asarray(codes, dtype=np.int64), positions
+
+    def _merge_stats(self, rows):
+        # Gabungkan statistik batch baru (Chan et al.), setara Welford per baris
+        n_new = len(rows)
+        if n_new == 0:
+            return
+        batch_mean = rows.mean(axis=0)
+        batch_m2 = ((rows - batch_mean) ** 2).sum(axis=0)
+        total = self._count + n_new
+        delta = batch_mean - self._mean
+        self._mean = self._mean + delta * n_new / total
+        self._m2 = self._m2 + batch_m2 + delta ** 2 * self._count * n_new / total
+        self._count = total
+
+    def _place_row(self, row, label, row_id):
+        slot = self._n_slots
+        self._n_slots += 1
+        code = self._encode_label(label)
+
+        self._X[slot] = row
+        self._codes[slot] = code
+        self._row_ids[slot] = row_id
+        self._alive[slot] = True
+        self._slot_of[row_id] = slot
+        self._label_counts[code] += 1
+
+        # Welford: tambah satu sampel
+        self._count += 1
+        delta = row - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (row - self._mean)
+
+    def _kill_slot(self, slot):
+        row = self._X[slot]
+        self._alive[slot] = False
+        self._label_counts[self._codes[slot]] -= 1
+        if slot < self._n_indexed:
+            self._indexed_dead += 1
+
+        # Welford terbalik: hapus satu sampel
+        self._count -= 1
+        if self._count == 0:
+            self._mean[:] = 0.0
+            self._m2[:] = 0.0
+            return
+        delta = row - self._mean
+        self._mean -= delta / self._count
+        self._m2 -= delta * (row - self._mean)
+        np.maximum(self._m2, 0.0, out=self._m2)
+
+    # ----- Internal: index -----
+
+    def _needs_rebuild(self, scale):
+        if self._tree is None:
+            return True
+        pending = (self._n_slots - self._n_indexed) + self._indexed_dead
+        if pending > max(self.rebuild_min, self.rebuild_fraction * self._n_indexed):
+            return True
+        ratio = self._index_scale / scale
+        return ratio.max() / ratio.min() > self.max_scale_drift
+
+    def _rebuild(self):
+        # Padatkan storage: buang tombstone, urutan slot mengikuti urutan sisipan
+        slots = np.flatnonzero(self._alive[:self._n_slots])
+        n_alive = len(slots)
+        for name in ('_X', '_codes', '_row_ids'):
+            array = getattr(self, name)
+            array[:n_alive] = array[slots]
+        self._alive[:n_alive] = True
+        self._alive[n_alive:self._n_slots] = False
+        self._n_slots = n_alive
+        self._slot_of = {int(row_id): slot for slot, row_id in enumerate(self._row_ids[:n_alive])}
+
+        # Hitung ulang statistik secara exact agar error pembulatan Welford tidak menumpuk
+        X = self._X[:n_alive]
+        self._mean = X.mean(axis=0)
+        self._m2 = ((X - self._mean) ** 2).sum(axis=0)
+
+        mean, scale = self.scaler_stats()
+        metric_kwargs = {'p': 2} if self.metric == 'minkowski' else {}
+        self._tree = KDTree((X - mean) / scale, metric=self.metric, **metric_kwargs)
+        self._n_indexed = n_alive
+        self._indexed_dead = 0
+        self._index_mean = mean
+        self._index_scale = scale
+        self.rebuilds += 1
+
+    def _brute_kneighbors(self, X_test, k, mean, scale):
+        from sklearn.metrics import pairwise_distances
+
+        slots = np.flatnonzero(self._alive[:self._n_slots])
+        distances = pairwise_distances((X_test - mean) / scale, (self._X[slots] - mean) / scale,
+                                       metric=self.metric)
+        return self._top_k(distances, np.broadcast_to(slots, distances.shape), k)
+
+    def _indexed_kneighbors(self, X_test, k, scale):
+        queries_index = (X_test - self._index_mean) / self._index_scale
+        queries = X_test / scale
+
+        buffer_slots = np.arange(self._n_indexed, self._n_slots)
+        buffer_slots = buffer_slots[self._alive[buffer_slots]]
+        buffer_rows = self._X[buffer_slots] / scale
+
+        # Tahap 1: kandidat dari index (ditambah jumlah tombstone) + buffer untuk batas jarak ke-k
+        n_candidates = min(k + self._indexed_dead, self._n_indexed)
+        _, first = self._tree.query(queries_index, k=n_candidates) if n_candidates else (None, None)
+        ratio_min = (self._index_scale / scale).min()
+
+        bounds = np.empty(len(X_test))
+        for i in range(len(X_test)):
+            slots = first[i] if n_candidates else np.empty(0, dtype=np.int64)
+            slots = np.concatenate([slots[self._alive[slots]], buffer_slots])
+            distances = _row_distances(queries[i], self._X[slots] / scale, self.metric)
+            bounds[i] = np.partition(distances, k - 1)[k - 1]
+
+        # Tahap 2: semua tetangga sebenarnya ada dalam radius bound / ratio_min di ruang index
+        radius = bounds / ratio_min * (1 + 1e-9) + 1e-12
+        candidates = self._tree.query_radius(queries_index, r=radius) if self._n_indexed else None
+
+        result_distances = np.empty((len(X_test), k))
+        result_slots = np.empty((len(X_test), k), dtype=np.int64)
+        for i in range(len(X_test)):
+            slots = candidates[i] if candidates is not None else np.empty(0, dtype=np.int64)
+            slots = np.concatenate([slots[self._alive[slots]], buffer_slots])
+            distances = _row_distances(queries[i], self._X[slots] / scale, self.metric)
+            top_distances, top_slots = self._top_k(distances[None, :], slots[None, :], k)
+            result_distances[i] = top_distances[0]
+            result_slots[i] = top_slots[0]
+
+        return result_distances, result_slots
+
+    def _top_k(self, distances, slots, k):
+        # Urut berdasarkan (jarak, row_id) agar jarak yang sama berurutan seperti
+        # training ulang dengan baris terurut row_id
+        order = np.lexsort((self._row_ids[slots], distances), axis=1)[:, :k]
+        return (np.take_along_axis(distances, order, axis=1),
+                np.take_along_axis(np.asarray(slots), order, axis=1))
+
+
+@contextmanager
+def _transaction(conn):
+    # BEGIN IMMEDIATE mengambil write lock di awal, sehingga perubahan dataset dari
+    # semua worker diterapkan berurutan
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+class MutableDatasetRegistry:
+    """
+    Registry MutableDataset yang dibuat lewat API, dibagi semua worker lewat SQLite
+
+    Salinan di memori worker adalah cache LRU dengan batas byte; dataset yang di-evict
+    dari memori dimuat ulang dari SQLite saat dipakai lagi.
+    """
+
+    def __init__(self, path=DEFAULT_DB, max_datasets=DEFAULT_MAX_DATASETS,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path: File database SQLite (dibagi semua proses)
+            max_datasets: Jumlah maksimum dataset yang disimpan di SQLite
+            max_bytes: Batas memori salinan dataset di proses ini
+        """
+        self.path = path
+        self.max_datasets = max_datasets
+        self.max_bytes = max_bytes
+        # dataset_id -> (versi, MutableDataset)
+        self._datasets = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reloads = 0
+        self.evictions = 0
+
+    def create(self, train_data, train_labels, k=3, metric='euclidean', weights='uniform'):
+        """
+        Buat dataset baru dari data awal
+
+        Returns:
+            tuple: (dataset_id, MutableDataset, row_ids)
+        """
+        X_train = np.asarray(train_data, dtype=np.float64)
+        if X_train.ndim != 2 or len(X_train) == 0:
+            raise ValueError("train_data harus berupa matriks yang tidak kosong.")
+
+        dataset = MutableDataset(X_train.shape[1], k=k, metric=metric, weights=weights)
+        row_ids = dataset.append(X_train, list(train_labels))
+        dataset_id = uuid.uuid4().hex
+        params = {'n_features': dataset.n_features, 'k': k, 'metric': metric,
+                  'weights': weights}
+
+        conn = self._db()
+        with _transaction(conn):
+            conn.execute(
+                'INSERT INTO mutable_datasets (dataset_id, params, version, next_row_id, '
+                'accessed_at) VALUES (?, ?, 1, ?, ?)',
+                (dataset_id, json.dumps(params), dataset._next_row_id, time.time())
+            )
+            self._write_rows(conn, dataset_id, dataset, row_ids)
+            self._prune(conn)
+        self._cache(dataset_id, 1, dataset)
+        return dataset_id, dataset, row_ids
+
+    def get(self, dataset_id):
+        """
+        Ambil dataset versi terakhir, atau None jika tidak ada / sudah dihapus
+
+        Salinan di memori dimuat ulang dari SQLite jika worker lain sudah mengubahnya.
+        """
+        conn = self._db()
+        meta = self._meta(conn, dataset_id)
+        if meta is None:
+            self._forget(dataset_id)
+            return None
+        if time.time() - meta['accessed_at'] > _TOUCH_SECONDS:
+            conn.execute('UPDATE mutable_datasets SET accessed_at = ? WHERE dataset_id = ?',
+                         (time.time(), dataset_id))
+        return self._synced(conn, dataset_id, meta)
+
+    def append(self, dataset_id, rows, labels):
+        """
+        Tambah baris ke dataset
+
+        Returns:
+            tuple: (row_ids baris baru, jumlah baris dataset)
+
+        Raises:
+            KeyError: Jika dataset tidak ditemukan
+        """
+        def apply(dataset):
+            row_ids = dataset.append(rows, labels)
+            return (row_ids, dataset.n_rows), row_ids, []
+        return self._mutate(dataset_id, apply)
+
+    def update(self, dataset_id, row_id, features=None, label=None):
+        """
+        Ubah fitur dan/atau label satu baris (lihat MutableDataset.update)
+
+        Returns:
+            int: Jumlah baris dataset
+
+        Raises:
+            KeyError: Jika dataset atau row tidak ditemukan
+        """
+        def apply(dataset):
+            dataset.update(row_id, features=features, label=label)
+            return dataset.n_rows, [row_id], []
+        return self._mutate(dataset_id, apply)
+
+    def delete_row(self, dataset_id, row_id):
+        """
+        Hapus satu baris berdasarkan row_id
+
+        Returns:
+            int: Jumlah baris dataset
+
+        Raises:
+            KeyError: Jika dataset atau row tidak ditemukan
+        """
+        def apply(dataset):
+            dataset.delete(row_id)
+            return dataset.n_rows, [], [row_id]
+        return self._mutate(dataset_id, apply)
+
+    def remove(self, dataset_id):
+        """Hapus dataset; True jika ditemukan"""
+        conn = self._db()
+        with _transaction(conn):
+            removed = conn.execute('DELETE FROM mutable_datasets WHERE dataset_id = ?',
+                                   (dataset_id,)).rowcount
+            conn.execute('DELETE FROM mutable_dataset_rows WHERE dataset_id = ?', (dataset_id,))
+        self._forget(dataset_id)
+        return removed > 0
+
+    def stats(self):
+        """Statistik registry (dataset di SQLite dan salinan di memori proses ini)"""
+        stored = self._db().execute('SELECT COUNT(*) FROM mutable_datasets').fetchone()[0]
+        with self._lock:
+            return {
+                'datasets': stored,
+                'max_datasets': self.max_datasets,
+                'cached': len(self._datasets),
+                'cached_bytes': sum(dataset.nbytes for _, dataset in self._datasets.values()),
+                'max_bytes': self.max_bytes,
+                'reloads': self.reloads,
+                'evictions': self.evictions
+            }
+
+    def _db(self):
+        # Satu koneksi per thread; koneksi SQLite tidak boleh dipakai lintas fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _meta(conn, dataset_id):
+        return conn.execute(
+            'SELECT params, version, next_row_id, accessed_at FROM mutable_datasets '
+            'WHERE dataset_id = ?', (dataset_id,)
+        ).fetchone()
+
+    def _synced(self, conn, dataset_id, meta):
+        """Salinan dataset di memori dengan versi meta, dimuat ulang jika perlu"""
+        with self._lock:
+            cached = self._datasets.get(dataset_id)
+            if cached is not None and cached[0] == meta['version']:
+                self._datasets.move_to_end(dataset_id)
+                return cached[1]
+
+        params = json.loads(meta['params'])
+        row_ids, features, labels = [], [], []
+        for row in conn.execute(
+                'SELECT row_id, features, label FROM mutable_dataset_rows '
+                'WHERE dataset_id = ? ORDER BY row_id', (dataset_id,)):
+            row_ids.append(row['row_id'])
+            features.append(row['features'])
+            labels.append(json.loads(row['label']))
+        X = np.frombuffer(b''.join(features), dtype=np.float64).reshape(
+            len(row_ids), params['n_features'])
+        dataset = MutableDataset.from_rows(params.pop('n_features'), X, labels, row_ids,
+                                           meta['next_row_id'], **params)
+        with self._lock:
+            self.reloads += 1
+        self._cache(dataset_id, meta['version'], dataset)
+        return dataset
+
+    def _mutate(self, dataset_id, apply):
+        # apply(dataset) -> (hasil, row_id yang ditulis ulang, row_id yang dihapus)
+        conn = self._db()
+        try:
+            with _transaction(conn):
+                meta = self._meta(conn, dataset_id)
+                if meta is None:
+                    raise KeyError(f"Dataset {dataset_id} tidak ditemukan.")
+                dataset = self._synced(conn, dataset_id, meta)
+                result, written, deleted = apply(dataset)
+                self._write_rows(conn, dataset_id, dataset, written)
+                conn.executemany(
+                    'DELETE FROM mutable_dataset_rows WHERE dataset_id = ? AND row_id = ?',
+                    [(dataset_id, int(row_id)) for row_id in deleted]
+                )
+                conn.execute(
+                    'UPDATE mutable_datasets SET version = version + 1, next_row_id = ?, '
+                    'accessed_at = ? WHERE dataset_id = ?',
+                    (dataset._next_row_id, time.time(), dataset_id)
+                )
+        except BaseException:
+            # Salinan di memori mungkin sudah berubah tanpa tersimpan: muat ulang nanti
+            self._forget(dataset_id)
+            raise
+        self._cache(dataset_id, meta['version'] + 1, dataset)
+        return result
+
+    @staticmethod
+    def _write_rows(conn, dataset_id, dataset, row_ids):
+        if not len(row_ids):
+            return
+        X, labels = dataset.rows_by_id(row_ids)
+        conn.executemany(
+            'INSERT OR REPLACE INTO mutable_dataset_rows (dataset_id, row_id, features, label) '
+            'VALUES (?, ?, ?, ?)',
+            [(dataset_id, int(row_id), row.tobytes(), json.dumps(label))
+             for row_id, row, label in zip(row_ids, X, labels)]
+        )
+
+    def _prune(self, conn):
+        # Dipanggil di dalam transaksi; dataset yang paling lama tidak dipakai dihapus
+        stale = [row['dataset_id'] for row in conn.execute(
+            'SELECT dataset_id FROM mutable_datasets ORDER BY accessed_at DESC '
+            'LIMIT -1 OFFSET ?', (self.max_datasets,)
+        )]
+        for dataset_id in stale:
+            conn.execute('DELETE FROM mutable_datasets WHERE dataset_id = ?', (dataset_id,))
+            conn.execute('DELETE FROM mutable_dataset_rows WHERE dataset_id = ?', (dataset_id,))
+            self._forget(dataset_id)
+
+    def _cache(self, dataset_id, version, dataset):
+        with self._lock:
+            self._datasets[dataset_id] = (version, dataset)
+            self._datasets.move_to_end(dataset_id)
+            # Evict salinan yang paling lama tidak dipakai sampai muat di budget; salinan
+            # terbaru selalu disimpan
+            total = sum(cached.nbytes for _, cached in self._datasets.values())
+            while total > self.max_bytes and len(self._datasets) > 1:
+                _, (_, evicted) = self._datasets.popitem(last=False)
+                total -= evicted.nbytes
+                self.evictions += 1
+
+    def _forget(self, dataset_id):
+        with self._lock:
+            self._datasets.pop(dataset_id, None)
+
+
+# Registry default yang dipakai oleh Flask app
+mutable_datasets = MutableDatasetRegistry()
@@ -0,0 +1,548 @@
+"""
+Sharded exact KNN: data training dibagi ke beberapa proses shard.
+
+Setiap shard menyimpan potongan baris berurutan beserta index NearestNeighbors
+sendiri di proses yang hidup selama model dipakai. Query dikirim ke semua shard
+sekaligus, setiap shard mengembalikan top-k lokal (jarak dan indeks global), lalu
+koordinator menggabungkan kandidat menjadi top-k global sebelum voting dan
+perhitungan probabilitas.
+
+Setiap shard mencari secara exact dengan algoritma yang sama seperti model tanpa
+sharding, dan batas shard mengikuti blok perkalian matriks sklearn, jadi jarak
+identik dengan KNeighborsClassifier. Jika beberapa titik training berjarak persis
+sama di batas tetangga ke-k (umum pada fitur integer/skala Likert), anggota
+kelompok yang masuk ke K tetangga bergantung pada urutan traversal tree sklearn.
+Karena itu setiap shard mengembalikan k+1 kandidat, dan baris yang tetangga ke-k
+dan ke-(k+1) hasil gabungannya berjarak sama dicari ulang dengan index exact atas
+seluruh data, sehingga jarak, himpunan tetangga, probabilitas dan prediksi sama
+persis dengan backend 'exact'; hanya urutan tetangga berjarak sama di dalam top-k
+yang bisa berbeda.
+
+Koordinator tidak memegang salinan privat data training. Data dibaca dari file
+.npy yang dibuka memory-mapped: file DatasetStore jika data training berasal dari
+sana, atau file sementara milik model (KNN_SHARD_DATA_DIR) jika tidak. Proses shard
+membuka potongannya dari file yang sama, jadi shard bisa dibuat ulang (setelah fork
+atau jika proses shard mati) tanpa salinan data di worker.
+
+Jumlah shard diatur lewat n_shards atau KNN_SHARDS (default: jumlah core yang
+tersedia). Shard berisi kurang dari min_shard_rows baris tidak dibuat; dengan satu
+shard pencarian dijalankan inline tanpa proses tambahan. Total proses shard di satu
+host (semua model di semua worker gunicorn) dibatasi KNN_MAX_SHARD_PROCESSES lewat
+file slot yang dikunci flock di KNN_SHARD_SLOTS_DIR; model yang tidak mendapat slot
+memakai lebih sedikit shard atau mencari inline.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import weakref
+
+try:
+    import fcntl
+except ImportError:  # Windows: batas proses shard hanya berlaku per proses
+    fcntl = None
+
+import numpy as np
+from sklearn import get_config
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.neighbors import VALID_METRICS, NearestNeighbors
+
+from .dataset_store import is_memory_mapped
+from .executor import available_cores, split_rows
+from .knn_sweep import _boundary_ties, neighbor_class_probabilities
+
+
+# Di bawah jumlah baris ini per shard, biaya kirim query lebih besar dari manfaatnya
+MIN_SHARD_ROWS = int(os.environ.get('KNN_MIN_SHARD_ROWS', 2048))
+
+
+# Batas total proses shard per host, dibagi semua model dan worker gunicorn
+MAX_SHARD_PROCESSES = int(os.environ.get('KNN_MAX_SHARD_PROCESSES', available_cores()))
+
+SLOTS_DIR = os.environ.get('KNN_SHARD_SLOTS_DIR',
+                           os.path.join(tempfile.gettempdir(), 'rcount-shard-slots'))
+
+# File .npy sementara untuk data training yang tidak berasal dari DatasetStore
+DATA_DIR = os.environ.get('KNN_SHARD_DATA_DIR',
+                          os.path.join(tempfile.gettempdir(), 'rcount-shard-data'))
+
+# Slot yang dipegang proses ini, untuk platform tanpa fcntl
+_local_slots = set()
+_local_slots_lock = threading.Lock()
+
+
+def _default_shards():
+    return int(os.environ.get('KNN_SHARDS', available_cores()))
+
+
+def acquire_shard_slots(n_slots, max_processes=MAX_SHARD_PROCESSES, directory=SLOTS_DIR):
+    """
+    Ambil sampai n_slots slot proses shard dari batas per host
+
+    Setiap slot adalah file slot-<i> yang dikunci flock selama shard berjalan; kunci
+    otomatis dilepas kernel jika proses pemegangnya mati.
+
+    Returns:
+        list: Handle slot (bisa lebih sedikit dari n_slots), lepas dengan release_shard_slots
+    """
+    slots = []
+    if fcntl is None:
+        with _local_slots_lock:
+            for index in range(max_processes):
+                if len(slots) == n_slots:
+                    break
+                if index not in _local_slots:
+                    _local_slots.add(index)
+                    slots.append(index)
+        return slots
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return slots
+    for index in range(max_processes):
+        if len(slots) == n_slots:
+            break
+        try:
+            handle = open(os.path.join(directory, f'slot-{index}'), 'a')
+        except OSError:
+            continue
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        slots.append(handle)
+    return slots
+
+
+def release_shard_slots(slots):
+    """Lepas slot dari acquire_shard_slots"""
+    for slot in slots:
+        if fcntl is None:
+            with _local_slots_lock:
+                _local_slots.discard(slot)
+        else:
+            slot.close()
+    slots.clear()
+
+
+def search_algorithm(n_samples, n_features, n_neighbors, metric):
+    """
+    Algoritma pencarian yang dipilih sklearn ('auto') untuk seluruh training set
+
+    Shard memakai pilihan ini (bukan 'auto' per shard) agar jarak dihitung dengan
+    cara yang sama seperti model tanpa sharding.
+    """
+    if n_features > 15 or n_neighbors >= n_samples // 2:
+        return 'brute'
+    if metric in VALID_METRICS['kd_tree']:
+        return 'kd_tree'
+    if metric in VALID_METRICS['ball_tree']:
+        return 'ball_tree'
+    return 'brute'
+
+
+def shard_bounds(n_samples, n_shards):
+    """
+    Batas (lo, hi) baris setiap shard
+
+    Batas diletakkan di kelipatan pairwise_dist_chunk_size sklearn, sehingga
+    blok perkalian matriks pada pencarian brute euclidean sama dengan blok
+    pada data utuh dan jarak yang dihasilkan identik sampai bit terakhir.
+    """
+    block = get_config()['pairwise_dist_chunk_size']
+    n_blocks = -(-n_samples // block)
+    return [
+        (int(chunk[0]) * block, min(n_samples, (int(chunk[-1]) + 1) * block))
+        for chunk in split_rows(np.arange(n_blocks), n_shards)
+    ]
+
+
+def memmap_source(X):
+    """
+    (filename, offset) file .npy yang berisi seluruh array X secara memory-mapped
+
+    Returns:
+        tuple atau None jika X bukan view utuh dari np.memmap float64 C-contiguous
+    """
+    base = X
+    while base is not None and not isinstance(base, np.memmap):
+        base = getattr(base, 'base', None)
+    if (base is None or getattr(base, 'filename', None) is None
+            or base.dtype != np.float64 or not base.flags.c_contiguous
+            or base.shape != X.shape
+            or base.__array_interface__['data'][0] != X.__array_interface__['data'][0]):
+        return None
+    return base.filename, base.offset
+
+
+def _shard_worker(conn, filename, offset, shape, lo, hi, metric, algorithm):
+    # Dijalankan di proses shard: satu thread BLAS agar shard tidak saling berebut core
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(1)
+
+    # Potongan dibaca langsung dari file; index sklearn memakai array tanpa menyalin
+    X = np.memmap(filename, dtype=np.float64, mode='r', offset=offset, shape=shape)[lo:hi]
+    index = NearestNeighbors(metric=metric, algorithm=algorithm).fit(X)
+    del X
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        queries, k = message
+        try:
+            distances, indices = index.kneighbors(queries, n_neighbors=min(k, index.n_samples_fit_))
+            conn.send((distances, indices + lo))
+        except Exception as exc:
+            conn.send(exc)
+    conn.close()
+
+
+def _remove_file(path, owner_pid):
+    # File data sementara hanya dihapus oleh proses pemiliknya (bukan salinan hasil fork)
+    if os.getpid() == owner_pid:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _stop_shards(shards, slots, owner_pid):
+    # Dipanggil saat model di-garbage-collect, close() atau shard dibuat ulang
+    if os.getpid() != owner_pid:
+        # Salinan hasil fork: proses shard dan slot tetap milik proses parent
+        shards.clear()
+        slots.clear()
+        return
+    for process, conn in shards:
+        try:
+            conn.send(None)
+        except (OSError, ValueError):
+            pass
+        conn.close()
+    for process, _ in shards:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    shards.clear()
+    release_shard_slots(slots)
+
+
+def merge_neighbors(distances, indices, k):
+    """
+    Gabungkan kandidat dari semua shard menjadi top-k global
+
+    Args:
+        distances: List array jarak (n_queries, k_lokal) per shard
+        indices: List array indeks global (n_queries, k_lokal) per shard
+        k: Jumlah tetangga global
+
+    Returns:
+        tuple: (distances, indices) berukuran (n_queries, k), urut berdasarkan
+            (jarak, indeks). Kandidat berjarak sama di batas ke-k dipilih dari indeks
+            terkecil; ShardedKNeighborsClassifier meminta k+1 kandidat dan mencari
+            ulang baris seperti ini dengan index exact.
+    """
+    distances = np.hstack(distances)
+    indices = np.hstack(indices)
+    order = np.lexsort((indices, distances), axis=-1)[:, :k]
+    return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
+
+
+class ShardedKNeighborsClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Klasifikasi KNN exact dengan data training tersebar di proses shard,
+    antarmuka sama dengan KNeighborsClassifier (fit, kneighbors, predict,
+    predict_proba, classes_).
+
+    Parameter:
+        n_neighbors: Jumlah tetangga
+        metric: Metrik jarak
+        weights: 'uniform' atau 'distance'
+        n_shards: Jumlah shard (default: KNN_SHARDS atau jumlah core), dibatasi
+            slot proses shard yang tersedia di host (KNN_MAX_SHARD_PROCESSES)
+        min_shard_rows: Jumlah baris minimum per shard
+    """
+
+    def __init__(self, n_neighbors=5, metric='euclidean', weights='uniform', n_shards=None,
+                 min_shard_rows=MIN_SHARD_ROWS):
+        self.n_neighbors = n_neighbors
+        self.metric = metric
+        self.weights = weights
+        self.n_shards = n_shards
+        self.min_shard_rows = min_shard_rows
+
+    def fit(self, X, y):
+        """
+        Bagi data training ke shard dan jalankan proses shard
+
+        Args:
+            X: Training features (n_samples, n_features)
+            y: Training labels
+
+        Returns:
+            self
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim != 2 or len(X) == 0:
+            raise ValueError("Data training harus berupa matriks yang tidak kosong.")
+
+        self.close()
+        self.classes_, self._y = np.unique(np.asarray(y), return_inverse=True)
+        n_samples = len(X)
+        n_shards = int(self.n_shards or _default_shards())
+        if n_shards < 1:
+            raise ValueError("n_shards harus >= 1.")
+        n_shards = max(1, min(n_shards, n_samples // max(1, self.min_shard_rows)))
+
+        self.algorithm_ = search_algorithm(n_samples, X.shape[1], self.n_neighbors, self.metric)
+        self.n_samples_fit_ = n_samples
+        self.n_features_in_ = X.shape[1]
+        # Dengan lebih dari satu shard, X diganti versi memory-mapped di _start_shards
+        self._fit_X = X
+        self._planned_shards = n_shards
+        self._lock = threading.Lock()
+        self._shards = []
+        self._shards_pid = None
+        self._finalizer = None
+        self._data_file = None
+        self._local_index = None
+        self._exact_index = None
+        if n_shards == 1:
+            self._search_inline()
+        else:
+            with self._lock:
+                self._start_shards()
+        return self
+
+    @property
+    def n_shards_(self):
+        """Jumlah shard yang benar-benar dipakai"""
+        return len(self.shard_bounds_)
+
+    @property
+    def training_data(self):
+        """Data training (memory-mapped jika proses shard berjalan)"""
+        return self._fit_X
+
+    @property
+    def index_nbytes(self):
+        """
+        Perkiraan memori privat di proses koordinator (label, index inline/exact)
+
+        Data training yang memory-mapped dan memori proses shard tidak dihitung.
+        """
+        nbytes = self._y.nbytes
+        if not is_memory_mapped(self._fit_X):
+            nbytes += self._fit_X.nbytes
+        for index in (self._local_index, self._exact_index):
+            tree = getattr(index, '_tree', None)
+            if tree is not None:
+                nbytes += sum(array.nbytes for array in tree.get_arrays()
+                              if not is_memory_mapped(array))
+        return int(nbytes)
+
+    def _search_inline(self):
+        self.shard_bounds_ = shard_bounds(self.n_samples_fit_, 1)
+        self._local_index = NearestNeighbors(metric=self.metric,
+                                             algorithm=self.algorithm_).fit(self._fit_X)
+
+    def _start_shards(self):
+        # Dipanggil dengan lock
+        slots = acquire_shard_slots(self._planned_shards)
+        bounds = shard_bounds(self.n_samples_fit_, max(1, len(slots)))
+        release_shard_slots(slots[len(bounds):])
+        del slots[len(bounds):]
+        if len(bounds) < 2:
+            # Batas proses shard per host sudah tercapai: cari inline di proses ini
+            release_shard_slots(slots)
+            self._search_inline()
+            return
+
+        try:
+            filename, offset = self._shared_data()
+        except BaseException:
+            release_shard_slots(slots)
+            raise
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        shards = []
+        self._finalizer = weakref.finalize(self, _stop_shards, shards, slots, os.getpid())
+        self.shard_bounds_ = bounds
+        for lo, hi in bounds:
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_shard_worker,
+                args=(child_conn, filename, offset, self._fit_X.shape, lo, hi, self.metric,
+                      self.algorithm_),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            shards.append((process, parent_conn))
+        self._shards = shards
+        self._shards_pid = os.getpid()
+
+    def _shared_data(self):
+        """
+        (filename, offset) data training memory-mapped untuk proses shard
+
+        Data yang belum ada di file (tidak berasal dari DatasetStore, atau file-nya
+        sudah dihapus eviction) ditulis sekali ke file sementara milik model, lalu
+        _fit_X diganti versi memory-mapped dari file tersebut.
+        """
+        source = memmap_source(self._fit_X)
+        if source is not None and os.path.exists(source[0]):
+            return source
+
+        os.makedirs(DATA_DIR, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=DATA_DIR, prefix='shard-', suffix='.npy')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                np.save(handle, np.ascontiguousarray(self._fit_X))
+            X = np.load(path, mmap_mode='r')
+        except BaseException:
+            _remove_file(path, os.getpid())
+            raise
+        if self._data_file is not None:
+            self._data_file()
+        self._data_file = weakref.finalize(self, _remove_file, path, os.getpid())
+        self._fit_X = X
+        self._exact_index = None
+        return memmap_source(X)
+
+    def _exact_neighbors(self, X, k):
+        # Index exact atas seluruh data (memory-mapped) untuk baris dengan jarak sama
+        # di batas ke-k; dibuat saat pertama dibutuhkan
+        with self._lock:
+            if self._exact_index is None:
+                self._exact_index = NearestNeighbors(
+                    metric=self.metric, algorithm=self.algorithm_
+                ).fit(self._fit_X)
+            index = self._exact_index
+        return index.kneighbors(X, n_neighbors=k)
+
+    def _stop(self):
+        # Dipanggil dengan lock (atau dari close())
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._shards = []
+        self._shards_pid = None
+
+    def _shard_connections(self):
+        # Dipanggil dengan lock; shard tidak diwariskan lewat fork dan dibuat ulang jika
+        # mati. Cek pid harus lebih dulu: is_alive() hanya boleh dari proses parent.
+        if (self._shards_pid != os.getpid()
+                or not all(process.is_alive() for process, _ in self._shards)):
+            self._stop()
+            self._start_shards()
+        return [conn for _, conn in self._shards]
+
+    def _query_shards(self, X, k):
+        """
+        Kirim query ke semua shard dan gabungkan hasilnya
+
+        Returns:
+            tuple: (distances, indices), atau None jika model beralih ke pencarian
+                inline karena tidak mendapat slot proses shard
+        """
+        with self._lock:
+            for attempt in range(2):
+                if self._local_index is not None:
+                    return None
+                connections = self._shard_connections()
+                if self._local_index is not None:
+                    return None
+                try:
+                    for conn in connections:
+                        conn.send((X, k))
+                    # Semua balasan dibaca dulu agar pipe tetap sinkron meskipun ada
+                    # shard yang gagal mencari
+                    replies = [conn.recv() for conn in connections]
+                    break
+                except (EOFError, OSError) as exc:
+                    # Shard mati atau pipe putus di tengah query: sisa pipe tidak lagi
+                    # sinkron, jadi semua shard dihentikan lalu dibuat ulang sekali
+                    self._stop()
+                    if attempt:
+                        raise RuntimeError("Proses shard KNN berhenti tiba-tiba.") from exc
+
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        return merge_neighbors([reply[0] for reply in replies],
+                               [reply[1] for reply in replies], k)
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        """
+        Cari tetangga terdekat di semua shard
+
+        Returns:
+            tuple: (distances, indices) dengan indeks ke data training asli,
+                atau indices saja jika return_distance=False
+        """
+        if X is None:
+            raise ValueError("X wajib diisi untuk sharded backend.")
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        k = n_neighbors or self.n_neighbors
+        if k > self.n_samples_fit_:
+            raise ValueError(
+                f"n_neighbors ({k}) lebih besar dari jumlah data training ({self.n_samples_fit_})."
+            )
+
+        # Satu kandidat tambahan untuk mendeteksi jarak sama di batas ke-k
+        n_candidates = min(k + 1, self.n_samples_fit_)
+        result = None if self._local_index is not None else self._query_shards(X, n_candidates)
+        if result is None:
+            distances, indices = self._local_index.kneighbors(X, n_neighbors=k)
+        else:
+            distances, indices = result
+            ties = _boundary_ties(distances, k)
+            distances, indices = distances[:, :k], indices[:, :k]
+            if ties.any():
+                distances[ties], indices[ties] = self._exact_neighbors(X[ties], k)
+
+        if return_distance:
+            return distances, indices
+        return indices
+
+    def predict_proba(self, X):
+        """Probabilitas kelas dari tetangga global"""
+        distances, indices = self.kneighbors(X)
+        return neighbor_class_probabilities(distances, indices, self._y, len(self.classes_),
+                                            self.weights)
+
+    def predict(self, X):
+        """Label prediksi dari tetangga global"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def close(self):
+        """Hentikan proses shard (dibuat ulang otomatis saat query berikutnya)"""
+        if getattr(self, '_lock', None) is None:
+            return
+        with self._lock:
+            self._stop()
+
+    def __getstate__(self):
+        # Proses, pipe, slot dan lock tidak ikut di-pickle; shard dibuat ulang di proses tujuan
+        state = self.__dict__.copy()
+        for key in ('_lock', '_shards', '_shards_pid', '_finalizer', '_data_file',
+                    '_exact_index'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'shard_bounds_' in state:
+            self._lock = threading.Lock()
+            self._shards = []
+            self._shards_pid = None
+            self._finalizer = None
+            self._data_file = None
+            self._exact_index = None
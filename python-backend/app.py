@@ -2,76 +2,206 @@
 Flask REST API Server untuk KNN dan Fuzzy Logic algorithms
 """
 
-from flask import Flask, request, jsonify
+from flask import (
+    Blueprint, Flask, Response, current_app, request, jsonify, send_file, stream_with_context
+)
 from flask_cors import CORS
 import sys
 import os
-import io
-import re
-
-# New imports for parsing
-import PyPDF2
-from docx import Document
+import json
 
 # Add algorithms directory to path
 sys.path.append(os.path.dirname(__file__))
 
-from algorithms.knn import calculate_knn, KNNAlgorithm
-from algorithms.fuzzy_logic import simple_fuzzy_inference, FuzzyLogicSystem
+from algorithms.knn import (
+    calculate_knn, parse_prediction_format, training_metrics_cache_stats, KNNAlgorithm
+)
+from algorithms.model_registry import model_registry
+from algorithms.mutable_dataset import mutable_datasets
+from algorithms.fuzzy_logic import simple_fuzzy_inference, simple_fuzzy_inference_batch
+from algorithms.fuzzy_cache import fuzzy_system_cache
+from algorithms.fuzzy_surface import surface_from_option
+from algorithms.instrumentation import install_flask_hooks, metrics, stage
+from dataset_codec import decode_array_upload
+from parsing import iter_document_rows
+from parse_cache import parse_cache, parse_cache_key
+from jobs import QueueFull, job_queue
+from profiling import install_profiling_hooks, list_profiles, profile_paths
+from responses import install_response_encoding
+
+api = Blueprint('api', __name__)
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS untuk Next.js
 
-@app.route('/api/parse', methods=['POST'])
+def create_app(warm_up=False):
+    """
+    Buat Flask app dengan semua endpoint API
+    
+    Args:
+        warm_up: True jika warm-up akan dijalankan sebelum worker melayani
+                 request (lihat warmup.py); /api/health mengembalikan 503
+                 sampai warm-up selesai
+    
+    Returns:
+        Flask: Instance app
+    """
+    app = Flask(__name__)
+    app.config['READY'] = not warm_up
+    CORS(app)  # Enable CORS untuk Next.js
+    app.register_blueprint(api)
+    install_response_encoding(app)
+    install_flask_hooks(app)
+    install_profiling_hooks(app)
+    return app
+
+@api.route('/api/parse', methods=['POST'])
 def parse_file():
+    """
+    Endpoint untuk ekstraksi data dari upload PDF/DOCX/teks
+    
+    Form data:
+        file: File yang di-upload
+        stream: "1" untuk response NDJSON (opsional, bisa juga lewat query
+                string ?stream=1 atau header Accept: application/x-ndjson)
+    
+    Mode NDJSON mengirim satu baris JSON per data yang ditemukan, diakhiri
+    {"done": true, "count": n}, sehingga client menerima hasil bertahap.
+    
+    Hasil di-cache berdasarkan SHA-256 isi file (lihat parse_cache.py); upload
+    ulang file yang sama tidak diparse lagi dan response berisi "cached": true.
+    """
     if 'file' not in request.files:
         return jsonify({"error": "No file part"}), 400
     file = request.files['file']
-    filename = file.filename.lower()
-    content = ""
+    filename = file.filename or ''
+    
+    # file.stream di-spool ke disk oleh Werkzeug untuk file besar, jadi hash
+    # dihitung per blok lalu stream dikembalikan ke awal untuk parser
+    with stage('parse_cache'):
+        cache_key = parse_cache_key(file.stream, filename)
+        cached_rows = parse_cache.get(cache_key)
+    
+    if cached_rows is not None:
+        if _wants_ndjson():
+            return Response(
+                stream_with_context(_ndjson_rows(iter(cached_rows), cached=True)),
+                mimetype='application/x-ndjson'
+            )
+        with stage('response'):
+            return jsonify({"success": True, "extracted": cached_rows,
+                            "count": len(cached_rows), "cached": True})
+    
+    # PDF besar diekstrak paralel per rentang halaman (lihat parsing.py)
+    rows = iter_document_rows(file.stream, filename)
+    
+    if _wants_ndjson():
+        rows = _caching_rows(rows, cache_key)
+        return Response(
+            stream_with_context(_ndjson_rows(rows, cached=False)),
+            mimetype='application/x-ndjson'
+        )
+    
     try:
-        if filename.endswith('.pdf'):
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
-            for page in pdf_reader.pages:
-                content += page.extract_text() + "\n"
-        elif filename.endswith('.docx'):
-            doc = Document(io.BytesIO(file.read()))
-            for para in doc.paragraphs:
-                content += para.text + "\n"
-        else:
-            content = file.read().decode('utf-8', errors='ignore')
-        extracted = extract_data_from_text(content)
-        return jsonify({"success": True, "extracted": extracted, "count": len(extracted)})
+        extracted = list(rows)
+        parse_cache.put(cache_key, extracted)
+        with stage('response'):
+            return jsonify({"success": True, "extracted": extracted, "count": len(extracted),
+                            "cached": False})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-# Helper to extract data from text using regex
-def extract_data_from_text(text):
-    data = []
-    lines = text.split('\n')
-    for line in lines:
-        # Match pattern like: 10, 20, 30, Label or 10.5 20.3 30.1 A
-        match = re.search(r'(\d+[\.\d]*)\D+(\d+[\.\d]*)\D+(\d+[\.\d]*)\D+([A-Za-z0-9]+)', line)
-        if match:
-            data.append({
-                "features": [float(match.group(1)), float(match.group(2)), float(match.group(3))],
-                "label": match.group(4)
-            })
-    return data
+
+def _wants_ndjson():
+    flag = request.args.get('stream') or request.form.get('stream')
+    if flag is not None:
+        return flag.lower() in ('1', 'true', 'yes')
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
+
+def _caching_rows(rows, cache_key):
+    # Hasil hanya disimpan jika dokumen selesai diparse tanpa error dan client
+    # tidak memutus koneksi di tengah stream
+    extracted = []
+    for row in rows:
+        extracted.append(row)
+        yield row
+    parse_cache.put(cache_key, extracted)
+
+
+def _ndjson_rows(rows, cached=False):
+    count = 0
+    try:
+        for row in rows:
+            count += 1
+            yield json.dumps(row) + '\n'
+        yield json.dumps({"done": True, "count": count, "cached": cached}) + '\n'
+    except Exception as e:
+        # Header sudah terkirim, jadi error dilaporkan sebagai baris terakhir
+        yield json.dumps({"success": False, "error": str(e), "count": count}) + '\n'
 
 # Health check endpoint
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
+    """Health check endpoint (503 selama worker masih warm-up)"""
+    ready = current_app.config.get('READY', True)
+    response = {
+        'status': 'healthy' if ready else 'warming',
         'service': 'R-Count Python Backend',
-        'version': '1.0.0'
-    })
+        'version': '1.0.0',
+        'ready': ready
+    }
+    if 'WARMUP_SECONDS' in current_app.config:
+        response['warmup_seconds'] = current_app.config['WARMUP_SECONDS']
+    return jsonify(response), 200 if ready else 503
 
 
 # KNN Endpoints
-@app.route('/api/knn/calculate', methods=['POST'])
+def _knn_request_data():
+    """
+    Body request KNN sebagai dict.
+    
+    Selain JSON, endpoint KNN menerima multipart/form-data: field file
+    train_data/test_data berisi .npy atau RCDS, field file "dataset" berisi RCDS
+    berlabel (mengisi train_data dan train_labels), dan parameter lain sebagai
+    form field (nilai di-decode sebagai JSON jika memungkinkan).
+    """
+    if not request.files:
+        return request.get_json()
+    
+    data = {}
+    for field, value in request.form.items():
+        try:
+            data[field] = json.loads(value)
+        except ValueError:
+            data[field] = value
+    
+    for field, upload in request.files.items():
+        array, labels = decode_array_upload(upload.read())
+        if field == 'dataset':
+            if labels is None:
+                raise ValueError("Upload 'dataset' harus berupa RCDS dengan label.")
+            data['train_data'], data['train_labels'] = array, labels
+        elif field == 'train_data' and labels is not None:
+            data['train_data'], data['train_labels'] = array, labels
+        else:
+            data[field] = array
+    
+    return data
+
+
+def _prediction_format(data):
+    """
+    Pilihan format prediksi dari body atau query string
+    (?fields=prediction,confidence&layout=columnar)
+    
+    Raises:
+        ValueError: Jika fields atau layout tidak dikenal
+    """
+    fields = data.get('fields', request.args.get('fields'))
+    layout = data.get('layout', request.args.get('layout', 'records'))
+    return parse_prediction_format(fields, layout)
+
+
+@api.route('/api/knn/calculate', methods=['POST'])
 def knn_calculate():
     """
     Endpoint untuk perhitungan KNN
@@ -82,11 +212,32 @@ def knn_calculate():
         "train_labels": [...],
         "test_data": [[...], [...]],
         "k": 3,
-        "metric": "euclidean"
+        "metric": "euclidean",
+        "weights": "uniform",
+        "metrics_mode": "eager",
+        "backend": "exact",
+        "fields": ["prediction", "confidence"],
+        "layout": "records"
     }
+    
+    metrics_mode 'lazy' atau 'async' mengembalikan prediksi tanpa menunggu
+    cross-validation; metrics bisa diambil lewat /api/knn/models/<model_id>/metrics
+    
+    backend 'ann' memakai index approximate nearest neighbor untuk training set
+    besar; atur recall/kecepatan lewat "ann_params": {"n_probe": 8, "n_lists": ...}
+    
+    backend 'sharded' membagi data training ke beberapa proses shard (tetap exact;
+    prediksi dan probabilitas sama persis dengan 'exact');
+    jumlah shard lewat "n_shards" (opsional)
+    
+    fields (opsional) membatasi field per prediksi (prediction, confidence,
+    probabilities, nearest_neighbors; default semua). layout 'columnar'
+    mengembalikan predictions sebagai array paralel, bukan list of dict.
+    Keduanya juga bisa lewat query string.
     """
     try:
-        data = request.get_json()
+        with stage('json_decode'):
+            data = _knn_request_data()
         
         # Validasi input
         if not data:
@@ -103,23 +254,378 @@ def knn_calculate():
         test_data = data['test_data']
         k = data.get('k', 3)
         metric = data.get('metric', 'euclidean')
+        weights = data.get('weights', 'uniform')
+        metrics_mode = data.get('metrics_mode', 'eager')
         
         # Validasi ukuran data
         if len(train_data) != len(train_labels):
             return jsonify({'error': 'train_data dan train_labels harus sama panjang'}), 400
         
-        # Kalkulasi KNN
+        try:
+            fields, layout = _prediction_format(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Kalkulasi KNN (model dipakai ulang dari registry jika dataset sama)
         result = calculate_knn(
             train_data=train_data,
             train_labels=train_labels,
             test_data=test_data,
             k=k,
-            metric=metric
+            metric=metric,
+            weights=weights,
+            registry=model_registry,
+            metrics_mode=metrics_mode,
+            backend=data.get('backend', 'exact'),
+            ann_params=data.get('ann_params'),
+            n_shards=data.get('n_shards'),
+            fields=fields,
+            layout=layout
+        )
+        
+        with stage('response'):
+            return jsonify({
+                'success': True,
+                'data': result
+            })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/knn/models', methods=['POST'])
+def knn_register_model():
+    """
+    Endpoint untuk melatih dan mendaftarkan model KNN sekali saja
+    
+    Request body:
+    {
+        "train_data": [[...], [...]],
+        "train_labels": [...],
+        "k": 3,
+        "metric": "euclidean",
+        "weights": "uniform",
+        "metrics_mode": "eager",
+        "backend": "exact",
+        "ann_params": {"n_probe": 8}
+    }
+    """
+    try:
+        data = _knn_request_data()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        for field in ['train_data', 'train_labels']:
+            if field not in data:
+                return jsonify({'error': f'Missing required field: {field}'}), 400
+        
+        train_data = data['train_data']
+        train_labels = data['train_labels']
+        
+        if len(train_data) != len(train_labels):
+            return jsonify({'error': 'train_data dan train_labels harus sama panjang'}), 400
+        
+        metrics_mode = data.get('metrics_mode', 'eager')
+        entry, cached = model_registry.get_or_train(
+            train_data,
+            train_labels,
+            k=data.get('k', 3),
+            metric=data.get('metric', 'euclidean'),
+            weights=data.get('weights', 'uniform'),
+            metrics_mode=metrics_mode,
+            backend=data.get('backend', 'exact'),
+            ann_params=data.get('ann_params'),
+            n_shards=data.get('n_shards')
         )
         
+        if metrics_mode == 'eager':
+            training_metrics = entry.knn.get_training_metrics(wait=True)
+        else:
+            if metrics_mode == 'async':
+                entry.knn.start_training_metrics()
+            training_metrics = entry.training_metrics
+        
         return jsonify({
             'success': True,
-            'data': result
+            'data': {
+                'model_id': entry.model_id,
+                'cached': cached,
+                'training_metrics': training_metrics
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/knn/models/<model_id>', methods=['GET'])
+def knn_get_model(model_id):
+    """Endpoint untuk melihat info model yang terdaftar"""
+    entry = model_registry.get(model_id)
+    if entry is None:
+        return jsonify({'success': False, 'error': 'Model tidak ditemukan'}), 404
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            **entry.describe(),
+            'training_metrics': entry.training_metrics
+        }
+    })
+
+
+@api.route('/api/knn/models/<model_id>/metrics', methods=['GET'])
+def knn_model_metrics(model_id):
+    """
+    Endpoint untuk polling training metrics (cross-validation) sebuah model
+    
+    Query params:
+        wait: '1' untuk menunggu sampai metrics selesai dihitung
+    """
+    try:
+        entry = model_registry.get(model_id)
+        if entry is None:
+            return jsonify({'success': False, 'error': 'Model tidak ditemukan'}), 404
+        
+        knn = entry.knn
+        if request.args.get('wait') in ('1', 'true'):
+            training_metrics = knn.get_training_metrics(wait=True)
+        else:
+            # Polling pertama pada mode lazy memulai perhitungan di background
+            knn.start_training_metrics()
+            training_metrics = knn.get_training_metrics(wait=False)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'model_id': model_id,
+                'status': knn.metrics_status,
+                'training_metrics': training_metrics
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/knn/models/<model_id>', methods=['DELETE'])
+def knn_delete_model(model_id):
+    """Endpoint untuk menghapus model dari registry"""
+    if not model_registry.remove(model_id):
+        return jsonify({'success': False, 'error': 'Model tidak ditemukan'}), 404
+    
+    return jsonify({'success': True})
+
+
+@api.route('/api/knn/models/<model_id>/predict', methods=['POST'])
+def knn_predict_model(model_id):
+    """
+    Endpoint untuk prediksi dengan model yang sudah terdaftar
+    
+    Request body:
+    {
+        "test_data": [[...], [...]],
+        "fields": ["prediction", "confidence"],
+        "layout": "records"
+    }
+    
+    fields dan layout opsional, lihat /api/knn/calculate.
+    """
+    try:
+        data = _knn_request_data()
+        
+        if not data or 'test_data' not in data:
+            return jsonify({'error': 'Missing required field: test_data'}), 400
+        
+        try:
+            fields, layout = _prediction_format(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        entry = model_registry.get(model_id)
+        if entry is None:
+            # Model bisa sudah di-evict, client perlu mendaftarkan ulang
+            return jsonify({'success': False, 'error': 'Model tidak ditemukan'}), 404
+        
+        predictions = entry.knn.predict(data['test_data'], fields=fields, layout=layout)
+        
+        with stage('response'):
+            return jsonify({
+                'success': True,
+                'data': {
+                    'model_id': model_id,
+                    **predictions
+                }
+            })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/knn/datasets', methods=['POST'])
+def knn_create_dataset():
+    """
+    Endpoint untuk membuat dataset KNN yang bisa diubah per baris
+    
+    Request body:
+    {
+        "train_data": [[...], [...]],
+        "train_labels": [...],
+        "k": 3,
+        "metric": "euclidean",
+        "weights": "uniform"
+    }
+    
+    Response berisi dataset_id dan row_id setiap baris. Perubahan berikutnya
+    (tambah/ubah/hapus baris) tidak melatih ulang model dari nol.
+    
+    Dataset disimpan di SQLite yang dibagi semua worker gunicorn, jadi request
+    berikutnya boleh sampai ke worker mana pun (lihat mutable_dataset.py).
+    """
+    try:
+        data = _knn_request_data()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        for field in ['train_data', 'train_labels']:
+            if field not in data:
+                return jsonify({'error': f'Missing required field: {field}'}), 400
+        
+        if len(data['train_data']) != len(data['train_labels']):
+            return jsonify({'error': 'train_data dan train_labels harus sama panjang'}), 400
+        
+        dataset_id, dataset, row_ids = mutable_datasets.create(
+            data['train_data'],
+            data['train_labels'],
+            k=data.get('k', 3),
+            metric=data.get('metric', 'euclidean'),
+            weights=data.get('weights', 'uniform')
+        )
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'dataset_id': dataset_id,
+                'row_ids': row_ids,
+                **dataset.describe()
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/knn/datasets/<dataset_id>', methods=['GET'])
+def knn_get_dataset(dataset_id):
+    """Endpoint untuk melihat info dataset dan kondisi index"""
+    dataset = mutable_datasets.get(dataset_id)
+    if dataset is None:
+        return jsonify({'success': False, 'error': 'Dataset tidak ditemukan'}), 404
+    
+    return jsonify({
+        'success': True,
+        'data': {
+            'dataset_id': dataset_id,
+            **dataset.describe()
+        }
+    })
+
+
+@api.route('/api/knn/datasets/<dataset_id>', methods=['DELETE'])
+def knn_delete_dataset(dataset_id):
+    """Endpoint untuk menghapus dataset"""
+    if not mutable_datasets.remove(dataset_id):
+        return jsonify({'success': False, 'error': 'Dataset tidak ditemukan'}), 404
+    
+    return jsonify({'success': True})
+
+
+@api.route('/api/knn/datasets/<dataset_id>/rows', methods=['POST'])
+def knn_append_rows(dataset_id):
+    """
+    Endpoint untuk menambah baris ke dataset
+    
+    Request body:
+    {
+        "rows": [[...], [...]],
+        "labels": [...]
+    }
+    """
+    try:
+        data = request.get_json()
+        if not data or 'rows' not in data or 'labels' not in data:
+            return jsonify({'error': 'rows dan labels wajib diisi'}), 400
+        
+        try:
+            row_ids, n_rows = mutable_datasets.append(dataset_id, data['rows'], data['labels'])
+        except KeyError:
+            return jsonify({'success': False, 'error': 'Dataset tidak ditemukan'}), 404
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'row_ids': row_ids,
+                'n_rows': n_rows
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/knn/datasets/<dataset_id>/rows/<int:row_id>', methods=['PUT', 'DELETE'])
+def knn_edit_row(dataset_id, row_id):
+    """
+    Endpoint untuk mengubah (PUT) atau menghapus (DELETE) satu baris
+    
+    Request body untuk PUT (keduanya opsional):
+    {
+        "features": [...],
+        "label": "A"
+    }
+    """
+    try:
+        dataset = mutable_datasets.get(dataset_id)
+        if dataset is None:
+            return jsonify({'success': False, 'error': 'Dataset tidak ditemukan'}), 404
+        
+        try:
+            if request.method == 'DELETE':
+                n_rows = mutable_datasets.delete_row(dataset_id, row_id)
+            else:
+                data = request.get_json() or {}
+                n_rows = mutable_datasets.update(dataset_id, row_id,
+                                                 features=data.get('features'),
+                                                 label=data.get('label'))
+        except KeyError:
+            return jsonify({'success': False, 'error': 'Row tidak ditemukan'}), 404
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'row_id': row_id,
+                'n_rows': n_rows
+            }
         })
         
     except Exception as e:
@@ -129,7 +635,54 @@ def knn_calculate():
         }), 500
 
 
-@app.route('/api/knn/find-optimal-k', methods=['POST'])
+@api.route('/api/knn/datasets/<dataset_id>/predict', methods=['POST'])
+def knn_predict_dataset(dataset_id):
+    """
+    Endpoint untuk prediksi dengan dataset yang bisa diubah
+    
+    Request body:
+    {
+        "test_data": [[...], [...]],
+        "fields": ["prediction", "confidence"],
+        "layout": "records"
+    }
+    
+    nearest_neighbors.indices berisi row_id. fields dan layout opsional, lihat
+    /api/knn/calculate.
+    """
+    try:
+        dataset = mutable_datasets.get(dataset_id)
+        if dataset is None:
+            return jsonify({'success': False, 'error': 'Dataset tidak ditemukan'}), 404
+        
+        data = _knn_request_data()
+        if not data or 'test_data' not in data:
+            return jsonify({'error': 'Missing required field: test_data'}), 400
+        
+        try:
+            fields, layout = _prediction_format(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        result = dataset.predict(data['test_data'], fields=fields, layout=layout)
+        
+        with stage('response'):
+            return jsonify({
+                'success': True,
+                'data': {
+                    'dataset_id': dataset_id,
+                    **result
+                }
+            })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/knn/find-optimal-k', methods=['POST'])
 def knn_find_optimal_k():
     """
     Endpoint untuk mencari K optimal
@@ -139,11 +692,13 @@ def knn_find_optimal_k():
         "train_data": [[...], [...]],
         "train_labels": [...],
         "k_range": [1, 20],
-        "metric": "euclidean"
+        "metric": "euclidean",
+        "weights": "uniform",
+        "engine": "sweep"
     }
     """
     try:
-        data = request.get_json()
+        data = _knn_request_data()
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
@@ -152,12 +707,14 @@ def knn_find_optimal_k():
         train_labels = data.get('train_labels')
         k_range = tuple(data.get('k_range', [1, 20]))
         metric = data.get('metric', 'euclidean')
+        weights = data.get('weights', 'uniform')
+        engine = data.get('engine', 'sweep')
         
         # Inisialisasi KNN
-        knn = KNNAlgorithm(metric=metric)
+        knn = KNNAlgorithm(metric=metric, weights=weights)
         
         # Cari optimal K
-        result = knn.find_optimal_k(train_data, train_labels, k_range)
+        result = knn.find_optimal_k(train_data, train_labels, k_range, engine=engine)
         
         return jsonify({
             'success': True,
@@ -172,7 +729,7 @@ def knn_find_optimal_k():
 
 
 # Fuzzy Logic Endpoints
-@app.route('/api/fuzzy/calculate', methods=['POST'])
+@api.route('/api/fuzzy/calculate', methods=['POST'])
 def fuzzy_calculate():
     """
     Endpoint untuk perhitungan Fuzzy Logic sederhana
@@ -212,7 +769,56 @@ def fuzzy_calculate():
         }), 500
 
 
-@app.route('/api/fuzzy/inference', methods=['POST'])
+@api.route('/api/fuzzy/calculate/batch', methods=['POST'])
+def fuzzy_calculate_batch():
+    """
+    Endpoint untuk perhitungan Fuzzy Logic sederhana pada banyak item sekaligus
+    
+    Request body:
+    {
+        "input_values": [[75, 60, 80], [40, 55, 70]],
+        "weights": [0.3, 0.3, 0.4]
+    }
+    
+    Setiap baris input_values adalah satu item; weights berlaku untuk semua baris.
+    Response berbentuk kolom (values, categories, memberships) sesuai urutan baris.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        input_values = data.get('input_values')
+        if not input_values:
+            return jsonify({'error': 'input_values harus berupa matriks (list of lists)'}), 400
+        
+        result = simple_fuzzy_inference_batch(input_values, data.get('weights'))
+        
+        return jsonify({
+            'success': True,
+            'data': result
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _decision_surface(fuzzy_sys, data):
+    """
+    DecisionSurface jika request memakai mode surface ("surface"), atau None
+    
+    Raises:
+        ValueError: Jika konfigurasi grid tidak valid atau terlalu besar
+    """
+    with stage('fuzzy_surface'):
+        return surface_from_option(fuzzy_sys, data.get('surface'))
+
+
+@api.route('/api/fuzzy/inference', methods=['POST'])
 def fuzzy_inference():
     """
     Endpoint untuk fuzzy inference system lengkap
@@ -231,11 +837,24 @@ def fuzzy_inference():
         }],
         "inputs": {
             "kualitas": 75
-        }
+        },
+        "output": {"name": "hasil", "range": [0, 100], "memberships": {...}},
+        "defuzz_method": "centroid",
+        "engine": "skfuzzy"
     }
+    
+    "output", "defuzz_method" dan "engine" ('skfuzzy' atau 'numpy') opsional.
+    "analytic": true (hanya engine numpy) memakai fuzzifikasi dan centroid analitik.
+    System yang sudah di-build di-cache berdasarkan hash
+    (criteria, rules, output, defuzz_method, engine, analytic).
+    
+    "surface": true (atau jumlah titik grid, misalnya 41 atau [41, 21]) menjawab
+    dari decision surface yang dievaluasi sekali per system dengan interpolasi
+    multilinear; response berisi "surface" dengan max_error terhadap compute() exact.
     """
     try:
-        data = request.get_json()
+        with stage('json_decode'):
+            data = request.get_json()
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
@@ -244,39 +863,165 @@ def fuzzy_inference():
         rules = data.get('rules', [])
         inputs = data.get('inputs', {})
         
-        # Buat fuzzy system
-        fuzzy_sys = FuzzyLogicSystem()
+        # Ambil fuzzy system dari cache atau build baru
+        fuzzy_sys, _ = fuzzy_system_cache.get_or_build(
+            criteria,
+            rules,
+            output=data.get('output'),
+            defuzz_method=data.get('defuzz_method', 'centroid'),
+            engine=data.get('engine', 'skfuzzy'),
+            analytic=bool(data.get('analytic', False))
+        )
+        try:
+            surface = _decision_surface(fuzzy_sys, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        with stage('fuzzy_compute'):
+            result = (surface or fuzzy_sys).compute(inputs)
         
-        # Add inputs
-        for criterion in criteria:
-            fuzzy_sys.add_input(
-                criterion['name'],
-                tuple(criterion['range']),
-                criterion['memberships']
-            )
+        with stage('response'):
+            return jsonify({
+                'success': True,
+                'data': result
+            })
         
-        # Add output
-        fuzzy_sys.add_output(
-            'hasil',
-            (0, 100),
-            {
-                'rendah': ['trimf', [0, 0, 50]],
-                'sedang': ['trimf', [25, 50, 75]],
-                'tinggi': ['trimf', [50, 100, 100]]
-            }
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/fuzzy/inference/batch', methods=['POST'])
+def fuzzy_inference_batch():
+    """
+    Endpoint untuk fuzzy inference banyak baris sekaligus
+    
+    Request body sama dengan /api/fuzzy/inference, tetapi "inputs" berisi
+    list of dict atau dict kolom:
+    {
+        "criteria": [...],
+        "rules": [...],
+        "inputs": [{"kualitas": 75}, {"kualitas": 40}]
+    }
+    atau
+    {
+        "criteria": [...],
+        "rules": [...],
+        "inputs": {"kualitas": [75, 40]}
+    }
+    
+    "surface" opsional, lihat /api/fuzzy/inference.
+    """
+    try:
+        with stage('json_decode'):
+            data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        inputs = data.get('inputs')
+        if not isinstance(inputs, (list, dict)):
+            return jsonify({'error': 'inputs harus berupa list of dict atau dict kolom'}), 400
+        
+        fuzzy_sys, _ = fuzzy_system_cache.get_or_build(
+            data.get('criteria', []),
+            data.get('rules', []),
+            output=data.get('output'),
+            defuzz_method=data.get('defuzz_method', 'centroid'),
+            engine=data.get('engine', 'skfuzzy'),
+            analytic=bool(data.get('analytic', False))
         )
+        try:
+            surface = _decision_surface(fuzzy_sys, data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        with stage('fuzzy_compute'):
+            result = (surface or fuzzy_sys).compute_batch(inputs)
+        
+        with stage('response'):
+            return jsonify({
+                'success': True,
+                'data': result
+            })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/fuzzy/cache', methods=['GET'])
+def fuzzy_cache_stats():
+    """Endpoint untuk statistik cache fuzzy system (hit/miss)"""
+    return jsonify({
+        'success': True,
+        'data': fuzzy_system_cache.stats()
+    })
+
+
+# Job Endpoints
+@api.route('/api/jobs', methods=['POST'])
+def jobs_submit():
+    """
+    Endpoint untuk menjalankan pekerjaan lama secara asynchronous
+    
+    Request body:
+    {
+        "type": "knn_find_optimal_k",
+        "params": {...},
+        "lane": "heavy"
+    }
+    
+    type: knn_find_optimal_k, knn_calculate atau fuzzy_inference_batch; params
+    sama dengan body endpoint sinkronnya. lane opsional ('quick' atau 'heavy',
+    default dipilih dari ukuran input). Response 202 berisi job_id; pantau lewat
+    /api/jobs/<job_id> dan ambil hasil lewat /api/jobs/<job_id>/result.
+    """
+    try:
+        data = request.get_json()
         
-        # Add rules
-        for rule in rules:
-            fuzzy_sys.add_rule(rule)
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        if 'type' not in data:
+            return jsonify({'error': 'Missing required field: type'}), 400
         
-        # Build dan compute
-        fuzzy_sys.build_system()
-        result = fuzzy_sys.compute(inputs)
+        try:
+            job = job_queue.submit(data['type'], data.get('params', {}), lane=data.get('lane'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except QueueFull as e:
+            return jsonify({'success': False, 'error': str(e)}), 503
         
         return jsonify({
             'success': True,
-            'data': result
+            'data': job
+        }), 202
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@api.route('/api/jobs', methods=['GET'])
+def jobs_list():
+    """Endpoint untuk daftar job terbaru (?status=running&limit=50) dan jumlah per lane"""
+    try:
+        try:
+            jobs = job_queue.list(status=request.args.get('status'),
+                                  limit=request.args.get('limit', 50, type=int))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'jobs': jobs,
+                'stats': job_queue.stats()
+            }
         })
         
     except Exception as e:
@@ -286,25 +1031,193 @@ def fuzzy_inference():
         }), 500
 
 
+@api.route('/api/jobs/<job_id>', methods=['GET'])
+def jobs_status(job_id):
+    """
+    Endpoint untuk status dan progress job
+    
+    progress berisi done/total (per K untuk engine 'cv', per fold untuk engine
+    'sweep') dan fraction.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job tidak ditemukan'}), 404
+    return jsonify({
+        'success': True,
+        'data': job
+    })
+
+
+@api.route('/api/jobs/<job_id>/result', methods=['GET'])
+def jobs_result(job_id):
+    """
+    Endpoint untuk hasil job
+    
+    Hasil sama dengan field data dari endpoint sinkronnya. Job yang belum
+    selesai atau dibatalkan mengembalikan 409, job gagal mengembalikan 500
+    seperti endpoint sinkron.
+    """
+    job, result = job_queue.result(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job tidak ditemukan'}), 404
+    if job['status'] == 'failed':
+        return jsonify({'success': False, 'error': job['error'], 'job': job}), 500
+    if job['status'] != 'succeeded':
+        return jsonify({
+            'success': False,
+            'error': f"Job belum selesai (status: {job['status']})",
+            'job': job
+        }), 409
+    return jsonify({
+        'success': True,
+        'data': result
+    })
+
+
+@api.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def jobs_cancel(job_id):
+    """Endpoint untuk membatalkan job (job running berhenti di titik progress berikutnya)"""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job tidak ditemukan'}), 404
+    return jsonify({
+        'success': True,
+        'data': job
+    })
+
+
+@api.route('/api/parse/cache', methods=['GET'])
+def parse_cache_stats():
+    """Endpoint untuk statistik cache hasil parse (hit/miss per tier)"""
+    return jsonify({
+        'success': True,
+        'data': parse_cache.stats()
+    })
+
+
+@api.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Endpoint metrics dalam format teks Prometheus
+    
+    Berisi histogram latency per endpoint dan stage (aktif jika METRICS_ENABLED=1)
+    serta counter hit/miss cache model KNN, training metrics, fuzzy system dan
+    hasil parse.
+    Metrics dihitung per proses worker.
+    """
+    registry_stats = model_registry.stats()
+    fuzzy_stats = fuzzy_system_cache.stats()
+    cache_stats = {
+        'knn_model': dict(registry_stats, entries=registry_stats['models']),
+        'knn_training_metrics': training_metrics_cache_stats(),
+        'fuzzy_system': dict(fuzzy_stats, entries=fuzzy_stats['systems']),
+        'parse_result': parse_cache.stats(),
+    }
+    if model_registry.store is not None:
+        store_stats = model_registry.store.stats()
+        cache_stats['knn_dataset'] = dict(store_stats, entries=store_stats['datasets'])
+    return Response(metrics.render(cache_stats),
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _profiling_disabled():
+    if current_app.config.get('PROFILING_ENABLED'):
+        return None
+    return jsonify({'success': False, 'error': 'Profiling tidak aktif (set PROFILING_ENABLED=1)'}), 404
+
+
+@api.route('/api/profiles', methods=['GET'])
+def profiles_index():
+    """
+    Daftar profil request yang sudah direkam (terbaru lebih dulu)
+    
+    Query string:
+        limit: Jumlah profil maksimum (default: 50)
+    """
+    disabled = _profiling_disabled()
+    if disabled:
+        return disabled
+    limit = request.args.get('limit', 50, type=int)
+    profiles = list_profiles(current_app.config['PROFILING_DIR'], limit)
+    return jsonify({
+        'success': True,
+        'data': {'profiles': profiles, 'count': len(profiles)}
+    })
+
+
+@api.route('/api/profiles/<profile_id>', methods=['GET'])
+def profile_detail(profile_id):
+    """Metadata satu profil, termasuk fungsi teratas berdasarkan cumulative time"""
+    disabled = _profiling_disabled()
+    if disabled:
+        return disabled
+    try:
+        meta_path, _ = profile_paths(current_app.config['PROFILING_DIR'], profile_id)
+        with open(meta_path, encoding='utf-8') as handle:
+            metadata = json.load(handle)
+    except KeyError:
+        return jsonify({'success': False, 'error': 'Profil tidak ditemukan'}), 404
+    return jsonify({'success': True, 'data': metadata})
+
+
+@api.route('/api/profiles/<profile_id>/download', methods=['GET'])
+def profile_download(profile_id):
+    """File .prof mentah (buka dengan pstats atau snakeviz)"""
+    disabled = _profiling_disabled()
+    if disabled:
+        return disabled
+    try:
+        _, prof_path = profile_paths(current_app.config['PROFILING_DIR'], profile_id)
+    except KeyError:
+        return jsonify({'success': False, 'error': 'Profil tidak ditemukan'}), 404
+    return send_file(prof_path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f'{profile_id}.prof')
+
+
 # Error handlers
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
 
 
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 
 if __name__ == '__main__':
+    from warmup import warm_up
+    
+    # Server development; production memakai wsgi.py (gunicorn) yang membuat app sendiri
+    app = create_app()
+    
     print("🚀 Starting R-Count Python Backend...")
     print("📍 Server running at: http://localhost:5000")
     print("📊 Available endpoints:")
     print("   - GET  /api/health")
     print("   - POST /api/knn/calculate")
+    print("   - POST /api/knn/models")
+    print("   - POST /api/knn/models/<model_id>/predict")
+    print("   - GET  /api/knn/models/<model_id>/metrics")
+    print("   - POST /api/knn/datasets")
+    print("   - POST /api/knn/datasets/<dataset_id>/rows")
+    print("   - PUT  /api/knn/datasets/<dataset_id>/rows/<row_id>")
+    print("   - POST /api/knn/datasets/<dataset_id>/predict")
     print("   - POST /api/knn/find-optimal-k")
     print("   - POST /api/fuzzy/calculate")
+    print("   - POST /api/fuzzy/calculate/batch")
     print("   - POST /api/fuzzy/inference")
+    print("   - POST /api/fuzzy/inference/batch")
+    print("   - GET  /api/fuzzy/cache")
+    print("   - GET  /api/parse/cache")
+    print("   - POST /api/jobs")
+    print("   - GET  /api/jobs/<job_id>")
+    print("   - GET  /api/jobs/<job_id>/result")
+    print("   - POST /api/jobs/<job_id>/cancel")
+    print("   - GET  /api/metrics")
+    print("   - GET  /api/profiles")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    warm_up(app)
+    job_queue.start_embedded()
+    # Debug mode hanya untuk development; set FLASK_DEBUG=0 untuk mematikannya
+    app.run(debug=os.environ.get('FLASK_DEBUG', '1') == '1', host='0.0.0.0', port=5000)
@@ -0,0 +1,86 @@
+"""
+Benchmark backend ANN (index IVF) vs backend exact KNNAlgorithm.
+
+Melaporkan waktu build, recall@k terhadap hasil exact, queries per second dan
+memori index untuk beberapa nilai n_probe.
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_ann.py --rows 200000 --features 16 --queries 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from algorithms.knn import KNNAlgorithm  # noqa: E402
+from algorithms.model_registry import estimate_model_nbytes  # noqa: E402
+
+
+def make_dataset(rows, features, clusters, seed=0):
+    """Dataset sintetis: banyak cluster Gaussian dengan label per cluster"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=4.0, size=(clusters, features))
+    assignment = rng.integers(0, clusters, rows)
+    data = centers[assignment] + rng.normal(size=(rows, features))
+    queries = centers[rng.integers(0, clusters, 1)] + rng.normal(size=(1, features))
+    return data, assignment % 5, rng, centers, queries
+
+
+def build(X, y, k, backend, ann_params=None):
+    knn = KNNAlgorithm(k=k, metrics_mode='lazy', backend=backend, ann_params=ann_params)
+    start = time.perf_counter()
+    knn.train(X, y)
+    return knn, time.perf_counter() - start
+
+
+def query(knn, X_test):
+    start = time.perf_counter()
+    result = knn.predict(X_test)
+    elapsed = time.perf_counter() - start
+    indices = [set(p['nearest_neighbors']['indices']) for p in result['predictions']]
+    return indices, len(X_test) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--features', type=int, default=16)
+    parser.add_argument('--clusters', type=int, default=200)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--n-lists', type=int, default=None)
+    parser.add_argument('--probes', default='1,4,8,16,32')
+    args = parser.parse_args()
+
+    X, y, rng, centers, _ = make_dataset(args.rows, args.features, args.clusters)
+    X_test = centers[rng.integers(0, args.clusters, args.queries)] + \
+        rng.normal(size=(args.queries, args.features))
+
+    exact, exact_build = build(X, y, args.k, 'exact')
+    exact_indices, exact_qps = query(exact, X_test)
+
+    print(f"rows={args.rows} features={args.features} queries={args.queries} k={args.k}")
+    print(f"{'backend':<18}{'build s':>9}{'recall@k':>10}{'QPS':>10}{'index MB':>10}")
+    print(f"{'exact':<18}{exact_build:>9.2f}{1.0:>10.3f}{exact_qps:>10.0f}"
+          f"{estimate_model_nbytes(exact) / 1e6:>10.1f}")
+
+    for n_probe in (int(p) for p in args.probes.split(',')):
+        ann_params = {'n_probe': n_probe}
+        if args.n_lists:
+            ann_params['n_lists'] = args.n_lists
+        ann, ann_build = build(X, y, args.k, 'ann', ann_params)
+        ann_indices, ann_qps = query(ann, X_test)
+        recall = np.mean([
+            len(found & expected) / args.k for found, expected in zip(ann_indices, exact_indices)
+        ])
+        print(f"{'ann n_probe=' + str(n_probe):<18}{ann_build:>9.2f}{recall:>10.3f}{ann_qps:>10.0f}"
+              f"{estimate_model_nbytes(ann) / 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark ingest dataset training: JSON list of lists vs upload biner RCDS / .npy.
+
+Mengukur decode saja (body -> numpy array) dan request penuh ke /api/knn/models
+dengan metrics_mode 'lazy' agar waktu cross-validation tidak ikut terhitung.
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_dataset_ingest.py --rows 100000 --features 16
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app  # noqa: E402
+from algorithms.model_registry import model_registry  # noqa: E402
+from dataset_codec import decode_dataset, encode_dataset  # noqa: E402
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--features', type=int, default=16)
+    parser.add_argument('--dtype', default='<f4', choices=['<f4', '<f8'])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.rows, args.features)).astype(args.dtype)
+    y = rng.choice(['A', 'B', 'C'], args.rows)
+
+    json_body = json.dumps({
+        'train_data': X.tolist(), 'train_labels': y.tolist(), 'metrics_mode': 'lazy'
+    })
+    rcds_body = encode_dataset(X, y, dtype=args.dtype)
+    npy_buffer = io.BytesIO()
+    np.save(npy_buffer, X)
+    npy_body = npy_buffer.getvalue()
+
+    print(f"rows={args.rows} features={args.features} dtype={args.dtype}")
+    print(f"payload  json={len(json_body) / 1e6:.1f} MB  rcds={len(rcds_body) / 1e6:.1f} MB  "
+          f"npy={len(npy_body) / 1e6:.1f} MB")
+
+    def decode_json():
+        data = json.loads(json_body)
+        np.asarray(data['train_data'])
+        np.asarray(data['train_labels'])
+
+    json_decode = best_of(decode_json, args.repeat)
+    rcds_decode = best_of(lambda: decode_dataset(rcds_body), args.repeat)
+    print(f"decode   json={json_decode * 1000:.1f} ms  rcds={rcds_decode * 1000:.3f} ms  "
+          f"speedup={json_decode / rcds_decode:.0f}x")
+
+    client = create_app().test_client()
+
+    def post_json():
+        model_registry.clear()
+        client.post('/api/knn/models', data=json_body, content_type='application/json')
+
+    def post_rcds():
+        model_registry.clear()
+        client.post('/api/knn/models', data={
+            'dataset': (io.BytesIO(rcds_body), 'train.rcds'),
+            'metrics_mode': 'lazy'
+        }, content_type='multipart/form-data')
+
+    json_request = best_of(post_json, args.repeat)
+    rcds_request = best_of(post_rcds, args.repeat)
+    print(f"request  json={json_request * 1000:.1f} ms  rcds={rcds_request * 1000:.1f} ms  "
+          f"speedup={json_request / rcds_request:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark DatasetStore: memori per worker dengan dan tanpa dataset memory-mapped.
+
+Setiap "worker" adalah proses terpisah yang memuat model yang sama, lalu melaporkan
+memori private dan shared dari /proc/self/smaps_rollup (Linux). Tanpa store setiap
+worker memegang salinan data sendiri; dengan store data ada di page cache bersama.
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_dataset_store.py --rows 500000 --features 16 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from synthetic_data import make_classification, make_queries  # noqa: E402
+from algorithms.dataset_store import DatasetStore  # noqa: E402
+from algorithms.model_registry import ModelRegistry  # noqa: E402
+
+
+def memory_mb():
+    """(private MB, shared MB) proses ini"""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as handle:
+        for line in handle:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    private = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    shared = fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    return private / 1024, shared / 1024
+
+
+def worker(args, directory, model_id, results):
+    X_test = make_queries(100, args.features)
+    if directory is None:
+        # Seperti request JSON: data datang ke setiap worker dan dilatih di sana
+        X, y = make_classification(args.rows, args.features, args.classes)
+        before, _ = memory_mb()
+        start = time.perf_counter()
+        entry, _ = ModelRegistry().get_or_train(X, y, k=args.k, metrics_mode='lazy')
+        del X, y
+    else:
+        before, _ = memory_mb()
+        start = time.perf_counter()
+        entry = ModelRegistry(store=DatasetStore(directory)).get(model_id)
+    load_time = time.perf_counter() - start
+    entry.knn.predict(X_test)
+    private, shared = memory_mb()
+    results.put((private - before, shared, load_time))
+
+
+def run(args, directory, model_id):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(args, directory, model_id, results))
+                 for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--features', type=int, default=16)
+    parser.add_argument('--classes', type=int, default=5)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='rcount-datasets-')
+    try:
+        X, y = make_classification(args.rows, args.features, args.classes)
+        registry = ModelRegistry(store=DatasetStore(directory))
+        start = time.perf_counter()
+        entry, _ = registry.get_or_train(X, y, k=args.k, metrics_mode='lazy')
+        store_time = time.perf_counter() - start
+
+        # Model kedua dengan data sama (k lain) harus memakai file dataset yang sama
+        registry.get_or_train(X, y, k=args.k + 2, metrics_mode='lazy')
+        stats = registry.store.stats()
+
+        print(f"rows={args.rows} features={args.features} workers={args.workers} "
+              f"data={X.nbytes / 1e6:.1f} MB (simpan ke store: {store_time:.2f} s)")
+        print(f"store: {stats['models']} model, {stats['datasets']} dataset, "
+              f"{stats['total_bytes'] / 1e6:.1f} MB di disk")
+        print(f"{'mode':<10}{'private MB/worker':>19}{'shared MB':>11}{'load s':>9}")
+        for label, store_dir in (('memori', None), ('mmap', directory)):
+            measured = run(args, store_dir, entry.model_id)
+            private = sum(m[0] for m in measured) / len(measured)
+            shared = max(m[1] for m in measured)
+            load_time = sum(m[2] for m in measured) / len(measured)
+            print(f"{label:<10}{private:>19.1f}{shared:>11.1f}{load_time:>9.2f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
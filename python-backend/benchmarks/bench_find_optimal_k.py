@@ -0,0 +1,117 @@
+"""
+Benchmark KNNAlgorithm.find_optimal_k: engine 'sweep' vs loop cross_val_score per K.
+
+Dengan --check N, kedua engine dibandingkan pada N dataset acak berfitur skala
+Likert (banyak jarak sama) dan script keluar dengan status 1 jika ada accuracy
+atau optimal_k yang berbeda.
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_find_optimal_k.py --rows 2000 --features 8 --k-max 20
+    python benchmarks/bench_find_optimal_k.py --data likert --check 100
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from algorithms.knn import KNNAlgorithm  # noqa: E402
+
+
+def make_dataset(rows, features, classes, seed=0):
+    """Dataset sintetis: cluster Gaussian per kelas"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=3.0, size=(classes, features))
+    labels = rng.integers(0, classes, rows)
+    data = centers[labels] + rng.normal(size=(rows, features))
+    return data, labels
+
+
+def make_likert_dataset(rows, features, classes, seed=0):
+    """Dataset sintetis berfitur integer 1..5 seperti jawaban kuesioner"""
+    rng = np.random.default_rng(seed)
+    return rng.integers(1, 6, size=(rows, features)), rng.integers(0, classes, rows)
+
+
+def check_engines(n_datasets, k_range):
+    """Bandingkan engine 'cv' dan 'sweep' pada dataset Likert acak, return jumlah selisih"""
+    mismatches = 0
+    for seed in range(n_datasets):
+        rng = np.random.default_rng(seed)
+        X, y = make_likert_dataset(int(rng.integers(30, 300)), int(rng.integers(2, 22)),
+                                   int(rng.integers(2, 5)), seed)
+        metric = ('euclidean', 'manhattan', 'chebyshev')[seed % 3]
+        weights = ('uniform', 'distance')[seed % 2]
+        results = [
+            KNNAlgorithm(metric=metric, weights=weights).find_optimal_k(X, y, k_range, engine=engine)
+            for engine in ('cv', 'sweep')
+        ]
+        if results[0] != results[1]:
+            mismatches += 1
+            print(f"seed={seed} metric={metric} weights={weights}: "
+                  f"optimal_k={results[0]['optimal_k']}/{results[1]['optimal_k']}")
+    return mismatches
+
+
+def time_engine(engine, X, y, k_range, metric, weights, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        knn = KNNAlgorithm(metric=metric, weights=weights)
+        start = time.perf_counter()
+        result = knn.find_optimal_k(X, y, k_range, engine=engine)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--classes', type=int, default=3)
+    parser.add_argument('--k-min', type=int, default=1)
+    parser.add_argument('--k-max', type=int, default=20)
+    parser.add_argument('--metric', default='euclidean')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data', default='gaussian', choices=['gaussian', 'likert'])
+    parser.add_argument('--check', type=int, default=0, metavar='N',
+                        help='bandingkan hasil kedua engine pada N dataset Likert acak')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    k_range = (args.k_min, args.k_max)
+    if args.check:
+        mismatches = check_engines(args.check, k_range)
+        print(f"engine cv vs sweep: {mismatches}/{args.check} dataset berbeda")
+        sys.exit(1 if mismatches else 0)
+
+    make = make_likert_dataset if args.data == 'likert' else make_dataset
+    X, y = make(args.rows, args.features, args.classes)
+    n_k = args.k_max - args.k_min + 1
+    folds = min(5, args.rows)
+
+    print(f"data={args.data} rows={args.rows} features={args.features} "
+          f"classes={args.classes} k_range={k_range} metric={args.metric}")
+    print(f"neighbor searches: cv={n_k * folds}  sweep={folds}")
+
+    for weights in ('uniform', 'distance'):
+        cv_time, cv_result = time_engine('cv', X, y, k_range, args.metric, weights, args.repeat)
+        sweep_time, sweep_result = time_engine('sweep', X, y, k_range, args.metric, weights, args.repeat)
+
+        max_diff = max(
+            abs(a['accuracy'] - b['accuracy'])
+            for a, b in zip(cv_result['all_scores'], sweep_result['all_scores'])
+        )
+        print(f"[{weights:8}] cv={cv_time * 1000:9.1f} ms  sweep={sweep_time * 1000:8.1f} ms  "
+              f"speedup={cv_time / sweep_time:5.1f}x  "
+              f"optimal_k={cv_result['optimal_k']}/{sweep_result['optimal_k']}  "
+              f"max|acc diff|={max_diff:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark FuzzyLogicSystem: engine 'skfuzzy' (ctrl) vs engine 'numpy' (MamdaniEngine).
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_fuzzy_engines.py --rows 2000 --criteria 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from algorithms.fuzzy_logic import build_fuzzy_system  # noqa: E402
+
+
+def make_rule_base(n_criteria, seed=0):
+    """Rule base sintetis: 3 term trimf per kriteria, satu rule per kombinasi term tetangga"""
+    rng = np.random.default_rng(seed)
+    memberships = {
+        'rendah': ['trimf', [0, 0, 50]],
+        'sedang': ['trimf', [25, 50, 75]],
+        'tinggi': ['trimf', [50, 100, 100]]
+    }
+    criteria = [
+        {'name': f'kriteria{i}', 'range': [0, 100], 'memberships': memberships}
+        for i in range(n_criteria)
+    ]
+    labels = list(memberships)
+    rules = []
+    for label in labels:
+        for operator in ('AND', 'OR'):
+            antecedents = [[c['name'], str(rng.choice(labels))] for c in criteria]
+            rules.append({
+                'antecedents': antecedents,
+                'consequent': ['hasil', label],
+                'operator': operator
+            })
+    return criteria, rules
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--criteria', type=int, default=3)
+    parser.add_argument('--defuzz', default='centroid')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    criteria, rules = make_rule_base(args.criteria)
+    rng = np.random.default_rng(1)
+    columns = {c['name']: rng.uniform(0, 100, args.rows) for c in criteria}
+    rows = [{name: float(values[i]) for name, values in columns.items()} for i in range(args.rows)]
+
+    print(f"rows={args.rows} criteria={args.criteria} rules={len(rules)} defuzz={args.defuzz}")
+
+    build_ctrl, ctrl_sys = timed(
+        lambda: build_fuzzy_system(criteria, rules, defuzz_method=args.defuzz, engine='skfuzzy'), 1)
+    build_np, np_sys = timed(
+        lambda: build_fuzzy_system(criteria, rules, defuzz_method=args.defuzz, engine='numpy'), 1)
+    print(f"build       ctrl={build_ctrl * 1000:8.1f} ms  numpy={build_np * 1000:8.1f} ms")
+
+    loop_time, loop_result = timed(
+        lambda: [ctrl_sys.compute(row)['output_value'] for row in rows], 1)
+    batch_time, batch_result = timed(lambda: ctrl_sys.compute_batch(columns), args.repeat)
+    numpy_time, numpy_result = timed(lambda: np_sys.compute_batch(columns), args.repeat)
+
+    reference = np.array(loop_result, dtype=float)
+    values = np.array([np.nan if v is None else v for v in numpy_result['output_values']])
+    batch_values = np.array([np.nan if v is None else v for v in batch_result['output_values']])
+
+    print(f"ctrl compute loop  {loop_time * 1000:9.1f} ms  ({args.rows / loop_time:10.0f} rows/s)")
+    print(f"ctrl compute_batch {batch_time * 1000:9.1f} ms  ({args.rows / batch_time:10.0f} rows/s)")
+    print(f"numpy compute_batch{numpy_time * 1000:9.1f} ms  ({args.rows / numpy_time:10.0f} rows/s)  "
+          f"speedup vs loop={loop_time / numpy_time:6.1f}x")
+    print(f"max |numpy - ctrl| = {np.nanmax(np.abs(values - reference)):.2e}  "
+          f"max |batch - loop| = {np.nanmax(np.abs(batch_values - reference)):.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark decision surface fuzzy: compute() exact vs interpolasi dari grid.
+
+Untuk setiap jumlah titik grid dilaporkan waktu build surface, max_error yang
+dilaporkan surface, error terbesar pada query acak, dan latency per query.
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_fuzzy_surface.py --criteria 2 --points 9 17 33 65
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from synthetic_data import make_fuzzy_inputs, make_rule_base  # noqa: E402
+from algorithms.fuzzy_logic import build_fuzzy_system  # noqa: E402
+
+
+def timed(fn, repeats):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def outputs(result):
+    return np.array([np.nan if v is None else v for v in result['output_values']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--criteria', type=int, default=2)
+    parser.add_argument('--engine', default='numpy', choices=['skfuzzy', 'numpy'])
+    parser.add_argument('--points', type=int, nargs='+', default=[9, 17, 33, 65])
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    # skfuzzy memperingatkan setiap kali ukuran array input batch berubah
+    warnings.filterwarnings('ignore', category=UserWarning, module='skfuzzy')
+
+    criteria, rules = make_rule_base(args.criteria)
+    fuzzy_sys = build_fuzzy_system(criteria, rules, engine=args.engine)
+    names = [c['name'] for c in criteria]
+    rows = [dict(zip(names, map(float, row)))
+            for row in make_fuzzy_inputs(args.queries, args.criteria)]
+
+    exact = outputs(fuzzy_sys.compute_batch(rows))
+    _, exact_time = timed(lambda: [fuzzy_sys.compute(row) for row in rows], args.repeats)
+
+    print(f"criteria={args.criteria} engine={args.engine} queries={args.queries}")
+    print(f"{'grid':<14}{'build s':>9}{'max_error':>11}{'err acak':>10}{'us/query':>10}{'speedup':>9}")
+    print(f"{'exact':<14}{'-':>9}{'-':>11}{'-':>10}{exact_time / len(rows) * 1e6:>10.1f}"
+          f"{1.0:>8.1f}x")
+
+    for points in args.points:
+        start = time.perf_counter()
+        surface = fuzzy_sys.decision_surface(points)
+        build_time = time.perf_counter() - start
+
+        approx = outputs(surface.compute_batch(rows))
+        random_error = float(np.nanmax(np.abs(approx - exact)))
+        _, surface_time = timed(lambda: [surface.compute(row) for row in rows], args.repeats)
+        max_error = '-' if surface.max_error is None else f'{surface.max_error:.4f}'
+        grid = 'x'.join(map(str, surface.points))
+        print(f"{grid:<14}{build_time:>9.2f}{max_error:>11}{random_error:>10.4f}"
+              f"{surface_time / len(rows) * 1e6:>10.1f}{exact_time / surface_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
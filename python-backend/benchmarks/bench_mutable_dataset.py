@@ -0,0 +1,126 @@
+"""
+Benchmark edit satu baris + prediksi: MutableDataset vs KNNAlgorithm.train ulang.
+
+Juga mengukur edit lewat MutableDatasetRegistry (disimpan ke SQLite yang dibagi
+worker) dan waktu worker lain memuat ulang dataset, serta memastikan prediksi
+kedua worker sama.
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_mutable_dataset.py --rows 100000 --features 8 --edits 200
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from algorithms.knn import KNNAlgorithm  # noqa: E402
+from algorithms.mutable_dataset import MutableDataset, MutableDatasetRegistry  # noqa: E402
+
+
+def edit(target, row_ids, i, n_features, rng):
+    """Satu perubahan append / update / delete bergantian"""
+    op = i % 3
+    if op == 0:
+        row_ids.append(target.append(rng.normal(size=(1, n_features)), [i % 3])[0])
+    elif op == 1:
+        target.update(row_ids[rng.integers(len(row_ids))], features=rng.normal(size=n_features))
+    else:
+        target.delete(row_ids.pop(rng.integers(len(row_ids))))
+
+
+class RegistryTarget:
+    """Adapter agar edit() bisa dipakai untuk dataset di MutableDatasetRegistry"""
+
+    def __init__(self, registry, dataset_id):
+        self.registry = registry
+        self.dataset_id = dataset_id
+
+    def append(self, rows, labels):
+        return self.registry.append(self.dataset_id, rows, labels)[0]
+
+    def update(self, row_id, features=None):
+        self.registry.update(self.dataset_id, row_id, features=features)
+
+    def delete(self, row_id):
+        self.registry.delete_row(self.dataset_id, row_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--edits', type=int, default=200)
+    parser.add_argument('--refits', type=int, default=5)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--metric', default='euclidean')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.rows, args.features))
+    y = rng.integers(0, 3, args.rows)
+    query = rng.normal(size=(1, args.features))
+
+    dataset = MutableDataset(args.features, k=args.k, metric=args.metric)
+    row_ids = dataset.append(X, y)
+    dataset.predict(query)
+
+    # Campuran append / update / delete, masing-masing diikuti satu prediksi
+    start = time.perf_counter()
+    for i in range(args.edits):
+        edit(dataset, row_ids, i, args.features, rng)
+        dataset.predict(query)
+    incremental = (time.perf_counter() - start) / args.edits
+
+    directory = tempfile.mkdtemp(prefix='rcount-mutable-')
+    try:
+        path = os.path.join(directory, 'datasets.sqlite3')
+        registry = MutableDatasetRegistry(path)
+        dataset_id, _, shared_ids = registry.create(X, y, k=args.k, metric=args.metric)
+        target = RegistryTarget(registry, dataset_id)
+        start = time.perf_counter()
+        for i in range(args.edits):
+            edit(target, shared_ids, i, args.features, rng)
+            registry.get(dataset_id).predict(query)
+        shared = (time.perf_counter() - start) / args.edits
+
+        # Worker lain (registry terpisah, file SQLite sama) memuat dataset versi terakhir
+        other = MutableDatasetRegistry(path)
+        start = time.perf_counter()
+        other_result = other.get(dataset_id).predict(X[:50], layout='columnar')
+        reload = time.perf_counter() - start
+        # Statistik Welford incremental bisa berbeda di level pembulatan dari hasil
+        # hitung ulang saat reload, jadi jarak dibandingkan dengan toleransi
+        result = registry.get(dataset_id).predict(X[:50], layout='columnar')
+        same = (other_result['predictions']['prediction']
+                == result['predictions']['prediction']
+                and other_result['predictions']['nearest_neighbors']['indices']
+                == result['predictions']['nearest_neighbors']['indices']
+                and np.allclose(other_result['predictions']['nearest_neighbors']['distances'],
+                                result['predictions']['nearest_neighbors']['distances']))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    start = time.perf_counter()
+    for _ in range(args.refits):
+        knn = KNNAlgorithm(k=args.k, metric=args.metric, metrics_mode='lazy')
+        knn.train(X, y)
+        knn.predict(query)
+    refit = (time.perf_counter() - start) / args.refits
+
+    print(f"rows={args.rows} features={args.features} k={args.k} metric={args.metric}")
+    print(f"incremental edit + predict: {incremental * 1000:.2f} ms  "
+          f"(rebuilds={dataset.rebuilds})")
+    print(f"full refit + predict:       {refit * 1000:.2f} ms  speedup={refit / incremental:.0f}x")
+    print(f"registry (SQLite) edit + predict: {shared * 1000:.2f} ms")
+    print(f"reload di worker lain:      {reload * 1000:.2f} ms  prediksi sama={same}")
+
+
+if __name__ == '__main__':
+    main()
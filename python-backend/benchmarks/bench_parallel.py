@@ -0,0 +1,71 @@
+"""
+Benchmark find_optimal_k dan cross-validation: serial vs process pool bersama.
+
+Hasil paralel diverifikasi sama persis dengan hasil serial.
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_parallel.py --rows 20000 --features 16 --workers 16
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from algorithms.executor import ParallelExecutor, available_cores  # noqa: E402
+from algorithms.knn import KNNAlgorithm  # noqa: E402
+
+
+def timed(fn, repeats):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--features', type=int, default=16)
+    parser.add_argument('--max-k', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=available_cores())
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.rows, args.features))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=args.rows) > 0).astype(int)
+
+    serial = ParallelExecutor(max_workers=1)
+    parallel = ParallelExecutor(max_workers=args.workers, min_samples=0)
+    parallel.warm_up()
+
+    print(f"rows={args.rows} features={args.features} k=1..{args.max_k} "
+          f"workers={args.workers} (core tersedia: {available_cores()})")
+    print(f"{'task':<24}{'serial s':>10}{'paralel s':>11}{'speedup':>9}{'identik':>9}")
+
+    cases = [
+        ('find_optimal_k sweep', lambda ex: KNNAlgorithm(executor=ex).find_optimal_k(
+            X, y, k_range=(1, args.max_k), engine='sweep')),
+        ('find_optimal_k cv', lambda ex: KNNAlgorithm(executor=ex).find_optimal_k(
+            X, y, k_range=(1, args.max_k), engine='cv')),
+        ('train (5-fold CV)', lambda ex: KNNAlgorithm(k=5, executor=ex).train(X, y)),
+    ]
+    for name, run in cases:
+        expected, serial_time = timed(lambda: run(serial), args.repeats)
+        result, parallel_time = timed(lambda: run(parallel), args.repeats)
+        print(f"{name:<24}{serial_time:>10.2f}{parallel_time:>11.2f}"
+              f"{serial_time / parallel_time:>8.1f}x{str(result == expected):>9}")
+
+    parallel.shutdown()
+
+
+if __name__ == '__main__':
+    main()
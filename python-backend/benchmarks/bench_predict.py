@@ -0,0 +1,63 @@
+"""
+Benchmark KNNAlgorithm.predict: jalur fused (satu kneighbors) vs predict + predict_proba
++ kneighbors terpisah.
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_predict.py --rows 50000 --features 16 --queries 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from algorithms.knn import KNNAlgorithm  # noqa: E402
+
+
+def time_predict(knn, X_test, fused, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = knn.predict(X_test, fused=fused)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--features', type=int, default=16)
+    parser.add_argument('--classes', type=int, default=3)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--metric', default='euclidean')
+    parser.add_argument('--weights', default='uniform', choices=['uniform', 'distance'])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(scale=3.0, size=(args.classes, args.features))
+    labels = rng.integers(0, args.classes, args.rows)
+    X = centers[labels] + rng.normal(size=(args.rows, args.features))
+    X_test = rng.normal(scale=3.0, size=(args.queries, args.features))
+
+    knn = KNNAlgorithm(k=args.k, metric=args.metric, weights=args.weights, metrics_mode='lazy')
+    knn.train(X, labels)
+
+    separate, expected = time_predict(knn, X_test, False, args.repeat)
+    fused, result = time_predict(knn, X_test, True, args.repeat)
+
+    print(f"rows={args.rows} features={args.features} queries={args.queries} "
+          f"k={args.k} metric={args.metric} weights={args.weights}")
+    print(f"separate: {separate * 1000:.1f} ms")
+    print(f"fused:    {fused * 1000:.1f} ms  speedup={separate / fused:.2f}x")
+    print(f"identical output: {result == expected}")
+
+
+if __name__ == '__main__':
+    main()
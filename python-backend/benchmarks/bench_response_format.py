@@ -0,0 +1,83 @@
+"""
+Benchmark format response prediksi KNN: layout, fields, encoder JSON dan gzip.
+
+Mengukur waktu predict (termasuk format_predictions) dan encoding JSON untuk
+setiap kombinasi, serta ukuran body (mentah dan gzip).
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_response_format.py --queries 5000 --k 10 --classes 5
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from synthetic_data import make_classification, make_queries  # noqa: E402
+from algorithms.knn import KNNAlgorithm  # noqa: E402
+from app import create_app  # noqa: E402
+from responses import OrjsonProvider, orjson  # noqa: E402
+
+
+def timed(fn, repeats):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--classes', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    X, y = make_classification(args.rows, args.features, args.classes)
+    X_test = make_queries(args.queries, args.features)
+    knn = KNNAlgorithm(k=args.k, metrics_mode='lazy')
+    knn.train(X, y)
+
+    app = create_app()
+    encoders = [('json', DefaultJSONProvider(app))]
+    if orjson is not None:
+        encoders.append(('orjson', OrjsonProvider(app)))
+    else:
+        print("orjson tidak ter-install, hanya encoder json yang diukur")
+
+    formats = [
+        ('records semua', None, 'records'),
+        ('columnar semua', None, 'columnar'),
+        ('records prediction,confidence', ['prediction', 'confidence'], 'records'),
+        ('columnar prediction,confidence', ['prediction', 'confidence'], 'columnar'),
+        ('columnar prediction', ['prediction'], 'columnar'),
+    ]
+
+    print(f"rows={args.rows} queries={args.queries} k={args.k} classes={args.classes}")
+    print(f"{'format':<32}{'encoder':>8}{'predict ms':>11}{'encode ms':>11}"
+          f"{'body KB':>10}{'gzip KB':>10}")
+    for label, fields, layout in formats:
+        result, predict_time = timed(
+            lambda: knn.predict(X_test, fields=fields, layout=layout), args.repeats
+        )
+        for name, provider in encoders:
+            body, encode_time = timed(lambda: provider.dumps(result), args.repeats)
+            raw = body.encode('utf-8')
+            compressed = gzip.compress(raw, compresslevel=5)
+            print(f"{label:<32}{name:>8}{predict_time * 1000:>11.2f}{encode_time * 1000:>11.2f}"
+                  f"{len(raw) / 1024:>10.1f}{len(compressed) / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark backend sharded vs backend exact KNNAlgorithm.
+
+Melaporkan waktu build, queries per second dan apakah tetangga (jarak dan indeks)
+serta prediksi identik dengan backend exact untuk beberapa jumlah shard. Dengan
+--data likert fitur dibulatkan ke skala 1..5 sehingga banyak jarak sama di batas
+ke-k; kolom identik tetap harus True untuk kedua jenis data. Urutan tetangga yang
+jaraknya sama tidak ikut dibandingkan karena sklearn mengikuti urutan traversal tree.
+
+Jalankan dari folder python-backend:
+    python benchmarks/bench_sharding.py --rows 400000 --features 8 --shards 2 4 8
+    python benchmarks/bench_sharding.py --rows 20000 --data likert --shards 2 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from synthetic_data import make_classification, make_queries  # noqa: E402
+from algorithms.executor import available_cores  # noqa: E402
+from algorithms.knn import KNNAlgorithm  # noqa: E402
+
+
+def timed(fn, repeats):
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def build(X, y, k, backend, n_shards=None):
+    knn = KNNAlgorithm(k=k, metrics_mode='lazy', backend=backend, n_shards=n_shards)
+    start = time.perf_counter()
+    knn.train(X, y)
+    return knn, time.perf_counter() - start
+
+
+def canonical(result):
+    """Hasil predict dengan tetangga berjarak sama diurutkan berdasarkan indeks training"""
+    rows = []
+    for row in result['predictions']:
+        neighbors = row['nearest_neighbors']
+        pairs = sorted(zip(neighbors['distances'], neighbors['indices']))
+        rows.append({**row, 'nearest_neighbors': pairs})
+    return rows
+
+
+def to_likert(X):
+    """Bulatkan fitur kontinu ke skala integer 1..5 seperti jawaban kuesioner"""
+    return np.clip(np.rint(X), -2, 2) + 3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=400000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--classes', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--data', default='gaussian', choices=['gaussian', 'likert'])
+    args = parser.parse_args()
+
+    X, y = make_classification(args.rows, args.features, args.classes)
+    X_test = make_queries(args.queries, args.features)
+    if args.data == 'likert':
+        X, X_test = to_likert(X), to_likert(X_test)
+
+    exact, exact_build = build(X, y, args.k, 'exact')
+    expected, exact_time = timed(lambda: exact.predict(X_test), args.repeats)
+    expected = canonical(expected)
+
+    print(f"data={args.data} rows={args.rows} features={args.features} queries={args.queries} k={args.k} "
+          f"(core tersedia: {available_cores()})")
+    print(f"{'backend':<18}{'build s':>9}{'QPS':>10}{'speedup':>9}{'identik':>9}")
+    print(f"{'exact':<18}{exact_build:>9.2f}{args.queries / exact_time:>10.0f}{1.0:>8.1f}x"
+          f"{'-':>9}")
+
+    for n_shards in args.shards:
+        sharded, sharded_build = build(X, y, args.k, 'sharded', n_shards)
+        # Query pertama menunggu proses shard selesai membangun index
+        sharded.predict(X_test[:1])
+        result, sharded_time = timed(lambda: sharded.predict(X_test), args.repeats)
+        label = f'sharded n={sharded.model.n_shards_}'
+        print(f"{label:<18}{sharded_build:>9.2f}{args.queries / sharded_time:>10.0f}"
+              f"{exact_time / sharded_time:>8.1f}x{str(canonical(result) == expected):>9}")
+        sharded.model.close()
+
+
+if __name__ == '__main__':
+    main()
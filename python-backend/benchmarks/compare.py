@@ -0,0 +1,109 @@
+"""
+Bandingkan dua file hasil benchmarks/run_suite.py (baseline vs kandidat).
+
+Case dicocokkan berdasarkan nama dan dibandingkan lewat median. Case yang lebih
+lambat dari ambang (--threshold, default 10%) ditandai sebagai regresi.
+
+Jalankan dari folder python-backend:
+    python benchmarks/compare.py benchmarks/results/abc-small.json benchmarks/results/def-small.json
+    python benchmarks/compare.py baseline.json kandidat.json --threshold 0.05 --fail-on-regression
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as handle:
+        report = json.load(handle)
+    return report, {result['name']: result for result in report['results']}
+
+
+def compare(baseline, candidate, threshold):
+    """
+    Bandingkan hasil per case
+
+    Args:
+        baseline: Dict {name: result} dari laporan baseline
+        candidate: Dict {name: result} dari laporan kandidat
+        threshold: Perubahan relatif median yang dianggap signifikan (0.1 = 10%)
+
+    Returns:
+        list: Dict {'name', 'baseline', 'candidate', 'ratio', 'status'}; status
+            'regresi', 'lebih cepat', 'sama', 'baru' atau 'hilang'
+    """
+    rows = []
+    for name in list(baseline) + [name for name in candidate if name not in baseline]:
+        before = baseline.get(name)
+        after = candidate.get(name)
+        if before is None or after is None:
+            rows.append({
+                'name': name,
+                'baseline': before['median'] if before else None,
+                'candidate': after['median'] if after else None,
+                'ratio': None,
+                'status': 'baru' if before is None else 'hilang'
+            })
+            continue
+
+        ratio = after['median'] / before['median'] if before['median'] > 0 else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regresi'
+        elif ratio < 1 / (1 + threshold):
+            status = 'lebih cepat'
+        else:
+            status = 'sama'
+        rows.append({
+            'name': name,
+            'baseline': before['median'],
+            'candidate': after['median'],
+            'ratio': ratio,
+            'status': status
+        })
+    return rows
+
+
+def _ms(value):
+    return f"{value * 1000:.2f}" if value is not None else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.10)
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit code 1 jika ada regresi (untuk CI)')
+    args = parser.parse_args()
+
+    baseline_report, baseline = load_report(args.baseline)
+    candidate_report, candidate = load_report(args.candidate)
+
+    for label, report in (('baseline', baseline_report), ('kandidat', candidate_report)):
+        env = report['environment']
+        commit = (env.get('commit') or '-')[:10] + (' (dirty)' if env.get('dirty') else '')
+        print(f"{label:<9} {commit}  size={report['size']}  python={env['python']}  "
+              f"{env['machine']} x{env['cpu_count']}")
+    if baseline_report['params'] != candidate_report['params']:
+        print("PERINGATAN: parameter dataset berbeda, hasil tidak sebanding")
+    if baseline_report['environment']['platform'] != candidate_report['environment']['platform']:
+        print("PERINGATAN: platform berbeda")
+
+    rows = compare(baseline, candidate, args.threshold)
+    print()
+    print(f"{'case':<34}{'baseline ms':>13}{'kandidat ms':>13}{'rasio':>8}  status")
+    for row in rows:
+        ratio = f"{row['ratio']:.2f}" if row['ratio'] is not None else '-'
+        print(f"{row['name']:<34}{_ms(row['baseline']):>13}{_ms(row['candidate']):>13}"
+              f"{ratio:>8}  {row['status']}")
+
+    regressions = [row for row in rows if row['status'] == 'regresi']
+    print()
+    print(f"{len(regressions)} regresi (ambang {args.threshold:.0%})")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Benchmark suite untuk hot path python-backend (KNN, fuzzy, parser, route Flask).
+
+Setiap case dijalankan sekali sebagai warm-up lalu diulang --repeat kali; hasil
+(timing per ulangan, statistik, parameter dataset dan info mesin/commit) ditulis
+ke file JSON yang bisa dibandingkan dengan benchmarks/compare.py.
+
+Jalankan dari folder python-backend:
+    python benchmarks/run_suite.py --size small
+    python benchmarks/run_suite.py --size medium --filter knn --output baseline.json
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from synthetic_data import (  # noqa: E402
+    make_classification, make_document_text, make_fuzzy_inputs, make_queries, make_rule_base
+)
+from algorithms.fuzzy_cache import fuzzy_system_cache  # noqa: E402
+from algorithms.fuzzy_logic import (  # noqa: E402
+    build_fuzzy_system, simple_fuzzy_inference, simple_fuzzy_inference_batch
+)
+from algorithms.knn import KNNAlgorithm, calculate_knn  # noqa: E402
+from algorithms.model_registry import model_registry  # noqa: E402
+from app import create_app  # noqa: E402
+from parse_cache import parse_cache  # noqa: E402
+from parsing import extract_data_from_text  # noqa: E402
+
+
+SCHEMA_VERSION = 1
+
+# Ukuran preset; setiap nilai bisa di-override lewat argumen CLI
+SIZES = {
+    'small': {
+        'rows': 500, 'features': 8, 'classes': 3, 'queries': 50, 'k_max': 10,
+        'criteria': 3, 'terms': 3, 'rules': 6, 'fuzzy_rows': 200, 'doc_rows': 5000
+    },
+    'medium': {
+        'rows': 5000, 'features': 16, 'classes': 5, 'queries': 500, 'k_max': 20,
+        'criteria': 4, 'terms': 5, 'rules': 20, 'fuzzy_rows': 2000, 'doc_rows': 50000
+    },
+    'large': {
+        'rows': 50000, 'features': 32, 'classes': 10, 'queries': 2000, 'k_max': 20,
+        'criteria': 6, 'terms': 5, 'rules': 60, 'fuzzy_rows': 10000, 'doc_rows': 500000
+    },
+}
+
+
+def build_cases(params):
+    """
+    Susun daftar case benchmark
+
+    Args:
+        params: Parameter dataset (lihat SIZES)
+
+    Returns:
+        list: Dict {'name', 'group', 'items', 'run', 'setup'}; 'setup' (opsional)
+            dijalankan sebelum setiap ulangan dan tidak ikut diukur
+    """
+    X, y = make_classification(params['rows'], params['features'], params['classes'])
+    X_test = make_queries(params['queries'], params['features'])
+    criteria, rules = make_rule_base(params['criteria'], params['terms'], params['rules'])
+    fuzzy_inputs = make_fuzzy_inputs(params['fuzzy_rows'], params['criteria'])
+    fuzzy_rows = [dict(zip((c['name'] for c in criteria), row)) for row in fuzzy_inputs]
+    simple_inputs = make_fuzzy_inputs(params['fuzzy_rows'], 3).tolist()
+    document = make_document_text(params['doc_rows'])
+    document_bytes = document.encode('utf-8')
+    k_range = (1, params['k_max'])
+
+    trained = KNNAlgorithm(k=5, metrics_mode='lazy')
+    trained.train(X, y)
+
+    client = create_app().test_client()
+    X_list, y_list, X_test_list = X.tolist(), y.tolist(), X_test.tolist()
+
+    def post(path, payload):
+        response = client.post(path, json=payload)
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+        return response
+
+    def post_parse():
+        response = client.post('/api/parse', data={
+            'file': (io.BytesIO(document_bytes), 'dokumen.txt')
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200, response.get_data(as_text=True)[:200]
+
+    def build_and_compute(engine):
+        fuzzy_sys = build_fuzzy_system(criteria, rules, engine=engine)
+        return fuzzy_sys.compute(fuzzy_rows[0])
+
+    def clear_caches():
+        model_registry.clear()
+        fuzzy_system_cache.clear()
+        parse_cache.clear()
+
+    numpy_system = build_fuzzy_system(criteria, rules, engine='numpy')
+    skfuzzy_system = build_fuzzy_system(criteria, rules, engine='skfuzzy')
+    compute_rows = fuzzy_rows[:min(len(fuzzy_rows), 100)]
+
+    return [
+        # KNN
+        {'name': 'knn.calculate_knn', 'group': 'knn', 'items': params['queries'],
+         'run': lambda: calculate_knn(X, y, X_test, k=5)},
+        {'name': 'knn.predict', 'group': 'knn', 'items': params['queries'],
+         'run': lambda: trained.predict(X_test)},
+        {'name': 'knn.find_optimal_k.sweep', 'group': 'knn', 'items': params['k_max'],
+         'run': lambda: KNNAlgorithm().find_optimal_k(X, y, k_range, engine='sweep')},
+        {'name': 'knn.find_optimal_k.cv', 'group': 'knn', 'items': params['k_max'],
+         'run': lambda: KNNAlgorithm().find_optimal_k(X, y, k_range, engine='cv')},
+
+        # Fuzzy
+        {'name': 'fuzzy.build_compute.skfuzzy', 'group': 'fuzzy', 'items': 1,
+         'run': lambda: build_and_compute('skfuzzy')},
+        {'name': 'fuzzy.build_compute.numpy', 'group': 'fuzzy', 'items': 1,
+         'run': lambda: build_and_compute('numpy')},
+        {'name': 'fuzzy.compute.skfuzzy', 'group': 'fuzzy', 'items': len(compute_rows),
+         'run': lambda: [skfuzzy_system.compute(row) for row in compute_rows]},
+        {'name': 'fuzzy.compute_batch.numpy', 'group': 'fuzzy', 'items': len(fuzzy_rows),
+         'run': lambda: numpy_system.compute_batch(fuzzy_rows)},
+        {'name': 'fuzzy.simple_inference', 'group': 'fuzzy', 'items': len(simple_inputs),
+         'run': lambda: [simple_fuzzy_inference(row, [0.3, 0.3, 0.4]) for row in simple_inputs]},
+        {'name': 'fuzzy.simple_inference_batch', 'group': 'fuzzy', 'items': len(simple_inputs),
+         'run': lambda: simple_fuzzy_inference_batch(simple_inputs, [0.3, 0.3, 0.4])},
+
+        # Parser
+        {'name': 'parse.extract_data_from_text', 'group': 'parse', 'items': params['doc_rows'],
+         'run': lambda: extract_data_from_text(document)},
+
+        # Flask end-to-end (cache dikosongkan agar setiap ulangan mengukur request dingin)
+        {'name': 'flask.knn_calculate', 'group': 'flask', 'items': params['queries'],
+         'setup': clear_caches,
+         'run': lambda: post('/api/knn/calculate', {
+             'train_data': X_list, 'train_labels': y_list, 'test_data': X_test_list, 'k': 5
+         })},
+        {'name': 'flask.knn_find_optimal_k', 'group': 'flask', 'items': params['k_max'],
+         'run': lambda: post('/api/knn/find-optimal-k', {
+             'train_data': X_list, 'train_labels': y_list, 'k_range': list(k_range)
+         })},
+        {'name': 'flask.fuzzy_calculate', 'group': 'flask', 'items': 1,
+         'run': lambda: post('/api/fuzzy/calculate', {
+             'input_values': simple_inputs[0], 'weights': [0.3, 0.3, 0.4]
+         })},
+        {'name': 'flask.fuzzy_inference', 'group': 'flask', 'items': 1,
+         'setup': clear_caches,
+         'run': lambda: post('/api/fuzzy/inference', {
+             'criteria': criteria, 'rules': rules, 'inputs': fuzzy_rows[0]
+         })},
+        {'name': 'flask.parse', 'group': 'flask', 'items': params['doc_rows'],
+         'setup': clear_caches,
+         'run': post_parse},
+        {'name': 'flask.parse.cached', 'group': 'flask', 'items': params['doc_rows'],
+         'run': post_parse},
+    ]
+
+
+def run_case(case, repeat):
+    """
+    Jalankan satu case: satu warm-up lalu repeat ulangan dengan GC dimatikan
+
+    Returns:
+        dict: Timing (detik) dan statistik
+    """
+    setup = case.get('setup')
+    if setup:
+        setup()
+    case['run']()
+
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            case['run']()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    median = statistics.median(timings)
+    return {
+        'name': case['name'],
+        'group': case['group'],
+        'items': case['items'],
+        'repeat': repeat,
+        'timings': timings,
+        'min': min(timings),
+        'median': median,
+        'mean': statistics.fmean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'items_per_second': case['items'] / median if median > 0 else None,
+    }
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ['git', *args], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info():
+    """Info commit, interpreter, library dan mesin untuk file hasil"""
+    status = _git('status', '--porcelain')
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'libraries': {
+            name: metadata.version(name)
+            for name in ('numpy', 'scikit-learn', 'scikit-fuzzy', 'flask')
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', choices=sorted(SIZES), default='small')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default=None,
+                        help='Hanya jalankan case yang namanya mengandung teks ini')
+    parser.add_argument('--output', default=None,
+                        help='File JSON hasil (default: benchmarks/results/<commit>-<size>.json)')
+    for key, value in SIZES['small'].items():
+        parser.add_argument('--' + key.replace('_', '-'), type=type(value), default=None)
+    args = parser.parse_args()
+
+    params = dict(SIZES[args.size])
+    for key in params:
+        value = getattr(args, key)
+        if value is not None:
+            params[key] = value
+
+    cases = build_cases(params)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case['name']]
+
+    print(f"size={args.size} repeat={args.repeat} " +
+          ' '.join(f"{key}={value}" for key, value in params.items()))
+    print(f"{'case':<34}{'median ms':>11}{'min ms':>10}{'stdev ms':>10}{'items/s':>12}")
+
+    results = []
+    for case in cases:
+        result = run_case(case, args.repeat)
+        results.append(result)
+        print(f"{result['name']:<34}{result['median'] * 1000:>11.2f}{result['min'] * 1000:>10.2f}"
+              f"{result['stdev'] * 1000:>10.2f}{result['items_per_second']:>12.0f}")
+
+    env = environment_info()
+    report = {
+        'schema_version': SCHEMA_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'size': args.size,
+        'params': params,
+        'environment': env,
+        'results': results,
+    }
+
+    output = args.output
+    if output is None:
+        commit = (env['commit'] or 'nocommit')[:10] + ('-dirty' if env['dirty'] else '')
+        output = os.path.join(os.path.dirname(__file__), 'results', f"{commit}-{args.size}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Hasil disimpan ke {output}")
+
+
+if __name__ == '__main__':
+    main()
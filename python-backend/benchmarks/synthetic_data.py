@@ -0,0 +1,176 @@
+"""
+Generator dataset sintetis untuk benchmark suite.
+
+Semua generator deterministik untuk seed yang sama, sehingga hasil benchmark
+antar commit membandingkan input yang identik.
+"""
+
+import numpy as np
+
+# Label term untuk 3 term; selain itu term diberi nama term0, term1, ...
+_THREE_TERMS = ('rendah', 'sedang', 'tinggi')
+
+
+def make_classification(rows, features, classes=3, seed=0):
+    """
+    Dataset klasifikasi: cluster Gaussian per kelas
+
+    Args:
+        rows: Jumlah baris
+        features: Jumlah fitur
+        classes: Jumlah kelas
+        seed: Seed random
+
+    Returns:
+        tuple: (X float64 (rows, features), y int64 (rows,))
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=3.0, size=(classes, features))
+    labels = rng.integers(0, classes, rows)
+    data = centers[labels] + rng.normal(size=(rows, features))
+    return data, labels
+
+
+def make_queries(rows, features, seed=1):
+    """Data test untuk prediksi dengan skala yang sama dengan make_classification"""
+    rng = np.random.default_rng(seed)
+    return rng.normal(scale=3.0, size=(rows, features))
+
+
+def term_memberships(n_terms, universe=(0, 100)):
+    """
+    Term trimf yang tersebar rata di universe
+
+    Returns:
+        dict: {label: ['trimf', [a, b, c]]}
+    """
+    low, high = universe
+    peaks = np.linspace(low, high, n_terms)
+    step = (high - low) / max(n_terms - 1, 1)
+    names = _THREE_TERMS if n_terms == 3 else [f'term{i}' for i in range(n_terms)]
+    return {
+        name: ['trimf', [float(max(low, peak - step)), float(peak), float(min(high, peak + step))]]
+        for name, peak in zip(names, peaks)
+    }
+
+
+def make_rule_base(n_criteria, n_terms=3, n_rules=None, seed=0):
+    """
+    Rule base Mamdani sintetis
+
+    Args:
+        n_criteria: Jumlah input
+        n_terms: Jumlah term per input
+        n_rules: Jumlah rule (default: 2 per term output)
+        seed: Seed random
+
+    Returns:
+        tuple: (criteria, rules) dalam format request /api/fuzzy/inference
+    """
+    rng = np.random.default_rng(seed)
+    memberships = term_memberships(n_terms)
+    criteria = [
+        {'name': f'kriteria{i}', 'range': [0, 100], 'memberships': memberships}
+        for i in range(n_criteria)
+    ]
+
+    input_terms = list(memberships)
+    output_terms = list(_THREE_TERMS)
+    n_rules = n_rules or 2 * len(output_terms)
+    rules = []
+    for i in range(n_rules):
+        antecedents = [[c['name'], str(rng.choice(input_terms))] for c in criteria]
+        rules.append({
+            'antecedents': antecedents,
+            # Term output bergiliran agar semua term output dipakai
+            'consequent': ['hasil', output_terms[i % len(output_terms)]],
+            'operator': 'AND' if i % 2 == 0 else 'OR'
+        })
+    return criteria, rules
+
+
+def make_fuzzy_inputs(rows, n_criteria, seed=0):
+    """
+    Nilai input fuzzy di [0, 100]
+
+    Returns:
+        numpy.ndarray: (rows, n_criteria)
+    """
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 100, size=(rows, n_criteria))
+
+
+def make_document_text(rows, noise_ratio=0.2, seed=0):
+    """
+    Teks dokumen seperti hasil ekstraksi PDF/DOCX untuk /api/parse
+
+    Args:
+        rows: Jumlah baris data (format "10.5, 20, 30.25, A")
+        noise_ratio: Perbandingan baris non-data (judul, paragraf) terhadap baris data
+        seed: Seed random
+
+    Returns:
+        str: Teks dengan baris dipisah newline
+    """
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.uniform(0, 100, size=(rows, 3)), 2)
+    labels = rng.choice(['A', 'B', 'C', 'Baik', 'Cukup'], size=rows)
+    separators = [', ', ' ', '\t', '; ']
+
+    lines = []
+    for i in range(rows):
+        if rng.random() < noise_ratio:
+            lines.append('Tabel hasil pengukuran kualitas produk periode berjalan')
+        sep = separators[i % len(separators)]
+        lines.append(sep.join(str(v) for v in values[i]) + sep + labels[i])
+    return '\n'.join(lines)
+
+
+def make_pdf_document(pages, rows_per_page=40, seed=0):
+    """
+    PDF multi-halaman berisi baris data teks untuk /api/parse
+
+    PDF ditulis langsung (font Helvetica, satu operator Tj per baris) sehingga
+    tidak butuh library PDF tambahan.
+
+    Args:
+        pages: Jumlah halaman
+        rows_per_page: Jumlah baris data per halaman
+        seed: Seed random
+
+    Returns:
+        bytes: Isi file PDF
+    """
+    text = make_document_text(pages * rows_per_page, noise_ratio=0.0, seed=seed)
+    lines = text.split('\n')
+
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None,
+               b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_refs = []
+    for page in range(pages):
+        chunk = lines[page * rows_per_page:(page + 1) * rows_per_page]
+        ops = ['BT /F1 10 Tf 12 TL 40 800 Td']
+        for line in chunk:
+            escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            ops.append(f'({escaped}) Tj T*')
+        ops.append('ET')
+        content = '\n'.join(ops).encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + content + b'\nendstream')
+        content_ref = len(objects)
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_ref)
+        page_refs.append(len(objects))
+    kids = b' '.join(b'%d 0 R' % ref for ref in page_refs)
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, pages)
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
@@ -0,0 +1,196 @@
+"""
+Format biner untuk upload dataset training.
+Matriks fitur dikirim sebagai byte mentah little-endian dan dibaca langsung
+dengan np.frombuffer, tanpa melewati JSON dan list Python.
+
+Format RCDS:
+    magic      4 byte   b'RCDS'
+    header_len uint32   panjang header JSON (little-endian)
+    header     JSON     {"dtype", "rows", "cols", "labels", "label_dtype"}
+    padding    0-7 byte sampai offset kelipatan 8
+    features   rows * cols nilai dtype (row-major)
+    labels     rows kode label (label_dtype), indeks ke header["labels"]
+
+Bagian labels boleh tidak ada (label_dtype null), misalnya untuk test data.
+File .npy biasa juga diterima (tanpa pickle).
+"""
+
+import ast
+import json
+import struct
+
+import numpy as np
+
+
+RCDS_MAGIC = b'RCDS'
+NPY_MAGIC = b'\x93NUMPY'
+
+FEATURE_DTYPES = ('<f4', '<f8')
+LABEL_CODE_DTYPES = ('<u1', '<u2', '<u4')
+
+_ALIGNMENT = 8
+
+
+def _aligned(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def encode_dataset(features, labels=None, dtype='<f4'):
+    """
+    Encode matriks fitur (dan label) ke format RCDS
+
+    Args:
+        features: Array (n_samples, n_features)
+        labels: Label per baris (optional)
+        dtype: '<f4' (float32) atau '<f8' (float64)
+
+    Returns:
+        bytes: Payload RCDS
+    """
+    if dtype not in FEATURE_DTYPES:
+        raise ValueError(f"dtype harus salah satu dari {FEATURE_DTYPES}")
+
+    features = np.ascontiguousarray(features, dtype=dtype)
+    if features.ndim != 2:
+        raise ValueError("features harus berupa matriks 2 dimensi.")
+    rows, cols = features.shape
+
+    header = {'dtype': dtype, 'rows': rows, 'cols': cols, 'labels': None, 'label_dtype': None}
+    label_bytes = b''
+    if labels is not None:
+        dictionary, codes = np.unique(np.asarray(labels), return_inverse=True)
+        if len(codes) != rows:
+            raise ValueError("Jumlah label harus sama dengan jumlah baris fitur.")
+        label_dtype = next(
+            code_dtype for code_dtype in LABEL_CODE_DTYPES
+            if len(dictionary) <= np.iinfo(np.dtype(code_dtype)).max + 1
+        )
+        header['labels'] = dictionary.tolist()
+        header['label_dtype'] = label_dtype
+        label_bytes = codes.astype(label_dtype).tobytes()
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    prefix_len = len(RCDS_MAGIC) + 4 + len(header_bytes)
+    padding = b'\x00' * (_aligned(prefix_len) - prefix_len)
+
+    return b''.join([
+        RCDS_MAGIC, struct.pack('<I', len(header_bytes)), header_bytes,
+        padding, features.tobytes(), label_bytes
+    ])
+
+
+def decode_dataset(buffer):
+    """
+    Decode payload RCDS tanpa menyalin matriks fitur
+
+    Args:
+        buffer: bytes / memoryview berisi payload RCDS
+
+    Returns:
+        tuple: (features, labels) dengan labels None jika tidak ada.
+            features adalah view read-only ke buffer.
+    """
+    buffer = memoryview(buffer)
+    if bytes(buffer[:4]) != RCDS_MAGIC or len(buffer) < 8:
+        raise ValueError("Payload bukan format RCDS.")
+
+    (header_len,) = struct.unpack_from('<I', buffer, 4)
+    header_end = 8 + header_len
+    try:
+        header = json.loads(bytes(buffer[8:header_end]))
+    except ValueError:
+        raise ValueError("Header RCDS tidak valid.")
+
+    dtype = header.get('dtype')
+    if dtype not in FEATURE_DTYPES:
+        raise ValueError(f"dtype RCDS tidak didukung: {dtype}")
+    rows, cols = int(header['rows']), int(header['cols'])
+
+    offset = _aligned(header_end)
+    feature_count = rows * cols
+    feature_end = offset + feature_count * np.dtype(dtype).itemsize
+    if feature_end > len(buffer):
+        raise ValueError("Payload RCDS terpotong: data fitur tidak lengkap.")
+    features = np.frombuffer(buffer, dtype=dtype, count=feature_count, offset=offset)
+    features = features.reshape(rows, cols)
+
+    label_dtype = header.get('label_dtype')
+    if label_dtype is None:
+        return features, None
+    if label_dtype not in LABEL_CODE_DTYPES:
+        raise ValueError(f"label_dtype RCDS tidak didukung: {label_dtype}")
+
+    if feature_end + rows * np.dtype(label_dtype).itemsize > len(buffer):
+        raise ValueError("Payload RCDS terpotong: data label tidak lengkap.")
+    codes = np.frombuffer(buffer, dtype=label_dtype, count=rows, offset=feature_end)
+    dictionary = np.asarray(header['labels'])
+    if len(codes) and codes.max() >= len(dictionary):
+        raise ValueError("Kode label RCDS di luar kamus label.")
+
+    return features, dictionary[codes]
+
+
+def decode_npy(buffer):
+    """
+    Decode file .npy tanpa menyalin data (object array / pickle ditolak)
+
+    Args:
+        buffer: bytes / memoryview berisi file .npy
+
+    Returns:
+        numpy.ndarray: View read-only ke buffer
+    """
+    buffer = memoryview(buffer)
+    if bytes(buffer[:6]) != NPY_MAGIC or len(buffer) < 10:
+        raise ValueError("Payload bukan file .npy.")
+
+    major = buffer[6]
+    if major == 1:
+        (header_len,) = struct.unpack_from('<H', buffer, 8)
+        header_start = 10
+    elif major in (2, 3):
+        (header_len,) = struct.unpack_from('<I', buffer, 8)
+        header_start = 12
+    else:
+        raise ValueError(f"Versi format .npy tidak didukung: {major}")
+
+    header_end = header_start + header_len
+    encoding = 'utf-8' if major == 3 else 'latin1'
+    try:
+        header = _literal_header(bytes(buffer[header_start:header_end]).decode(encoding))
+        dtype = np.lib.format.descr_to_dtype(header['descr'])
+        shape = tuple(header['shape'])
+        fortran_order = bool(header['fortran_order'])
+    except (KeyError, TypeError, ValueError, SyntaxError):
+        raise ValueError("Header .npy tidak valid.")
+
+    if dtype.hasobject:
+        raise ValueError("File .npy dengan object dtype tidak didukung.")
+
+    count = int(np.prod(shape)) if shape else 1
+    if header_end + count * dtype.itemsize > len(buffer):
+        raise ValueError("File .npy terpotong.")
+    array = np.frombuffer(buffer, dtype=dtype, count=count, offset=header_end)
+    return array.reshape(shape, order='F' if fortran_order else 'C')
+
+
+def _literal_header(text):
+    header = ast.literal_eval(text)
+    if not isinstance(header, dict):
+        raise ValueError("Header .npy harus berupa dict.")
+    return header
+
+
+def decode_array_upload(buffer):
+    """
+    Decode upload biner berdasarkan magic bytes
+
+    Returns:
+        tuple: (array, labels) - labels hanya terisi untuk payload RCDS berlabel
+    """
+    prefix = bytes(memoryview(buffer)[:6])
+    if prefix.startswith(RCDS_MAGIC):
+        return decode_dataset(buffer)
+    if prefix == NPY_MAGIC:
+        return decode_npy(buffer), None
+    raise ValueError("Format upload tidak dikenali (harus RCDS atau .npy).")
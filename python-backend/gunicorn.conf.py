@@ -0,0 +1,51 @@
+"""
+Konfigurasi gunicorn untuk R-Count Python Backend.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Sedikit worker web dengan process pool KNN (algorithms/executor.py) selebar jumlah
+# core: request ringan (predict, fuzzy) dilayani thread, sedangkan find-optimal-k dan
+# cross-validation memakai semua core lewat pool. Membagi core rata per worker
+# (core // workers) justru membuat pool berukuran 1 dan mematikan eksekusi paralel.
+# Jika dua request berat berjalan bersamaan, kedua pool berbagi core.
+cores = multiprocessing.cpu_count()
+workers = int(os.environ.get('WEB_CONCURRENCY', min(2, cores)))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+os.environ.setdefault('KNN_PARALLEL_WORKERS', str(cores))
+
+# Snapshot metrics per worker digabung saat scrape /api/metrics (algorithms/instrumentation.py)
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'rcount-metrics'))
+
+# Import modul berat sekali di master, worker mewarisinya lewat copy-on-write
+preload_app = True
+
+
+def on_starting(server):
+    # Snapshot dari run sebelumnya dibuang agar counter mulai dari nol
+    shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+
+
+def post_worker_init(worker):
+    # Warm-up dijalankan setelah fork: thread pool OpenMP/BLAS tidak aman
+    # diwariskan lewat fork. Worker baru mulai menerima koneksi setelah hook
+    # ini selesai, jadi request pertama tidak membayar cold start.
+    from jobs import job_queue
+    from warmup import warm_up
+
+    warm_up(worker.wsgi)
+    worker.log.info("Worker %s warm-up selesai dalam %ss",
+                    worker.pid, worker.wsgi.config['WARMUP_SECONDS'])
+
+    # Thread job queue dijalankan sekarang agar job queued dari sebelum restart
+    # langsung dilanjutkan (kecuali JOBS_EMBEDDED_WORKERS=0, lihat jobs.py)
+    job_queue.start_embedded()
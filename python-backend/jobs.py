@@ -0,0 +1,558 @@
+"""
+Job queue asynchronous untuk pekerjaan KNN dan fuzzy yang lama.
+
+Submit mengembalikan job_id; status, progress, hasil dan pembatalan dibaca lewat
+/api/jobs. Antrian disimpan di SQLite (JOBS_DB), sehingga dibagi semua worker
+gunicorn dan bertahan saat restart tanpa broker eksternal.
+
+Job dibagi ke dua lane dengan thread worker masing-masing: 'heavy' untuk
+find_optimal_k dan dataset besar, 'quick' untuk sisanya, sehingga job kecil tidak
+mengantri di belakang job berat. Worker mengklaim job dengan lease yang
+diperpanjang heartbeat; job milik proses yang mati diambil ulang setelah lease
+habis (maksimal JOBS_MAX_ATTEMPTS kali).
+
+Pembatalan bersifat kooperatif: job queued langsung dibatalkan, job running
+berhenti pada callback progress berikutnya (per K, pasangan fold/K, atau task
+process pool untuk find_optimal_k), atau hasilnya dibuang saat selesai.
+
+Thread worker dijalankan di setiap worker gunicorn saat start (post_worker_init),
+sehingga job queued dari sebelum restart langsung dilanjutkan. Dengan
+JOBS_EMBEDDED_WORKERS=0 worker web hanya menerima submit, dan job dijalankan oleh
+runner terpisah (python jobs.py) agar job berat tidak berbagi GIL dengan request.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+from algorithms.fuzzy_cache import fuzzy_system_cache
+from algorithms.fuzzy_surface import surface_from_option
+from algorithms.knn import KNNAlgorithm, OperationCancelled, calculate_knn
+from algorithms.model_registry import model_registry
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+LANES = ('quick', 'heavy')
+
+DEFAULT_DB = os.environ.get('JOBS_DB', os.path.join(tempfile.gettempdir(), 'rcount-jobs.sqlite3'))
+DEFAULT_WORKERS = {
+    'quick': int(os.environ.get('JOBS_QUICK_WORKERS', 2)),
+    'heavy': int(os.environ.get('JOBS_HEAVY_WORKERS', 1)),
+}
+DEFAULT_MAX_QUEUED = int(os.environ.get('JOBS_MAX_QUEUED', 100))
+DEFAULT_LEASE_SECONDS = float(os.environ.get('JOBS_LEASE_SECONDS', 60))
+DEFAULT_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 3))
+DEFAULT_RETENTION_SECONDS = float(os.environ.get('JOBS_RETENTION_SECONDS', 24 * 3600))
+
+# True: thread worker berjalan di proses web; False: hanya di runner `python jobs.py`
+EMBEDDED_WORKERS = os.environ.get('JOBS_EMBEDDED_WORKERS', '1') == '1'
+
+# Jumlah nilai input (baris x kolom) mulai dari mana job masuk lane 'heavy'
+DEFAULT_HEAVY_MIN_VALUES = int(os.environ.get('JOBS_HEAVY_MIN_VALUES', 200000))
+
+# Worker memeriksa antrian setiap interval ini jika tidak dibangunkan oleh submit
+POLL_INTERVAL = 1.0
+
+# Progress ditulis ke database paling sering sekali per interval ini
+PROGRESS_INTERVAL = 0.25
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    lane TEXT NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    progress_done INTEGER NOT NULL DEFAULT 0,
+    progress_total INTEGER,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_lane_status ON jobs (lane, status, created_at);
+"""
+
+# Kolom ringkas (tanpa params dan result) untuk status dan daftar job
+_SUMMARY_COLUMNS = ('id, type, lane, status, error, progress_done, progress_total, '
+                    'cancel_requested, attempts, created_at, started_at, finished_at')
+
+
+class QueueFull(Exception):
+    """Antrian job sudah berisi JOBS_MAX_QUEUED job queued"""
+
+
+def _matrix_values(rows):
+    # Jumlah nilai (baris x kolom) dari list of lists
+    if not isinstance(rows, list) or not rows:
+        return 0
+    first = rows[0]
+    return len(rows) * (len(first) if isinstance(first, (list, tuple)) else 1)
+
+
+def _fuzzy_values(inputs):
+    if isinstance(inputs, dict):
+        return sum(len(column) if isinstance(column, list) else 1 for column in inputs.values())
+    if isinstance(inputs, list):
+        return sum(len(row) if isinstance(row, dict) else 1 for row in inputs)
+    return 0
+
+
+def _run_knn_find_optimal_k(params, progress):
+    knn = KNNAlgorithm(metric=params.get('metric', 'euclidean'),
+                       weights=params.get('weights', 'uniform'))
+    return knn.find_optimal_k(params['train_data'], params['train_labels'],
+                              tuple(params.get('k_range', [1, 20])),
+                              engine=params.get('engine', 'sweep'), progress=progress)
+
+
+def _run_knn_calculate(params, progress):
+    if len(params['train_data']) != len(params['train_labels']):
+        raise ValueError('train_data dan train_labels harus sama panjang')
+    return calculate_knn(
+        train_data=params['train_data'],
+        train_labels=params['train_labels'],
+        test_data=params['test_data'],
+        k=params.get('k', 3),
+        metric=params.get('metric', 'euclidean'),
+        weights=params.get('weights', 'uniform'),
+        registry=model_registry,
+        metrics_mode=params.get('metrics_mode', 'eager'),
+        backend=params.get('backend', 'exact'),
+        ann_params=params.get('ann_params'),
+        n_shards=params.get('n_shards'),
+        fields=params.get('fields'),
+        layout=params.get('layout', 'records')
+    )
+
+
+def _run_fuzzy_inference_batch(params, progress):
+    fuzzy_sys, _ = fuzzy_system_cache.get_or_build(
+        params.get('criteria', []),
+        params.get('rules', []),
+        output=params.get('output'),
+        defuzz_method=params.get('defuzz_method', 'centroid'),
+        engine=params.get('engine', 'skfuzzy'),
+        analytic=bool(params.get('analytic', False))
+    )
+    surface = surface_from_option(fuzzy_sys, params.get('surface'))
+    return (surface or fuzzy_sys).compute_batch(params['inputs'])
+
+
+# Jenis job: (handler(params, progress), field wajib, ukuran input untuk lane atau
+# None jika selalu 'heavy'). params sama dengan body endpoint sinkronnya.
+JOB_TYPES = {
+    'knn_find_optimal_k': (_run_knn_find_optimal_k, ('train_data', 'train_labels'), None),
+    'knn_calculate': (
+        _run_knn_calculate, ('train_data', 'train_labels', 'test_data'),
+        lambda params: _matrix_values(params['train_data']) + _matrix_values(params['test_data'])
+    ),
+    'fuzzy_inference_batch': (
+        _run_fuzzy_inference_batch, ('inputs',),
+        lambda params: _fuzzy_values(params['inputs'])
+    ),
+}
+
+
+def _json_default(value):
+    # Hasil algoritma bisa berisi skalar atau array numpy
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _iso(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='milliseconds')
+
+
+def _job_dict(row):
+    total = row['progress_total']
+    done = row['progress_done']
+    return {
+        'job_id': row['id'],
+        'type': row['type'],
+        'lane': row['lane'],
+        'status': row['status'],
+        'progress': {
+            'done': done,
+            'total': total,
+            'fraction': (done / total) if total else (1.0 if row['status'] == 'succeeded' else 0.0)
+        },
+        'cancel_requested': bool(row['cancel_requested']),
+        'attempts': row['attempts'],
+        'error': row['error'],
+        'created_at': _iso(row['created_at']),
+        'started_at': _iso(row['started_at']),
+        'finished_at': _iso(row['finished_at']),
+    }
+
+
+@contextmanager
+def _transaction(conn):
+    # BEGIN IMMEDIATE mengambil write lock di awal, sehingga klaim job antar
+    # proses tidak pernah memilih job yang sama
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+class JobQueue:
+    """Antrian job persisten (SQLite) dengan worker thread per lane"""
+
+    def __init__(self, path=DEFAULT_DB, workers=None, max_queued=DEFAULT_MAX_QUEUED,
+                 lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 retention_seconds=DEFAULT_RETENTION_SECONDS,
+                 heavy_min_values=DEFAULT_HEAVY_MIN_VALUES, embedded=EMBEDDED_WORKERS):
+        """
+        Args:
+            path: File database SQLite (dibagi semua proses)
+            workers: Dict {lane: jumlah thread worker}
+            max_queued: Jumlah maksimum job berstatus queued
+            lease_seconds: Durasi lease; job running tanpa heartbeat selama ini
+                dianggap ditinggalkan dan diambil ulang
+            max_attempts: Jumlah maksimum percobaan per job
+            retention_seconds: Job selesai yang lebih tua dari ini dihapus
+            heavy_min_values: Ukuran input minimum untuk lane 'heavy'
+            embedded: True jika proses web juga menjalankan thread worker (lihat
+                start_embedded); False jika job hanya dijalankan runner terpisah
+        """
+        self.path = path
+        self.workers = dict(workers or DEFAULT_WORKERS)
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.heavy_min_values = heavy_min_values
+        self.embedded = embedded
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wakeup = {lane: threading.Event() for lane in LANES}
+        self._stopping = threading.Event()
+        self._threads = []
+        self._started_pid = None
+        self._owner = None
+
+    def lane_for(self, job_type, params):
+        """Lane untuk job berdasarkan jenis dan ukuran input"""
+        size = JOB_TYPES[job_type][2]
+        if size is None or size(params) >= self.heavy_min_values:
+            return 'heavy'
+        return 'quick'
+
+    def submit(self, job_type, params, lane=None):
+        """
+        Masukkan job ke antrian
+
+        Args:
+            job_type: Salah satu key JOB_TYPES
+            params: Dict parameter (sama dengan body endpoint sinkron)
+            lane: 'quick' atau 'heavy' (default: dipilih dari ukuran input)
+
+        Returns:
+            dict: Status job
+
+        Raises:
+            ValueError: Jika jenis job, params atau lane tidak valid
+            QueueFull: Jika antrian penuh
+        """
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"type harus salah satu dari {sorted(JOB_TYPES)}")
+        if not isinstance(params, dict):
+            raise ValueError("params harus berupa object")
+        for field in JOB_TYPES[job_type][1]:
+            if field not in params:
+                raise ValueError(f'Missing required field: {field}')
+        if lane is None:
+            lane = self.lane_for(job_type, params)
+        elif lane not in LANES:
+            raise ValueError(f"lane harus salah satu dari {LANES}")
+
+        payload = json.dumps(params, default=_json_default)
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._db()
+        with _transaction(conn):
+            conn.execute("DELETE FROM jobs WHERE finished_at < ?", (now - self.retention_seconds,))
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                raise QueueFull(f'Antrian job penuh ({queued} job menunggu)')
+            conn.execute(
+                "INSERT INTO jobs (id, type, lane, status, params, created_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, job_type, lane, payload, now)
+            )
+
+        # Proses tanpa hook start (misalnya test client) tetap menjalankan job-nya
+        self.start_embedded()
+        self._wakeup[lane].set()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """Status job (tanpa hasil), atau None jika tidak ditemukan"""
+        row = self._db().execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return _job_dict(row) if row is not None else None
+
+    def result(self, job_id):
+        """
+        Status dan hasil job
+
+        Returns:
+            tuple: (status job, hasil atau None), atau (None, None) jika tidak ditemukan
+        """
+        row = self._db().execute(
+            f"SELECT {_SUMMARY_COLUMNS}, result FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        result = json.loads(row['result']) if row['result'] is not None else None
+        return _job_dict(row), result
+
+    def list(self, status=None, limit=50):
+        """Daftar job terbaru (tanpa hasil), opsional difilter status"""
+        query = f"SELECT {_SUMMARY_COLUMNS} FROM jobs"
+        args = []
+        if status is not None:
+            if status not in JOB_STATUSES:
+                raise ValueError(f"status harus salah satu dari {JOB_STATUSES}")
+            query += " WHERE status = ?"
+            args.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        args.append(int(limit))
+        return [_job_dict(row) for row in self._db().execute(query, args)]
+
+    def cancel(self, job_id):
+        """
+        Batalkan job: job queued langsung dibatalkan, job running ditandai dan
+        berhenti di titik progress berikutnya
+
+        Returns:
+            dict: Status job, atau None jika tidak ditemukan
+        """
+        now = time.time()
+        conn = self._db()
+        with _transaction(conn):
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ? "
+                "WHERE id = ? AND status = 'queued'", (now, job_id)
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+                (job_id,)
+            )
+        return self.get(job_id)
+
+    def stats(self):
+        """Jumlah job per status dan lane"""
+        counts = {lane: {status: 0 for status in JOB_STATUSES} for lane in LANES}
+        for row in self._db().execute(
+                "SELECT lane, status, COUNT(*) AS n FROM jobs GROUP BY lane, status"):
+            counts.setdefault(row['lane'], {})[row['status']] = row['n']
+        return {'lanes': counts, 'workers': dict(self.workers), 'max_queued': self.max_queued}
+
+    def start_embedded(self):
+        """Jalankan thread worker di proses web jika embedded (dipanggil saat worker start)"""
+        if self.embedded:
+            self.start()
+
+    def start(self):
+        """Jalankan thread worker dan heartbeat di proses ini (sekali per proses)"""
+        with self._lock:
+            # Thread tidak diwariskan lewat fork (misalnya worker gunicorn dengan preload)
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            self._owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+            self._stopping = threading.Event()
+            self._threads = [
+                threading.Thread(target=self._heartbeat_loop, name='rcount-job-heartbeat',
+                                 daemon=True)
+            ]
+            for lane, count in self.workers.items():
+                for index in range(count):
+                    self._threads.append(threading.Thread(
+                        target=self._worker_loop, args=(lane,),
+                        name=f'rcount-job-{lane}-{index}', daemon=True
+                    ))
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=None):
+        """Hentikan thread worker setelah job yang sedang berjalan selesai"""
+        with self._lock:
+            if self._started_pid != os.getpid():
+                return
+            self._started_pid = None
+            threads, self._threads = self._threads, []
+            self._stopping.set()
+        for event in self._wakeup.values():
+            event.set()
+        for thread in threads:
+            thread.join(timeout)
+
+    def _db(self):
+        # Satu koneksi per thread; koneksi SQLite tidak boleh dipakai lintas fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _worker_loop(self, lane):
+        stopping = self._stopping
+        while not stopping.is_set():
+            try:
+                job = self._claim(lane)
+            except sqlite3.Error:
+                job = None
+            if job is None:
+                self._wakeup[lane].wait(POLL_INTERVAL)
+                self._wakeup[lane].clear()
+                continue
+            try:
+                self._execute(job)
+            except sqlite3.Error:
+                # Hasil gagal ditulis; lease habis dan job diambil ulang
+                continue
+
+    def _claim(self, lane):
+        now = time.time()
+        conn = self._db()
+        with _transaction(conn):
+            # Job running dengan lease habis ditinggalkan oleh proses yang berhenti
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ?, lease_owner = NULL "
+                "WHERE lane = ? AND status = 'running' AND lease_expires < ? "
+                "AND cancel_requested = 1", (now, lane, now)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, lease_owner = NULL, "
+                "error = 'Worker berhenti saat menjalankan job' "
+                "WHERE lane = ? AND status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, lane, now, self.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT id, type, params FROM jobs WHERE lane = ? AND "
+                "(status = 'queued' OR (status = 'running' AND lease_expires < ?)) "
+                "ORDER BY created_at LIMIT 1", (lane, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, started_at = COALESCE(started_at, ?) WHERE id = ?",
+                (self._owner, now + self.lease_seconds, now, row['id'])
+            )
+        return row
+
+    def _execute(self, job):
+        job_id = job['id']
+        handler = JOB_TYPES[job['type']][0]
+        try:
+            result = handler(json.loads(job['params']), self._progress_callback(job_id))
+        except OperationCancelled:
+            self._finish(job_id, 'cancelled')
+        except Exception as e:
+            self._finish(job_id, 'failed', error=str(e))
+        else:
+            if self._cancel_requested(job_id):
+                self._finish(job_id, 'cancelled')
+            else:
+                self._finish(job_id, 'succeeded',
+                             result=json.dumps(result, default=_json_default))
+
+    def _finish(self, job_id, status, result=None, error=None):
+        # Hanya pemilik lease yang boleh menulis hasil
+        self._db().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+            "lease_owner = NULL, lease_expires = NULL "
+            "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (status, result, error, time.time(), job_id, self._owner)
+        )
+
+    def _cancel_requested(self, job_id):
+        row = self._db().execute(
+            "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return row is not None and bool(row['cancel_requested'])
+
+    def _progress_callback(self, job_id):
+        last_write = [0.0]
+
+        def progress(done, total):
+            now = time.monotonic()
+            if done < total and now - last_write[0] < PROGRESS_INTERVAL:
+                return
+            last_write[0] = now
+            self._db().execute(
+                "UPDATE jobs SET progress_done = ?, progress_total = ? WHERE id = ?",
+                (int(done), int(total), job_id)
+            )
+            if self._cancel_requested(job_id):
+                raise OperationCancelled(job_id)
+
+        return progress
+
+    def _heartbeat_loop(self):
+        stopping = self._stopping
+        while not stopping.wait(self.lease_seconds / 3):
+            try:
+                self._db().execute(
+                    "UPDATE jobs SET lease_expires = ? WHERE lease_owner = ? AND status = 'running'",
+                    (time.time() + self.lease_seconds, self._owner)
+                )
+            except sqlite3.Error:
+                continue
+
+
+# Queue default yang dipakai oleh Flask app
+job_queue = JobQueue()
+
+
+def main():
+    """Runner job terpisah untuk JOBS_EMBEDDED_WORKERS=0: python jobs.py"""
+    import signal
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    job_queue.start()
+    print(f"Job runner {os.getpid()} memproses {job_queue.path} "
+          f"(quick={job_queue.workers['quick']}, heavy={job_queue.workers['heavy']})")
+    stopping.wait()
+    # Job yang sedang berjalan diselesaikan dulu; sisanya tetap queued di database
+    job_queue.stop()
+
+
+if __name__ == '__main__':
+    main()
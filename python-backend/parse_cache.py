@@ -0,0 +1,249 @@
+"""
+Cache hasil /api/parse berdasarkan isi file (content-addressed).
+
+Key adalah SHA-256 dari byte upload ditambah jenis dokumen (pdf/docx/text) dan
+tag parser (hash ROW_PATTERN), sehingga file yang sama dengan nama berbeda tetap
+hit, sedangkan perubahan pola ekstraksi otomatis membuat entry lama tidak dipakai.
+
+Dua tier:
+- memori: LRU per proses dengan batas byte (PARSE_CACHE_MAX_BYTES)
+- disk (opsional, PARSE_CACHE_DIR): file JSON per key dengan batas ukuran total
+  (PARSE_CACHE_MAX_DISK_BYTES); file yang paling lama tidak dipakai (mtime)
+  dihapus lebih dulu. Tier disk dibagi semua worker dan bertahan saat restart.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from parsing import ROW_PATTERN, document_kind
+
+# Ukuran blok saat menghitung hash upload
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Berubah jika pola ekstraksi berubah, sehingga hasil lama di disk tidak terpakai
+PARSER_TAG = hashlib.sha256(ROW_PATTERN.pattern.encode('utf-8')).hexdigest()[:8]
+
+DEFAULT_MAX_BYTES = int(os.environ.get('PARSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+DEFAULT_MAX_DISK_BYTES = int(os.environ.get('PARSE_CACHE_MAX_DISK_BYTES', 512 * 1024 * 1024))
+
+
+def hash_stream(stream, chunk_size=HASH_CHUNK_SIZE):
+    """
+    SHA-256 isi stream, lalu posisi stream dikembalikan ke awal
+
+    Args:
+        stream: File-like object biner yang seekable
+
+    Returns:
+        str: Hex digest
+    """
+    start = stream.tell()
+    digest = hashlib.sha256()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    stream.seek(start)
+    return digest.hexdigest()
+
+
+def parse_cache_key(stream, filename):
+    """
+    Key cache untuk upload
+
+    Args:
+        stream: File-like object upload (seekable)
+        filename: Nama file (menentukan parser yang dipakai)
+
+    Returns:
+        str: Key berbentuk '<jenis>-<tag parser>-<sha256>'
+    """
+    return f'{document_kind(filename)}-{PARSER_TAG}-{hash_stream(stream)}'
+
+
+class ParseCache:
+    """Cache dua tier (memori LRU + disk) untuk baris hasil ekstraksi"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+        """
+        Args:
+            max_bytes: Batas ukuran (JSON) total entry di memori
+            directory: Folder tier disk; None untuk menonaktifkan tier disk
+            max_disk_bytes: Batas ukuran total file di tier disk
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    def get(self, key):
+        """
+        Ambil baris hasil ekstraksi
+
+        Returns:
+            list atau None jika tidak ada di kedua tier
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+
+        rows, payload = self._read_disk(key)
+        with self._lock:
+            if rows is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_memory(key, rows, len(payload))
+        return rows
+
+    def put(self, key, rows):
+        """Simpan baris hasil ekstraksi ke tier memori dan disk"""
+        payload = json.dumps(rows, separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            self._store_memory(key, rows, len(payload))
+        if self.directory is not None:
+            self._write_disk(key, payload)
+
+    def clear(self):
+        """Kosongkan tier memori dan disk"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+        for path, _, _ in self._disk_files():
+            _remove(path)
+
+    def stats(self):
+        """Statistik cache (entry, byte, hit per tier, miss, eviction)"""
+        disk_files = self._disk_files()
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.memory_hits + self.disk_hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'disk_enabled': self.directory is not None,
+                'disk_entries': len(disk_files),
+                'disk_bytes': sum(size for _, size, _ in disk_files),
+                'max_disk_bytes': self.max_disk_bytes,
+                'disk_evictions': self.disk_evictions
+            }
+
+    def _store_memory(self, key, rows, nbytes):
+        # Dipanggil dengan lock; hasil yang lebih besar dari budget tidak disimpan
+        if nbytes > self.max_bytes:
+            return
+        existing = self._entries.pop(key, None)
+        if existing is not None:
+            self._total_bytes -= existing[1]
+        self._entries[key] = (rows, nbytes)
+        self._total_bytes += nbytes
+        while self._total_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def _read_disk(self, key):
+        if self.directory is None:
+            return None, None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as handle:
+                payload = handle.read()
+            rows = json.loads(payload)
+        except FileNotFoundError:
+            return None, None
+        except (OSError, ValueError):
+            # File rusak (misalnya disk penuh saat ditulis) dianggap miss
+            _remove(path)
+            return None, None
+        try:
+            # mtime dipakai sebagai waktu akses terakhir untuk eviction LRU
+            os.utime(path)
+        except OSError:
+            pass
+        return rows, payload
+
+    def _write_disk(self, key, payload):
+        if len(payload) > self.max_disk_bytes:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Tulis ke file sementara lalu rename atomik, sehingga worker lain
+            # tidak pernah membaca file setengah jadi
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            # Tier disk bersifat best effort; kegagalan tulis tidak menggagalkan request
+            return
+        self._prune_disk()
+
+    def _disk_files(self):
+        """List (path, size, mtime) file cache di tier disk"""
+        if self.directory is None:
+            return []
+        files = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                info = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((path, info.st_size, info.st_mtime))
+        return files
+
+    def _prune_disk(self):
+        # Direktori di-scan ulang karena worker lain juga menulis ke folder yang sama
+        files = self._disk_files()
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_disk_bytes:
+            return
+        for path, size, _ in sorted(files, key=lambda item: item[2]):
+            if total <= self.max_disk_bytes:
+                break
+            if _remove(path):
+                total -= size
+                with self._lock:
+                    self.disk_evictions += 1
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+# Cache default yang dipakai oleh Flask app
+parse_cache = ParseCache(directory=os.environ.get('PARSE_CACHE_DIR') or None)
@@ -0,0 +1,261 @@
+"""
+Parser streaming untuk upload /api/parse.
+Dokumen dibaca per halaman (PDF), per paragraf (DOCX) atau per chunk (teks),
+lalu setiap baris langsung diekstrak sehingga dokumen tidak pernah disalin utuh
+sebagai satu string.
+
+PDF dengan banyak halaman (>= PDF_PARALLEL_MIN_PAGES) diekstrak paralel: rentang
+halaman dibagi ke process pool bersama (algorithms/executor.py) dan hasilnya
+digabung kembali sesuai urutan halaman.
+"""
+
+import codecs
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from algorithms.executor import get_executor, split_rows
+from algorithms.instrumentation import metrics, record_stage, stage, timed_iter
+
+# Pola baris data seperti: 10, 20, 30, Label atau 10.5 20.3 30.1 A
+ROW_PATTERN = re.compile(r'(\d+[\.\d]*)\D+(\d+[\.\d]*)\D+(\d+[\.\d]*)\D+([A-Za-z0-9]+)')
+
+# Ukuran chunk saat membaca file teks
+TEXT_CHUNK_SIZE = 64 * 1024
+
+# Di bawah jumlah halaman ini PDF diekstrak serial (overhead pool lebih besar)
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 32))
+
+# Jumlah halaman minimum per task; setiap task membuka ulang PDF di worker
+MIN_CHUNK_PAGES = 8
+
+
+def iter_pdf_lines(stream):
+    """
+    Generator baris teks dari PDF, satu halaman setiap kali
+
+    Args:
+        stream: File-like object (seekable) berisi PDF
+    """
+    import PyPDF2
+
+    yield from _iter_page_lines(PyPDF2.PdfReader(stream).pages)
+
+
+def _iter_page_lines(pages):
+    for page in pages:
+        # Setiap halaman diakhiri newline, jadi baris tidak pernah menyambung antar halaman
+        yield from (page.extract_text() or '').split('\n')
+
+
+def iter_docx_lines(stream):
+    """
+    Generator baris teks dari paragraf DOCX
+
+    Args:
+        stream: File-like object (seekable) berisi DOCX
+    """
+    from docx import Document
+
+    doc = Document(stream)
+    for para in doc.paragraphs:
+        yield from para.text.split('\n')
+
+
+def iter_text_lines(stream, chunk_size=TEXT_CHUNK_SIZE):
+    """
+    Generator baris dari file teks UTF-8 yang dibaca per chunk
+
+    Karakter multi-byte yang terpotong di batas chunk ditangani oleh
+    incremental decoder; byte yang tidak valid diabaikan.
+
+    Args:
+        stream: File-like object biner
+        chunk_size: Jumlah byte per pembacaan
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    pending = ''
+
+    while True:
+        chunk = stream.read(chunk_size)
+        final = not chunk
+        text = pending + decoder.decode(chunk, final=final)
+        lines = text.split('\n')
+        # Bagian setelah newline terakhir belum tentu baris lengkap
+        pending = lines.pop()
+        yield from lines
+        if final:
+            break
+
+    if pending:
+        yield pending
+
+
+def document_kind(filename):
+    """
+    Jenis dokumen sesuai ekstensi file
+
+    Returns:
+        str: 'pdf', 'docx' atau 'text'
+    """
+    filename = filename.lower()
+    if filename.endswith('.pdf'):
+        return 'pdf'
+    if filename.endswith('.docx'):
+        return 'docx'
+    return 'text'
+
+
+def iter_document_lines(stream, filename):
+    """
+    Pilih generator baris sesuai ekstensi file
+
+    Args:
+        stream: File-like object upload
+        filename: Nama file (untuk menentukan format)
+    """
+    kind = document_kind(filename)
+    if kind == 'pdf':
+        return iter_pdf_lines(stream)
+    if kind == 'docx':
+        return iter_docx_lines(stream)
+    return iter_text_lines(stream)
+
+
+def extract_row(line):
+    """
+    Ekstrak satu baris data (3 fitur + label)
+
+    Returns:
+        dict {'features', 'label'} atau None jika baris tidak cocok
+    """
+    match = ROW_PATTERN.search(line)
+    if not match:
+        return None
+    return {
+        "features": [float(match.group(1)), float(match.group(2)), float(match.group(3))],
+        "label": match.group(4)
+    }
+
+
+def iter_extracted_rows(lines):
+    """Generator baris data dari iterable baris teks"""
+    if metrics.enabled:
+        yield from _iter_extracted_rows_timed(lines)
+        return
+    for line in lines:
+        row = extract_row(line)
+        if row is not None:
+            yield row
+
+
+def _iter_extracted_rows_timed(lines):
+    # Waktu regex dijumlahkan lokal lalu dicatat sekali sebagai stage 'regex'
+    elapsed = 0.0
+    try:
+        for line in lines:
+            start = time.perf_counter()
+            row = extract_row(line)
+            elapsed += time.perf_counter() - start
+            if row is not None:
+                yield row
+    finally:
+        record_stage('regex', elapsed)
+
+
+def iter_document_rows(stream, filename, executor=None, min_pages=None):
+    """
+    Generator baris data dari upload sesuai jenis dokumen
+
+    Args:
+        stream: File-like object upload (seekable)
+        filename: Nama file (untuk menentukan format)
+        executor: ParallelExecutor untuk PDF besar (default: executor bersama)
+        min_pages: Jumlah halaman minimum untuk ekstraksi paralel
+            (default: PDF_PARALLEL_MIN_PAGES)
+    """
+    if document_kind(filename) == 'pdf':
+        yield from _iter_pdf_rows(stream, executor, min_pages)
+        return
+    lines = timed_iter(iter_document_lines(stream, filename), 'extract_text')
+    yield from iter_extracted_rows(lines)
+
+
+def _iter_pdf_rows(stream, executor, min_pages):
+    import PyPDF2
+
+    executor = executor or get_executor()
+    min_pages = PDF_PARALLEL_MIN_PAGES if min_pages is None else min_pages
+    reader = PyPDF2.PdfReader(stream)
+    n_pages = len(reader.pages)
+
+    if not executor.parallel or n_pages < min_pages:
+        lines = timed_iter(_iter_page_lines(reader.pages), 'extract_text')
+        yield from iter_extracted_rows(lines)
+        return
+
+    with stage('extract_parallel'):
+        chunks = extract_pdf_rows_parallel(stream, n_pages, executor)
+    for rows in chunks:
+        yield from rows
+
+
+def extract_pdf_rows_parallel(stream, n_pages, executor):
+    """
+    Ekstrak baris data dari PDF dengan membagi rentang halaman ke process pool
+
+    PDF disalin sekali ke file sementara; setiap worker membuka file itu sendiri
+    sehingga isi PDF tidak di-pickle per task.
+
+    Args:
+        stream: File-like object berisi PDF (seekable)
+        n_pages: Jumlah halaman
+        executor: ParallelExecutor
+
+    Returns:
+        list: List baris data per potongan, dalam urutan halaman
+    """
+    # Potongan lebih banyak dari worker agar halaman yang berat tersebar rata
+    n_chunks = max(1, min(2 * executor.max_workers, n_pages // MIN_CHUNK_PAGES))
+    ranges = split_rows(np.arange(n_pages), n_chunks)
+
+    stream.seek(0)
+    fd, path = tempfile.mkstemp(suffix='.pdf')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            shutil.copyfileobj(stream, handle)
+        tasks = [(path, int(pages[0]), int(pages[-1]) + 1) for pages in ranges]
+        return executor.map(_pdf_chunk_rows, tasks)
+    finally:
+        os.remove(path)
+
+
+def _pdf_chunk_rows(path, start, stop):
+    # Dijalankan di worker: ekstraksi teks dan regex untuk halaman [start, stop)
+    import PyPDF2
+
+    with open(path, 'rb') as handle:
+        pages = PyPDF2.PdfReader(handle).pages
+        rows = []
+        for line in _iter_page_lines(pages[page] for page in range(start, stop)):
+            row = extract_row(line)
+            if row is not None:
+                rows.append(row)
+    return rows
+
+
+def extract_data_from_text(text):
+    """
+    Ekstrak semua baris data dari satu string teks
+
+    Args:
+        text: Teks dokumen
+
+    Returns:
+        list: List of dict {'features', 'label'}
+    """
+    return list(iter_extracted_rows(text.split('\n')))
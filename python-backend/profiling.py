@@ -0,0 +1,278 @@
+"""
+Profiling cProfile per request (opt-in) untuk menyelidiki request lambat.
+
+Request diprofil jika membawa header X-Profile (nilainya harus sama dengan
+PROFILING_TOKEN jika token diatur) atau terpilih oleh sampling
+PROFILING_SAMPLE_RATE. Hasilnya disimpan di PROFILING_DIR sebagai file .prof
+(bisa dibuka dengan pstats/snakeviz) ditambah file .json berisi endpoint,
+dimensi payload, wall time dan fungsi teratas.
+
+Hook hanya dipasang jika PROFILING_ENABLED=1, jadi tanpa itu tidak ada overhead.
+cProfile hanya mengukur thread request; pekerjaan di process pool
+(algorithms/executor.py) tidak ikut terprofil.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import random
+import re
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+PROFILE_HEADER = 'X-Profile'
+
+# Jumlah fungsi teratas (cumulative time) yang disimpan di metadata
+TOP_FUNCTIONS = 15
+
+_PROFILE_ID_PATTERN = re.compile(r'^[0-9A-Za-z_-]+$')
+
+
+def profiling_config():
+    """Konfigurasi profiling dari environment"""
+    return {
+        'PROFILING_ENABLED': os.environ.get('PROFILING_ENABLED', '0') == '1',
+        'PROFILING_DIR': os.environ.get(
+            'PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'rcount-profiles')
+        ),
+        'PROFILING_SAMPLE_RATE': float(os.environ.get('PROFILING_SAMPLE_RATE', 0.0)),
+        'PROFILING_TOKEN': os.environ.get('PROFILING_TOKEN') or None,
+        'PROFILING_MAX_FILES': int(os.environ.get('PROFILING_MAX_FILES', 200)),
+    }
+
+
+def payload_dimensions(data):
+    """
+    Dimensi payload request untuk tag profil
+
+    Args:
+        data: Body request (dict) atau None
+
+    Returns:
+        dict: Misalnya {'n_train', 'n_features', 'n_test', 'k', 'n_rules', 'n_criteria'}
+    """
+    if not isinstance(data, dict):
+        return {}
+
+    dims = {}
+    for field, prefix in (('train_data', 'n_train'), ('test_data', 'n_test'),
+                          ('rows', 'n_rows'), ('input_values', 'n_items')):
+        value = data.get(field)
+        if hasattr(value, '__len__') and not isinstance(value, (str, bytes, dict)):
+            dims[prefix] = len(value)
+            first = value[0] if len(value) else None
+            if 'n_features' not in dims and hasattr(first, '__len__') \
+                    and not isinstance(first, (str, bytes, dict)):
+                dims['n_features'] = len(first)
+
+    for field in ('k', 'k_range', 'metric', 'engine', 'backend'):
+        if field in data and isinstance(data[field], (int, float, str, list)):
+            dims[field] = data[field]
+    if isinstance(data.get('rules'), list):
+        dims['n_rules'] = len(data['rules'])
+    if isinstance(data.get('criteria'), list):
+        dims['n_criteria'] = len(data['criteria'])
+    inputs = data.get('inputs')
+    if isinstance(inputs, list):
+        dims['n_inputs'] = len(inputs)
+    return dims
+
+
+def _request_dimensions(request):
+    if request.is_json:
+        # get_json sudah di-cache oleh route, jadi tidak di-parse ulang
+        return payload_dimensions(request.get_json(silent=True))
+    dims = payload_dimensions({key: _form_value(value) for key, value in request.form.items()})
+    for field, upload in request.files.items():
+        dims[f'{field}_bytes'] = upload.content_length or _stream_size(upload.stream)
+    return dims
+
+
+def _form_value(value):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def _stream_size(stream):
+    try:
+        return os.fstat(stream.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        try:
+            return len(stream.getbuffer())
+        except AttributeError:
+            return None
+
+
+def _should_profile(config, request):
+    header = request.headers.get(PROFILE_HEADER)
+    if header is not None:
+        token = config['PROFILING_TOKEN']
+        if token is None or header == token:
+            return 'header'
+    rate = config['PROFILING_SAMPLE_RATE']
+    if rate > 0 and random.random() < rate:
+        return 'sample'
+    return None
+
+
+def _short_path(filename):
+    # Folder induk ikut ditampilkan agar flask/app.py tidak tertukar dengan app.py
+    parent = os.path.basename(os.path.dirname(filename))
+    return os.path.join(parent, os.path.basename(filename)) if parent else filename
+
+
+def _top_functions(profiler, limit=TOP_FUNCTIONS):
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f'{_short_path(filename)}:{line}({name})',
+            'calls': calls,
+            'total_time': round(total, 6),
+            'cumulative_time': round(cumulative, 6)
+        })
+    rows.sort(key=lambda row: row['cumulative_time'], reverse=True)
+    return rows[:limit]
+
+
+def save_profile(directory, profile_id, profiler, metadata, max_files=200):
+    """
+    Simpan profil (.prof) dan metadata (.json), lalu hapus profil terlama
+    jika jumlahnya melebihi max_files
+
+    Returns:
+        dict: Metadata yang disimpan
+    """
+    os.makedirs(directory, exist_ok=True)
+    metadata = dict(metadata, id=profile_id, top=_top_functions(profiler))
+    profiler.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+
+    # Metadata ditulis terakhir lewat rename atomik: profil tanpa .json tidak terdaftar
+    meta_path = os.path.join(directory, f'{profile_id}.json')
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(metadata, handle, indent=2, default=str)
+    os.replace(tmp_path, meta_path)
+
+    _prune(directory, max_files)
+    return metadata
+
+
+def _prune(directory, max_files):
+    entries = sorted(
+        (name for name in os.listdir(directory) if name.endswith('.json')), reverse=True
+    )
+    for name in entries[max_files:]:
+        base = os.path.join(directory, name[:-len('.json')])
+        for path in (base + '.json', base + '.prof'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory, limit=50):
+    """
+    Daftar profil terbaru (tanpa detail fungsi)
+
+    Returns:
+        list: Metadata profil, terbaru lebih dulu
+    """
+    if not os.path.isdir(directory):
+        return []
+    names = sorted((name for name in os.listdir(directory) if name.endswith('.json')),
+                   reverse=True)
+    profiles = []
+    for name in names[:limit]:
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as handle:
+                metadata = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        metadata.pop('top', None)
+        profiles.append(metadata)
+    return profiles
+
+
+def profile_paths(directory, profile_id):
+    """
+    Path (.json, .prof) untuk profile_id
+
+    Raises:
+        KeyError: Jika profile_id tidak valid atau tidak ditemukan
+    """
+    if not _PROFILE_ID_PATTERN.match(profile_id):
+        raise KeyError(profile_id)
+    meta_path = os.path.join(directory, f'{profile_id}.json')
+    prof_path = os.path.join(directory, f'{profile_id}.prof')
+    if not os.path.exists(meta_path):
+        raise KeyError(profile_id)
+    return meta_path, prof_path
+
+
+def install_profiling_hooks(app):
+    """
+    Pasang hook profiling ke app jika PROFILING_ENABLED=1
+
+    Konfigurasi disimpan di app.config (PROFILING_*), sehingga bisa diubah
+    setelah create_app().
+    """
+    config = profiling_config()
+    for key, value in config.items():
+        app.config.setdefault(key, value)
+    if not app.config['PROFILING_ENABLED']:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_profile():
+        reason = _should_profile(app.config, request)
+        if reason is None:
+            return
+        # ID diawali timestamp agar urutan nama file = urutan waktu
+        g._profile_id = (datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+                         + '-' + uuid.uuid4().hex[:8])
+        g._profile_reason = reason
+        g._profile_start = time.perf_counter()
+        g._profiler = cProfile.Profile()
+        g._profiler.enable()
+
+    @app.after_request
+    def _finish_profile(response):
+        profiler = g.pop('_profiler', None)
+        if profiler is None:
+            return response
+
+        profile_id = g._profile_id
+        metadata = {
+            'endpoint': request.url_rule.rule if request.url_rule is not None else request.path,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'reason': g._profile_reason,
+            'pid': os.getpid(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        }
+        start = g._profile_start
+
+        def _finish():
+            profiler.disable()
+            metadata['wall_time'] = round(time.perf_counter() - start, 6)
+            save_profile(app.config['PROFILING_DIR'], profile_id, profiler, metadata,
+                         app.config['PROFILING_MAX_FILES'])
+
+        # Dimensi dibaca sebelum request context ditutup
+        metadata['dimensions'] = _request_dimensions(request)
+        response.headers['X-Profile-Id'] = profile_id
+        if response.is_streamed:
+            # Response streaming diprofil sampai baris terakhir terkirim
+            response.call_on_close(_finish)
+        else:
+            _finish()
+        return response
@@ -0,0 +1,120 @@
+"""
+Encoding response JSON: provider orjson (jika ter-install) dan kompresi gzip opsional.
+
+OrjsonProvider menggantikan DefaultJSONProvider Flask sehingga jsonify() memakai
+orjson. Output setara dengan provider default (key diurutkan, tanpa spasi),
+kecuali karakter non-ASCII dikirim sebagai UTF-8 dan NaN/Infinity menjadi null
+(JSON valid). Tipe yang tidak didukung orjson tetap ditangani oleh default Flask.
+
+Gzip hanya aktif jika RESPONSE_GZIP=1, client mengirim Accept-Encoding: gzip
+dan body minimal RESPONSE_GZIP_MIN_BYTES. Jika server berada di belakang reverse
+proxy yang sudah mengompres, biarkan nonaktif.
+"""
+
+import gzip
+import json
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson opsional, fallback ke json standar
+    orjson = None
+
+
+def response_config():
+    """Konfigurasi encoding response dari environment"""
+    return {
+        'RESPONSE_ORJSON': os.environ.get('RESPONSE_ORJSON', '1') == '1',
+        'RESPONSE_GZIP': os.environ.get('RESPONSE_GZIP', '0') == '1',
+        'RESPONSE_GZIP_MIN_BYTES': int(os.environ.get('RESPONSE_GZIP_MIN_BYTES', 1024)),
+        'RESPONSE_GZIP_LEVEL': int(os.environ.get('RESPONSE_GZIP_LEVEL', 5)),
+    }
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider Flask berbasis orjson"""
+
+    # Tanggal dan dataclass diteruskan ke default Flask agar formatnya sama
+    # (http_date untuk tanggal)
+    _OPTIONS = (
+        (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+         | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if orjson is not None else 0
+    )
+
+    @property
+    def _enabled(self):
+        # Dibaca per panggilan agar RESPONSE_ORJSON bisa diubah setelah create_app()
+        return self._app.config.get('RESPONSE_ORJSON', True)
+
+    def _dumps_bytes(self, obj, indent=False):
+        option = self._OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or not self._enabled:
+            # Argumen khusus json.dumps (indent, cls, ...) hanya didukung provider default
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._dumps_bytes(obj).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs or not self._enabled:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # Pesan error dan literal non-standar (NaN) mengikuti json standar
+            return json.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self._enabled:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        try:
+            body = self._dumps_bytes(obj, indent=indent) + b'\n'
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _accepts_gzip(request):
+    return request.accept_encodings['gzip'] > 0 or request.accept_encodings['*'] > 0
+
+
+def install_response_encoding(app):
+    """
+    Pasang provider orjson dan hook gzip ke app
+
+    Konfigurasi disimpan di app.config (RESPONSE_*) dan dibaca setiap response,
+    sehingga bisa diubah setelah create_app(). Provider orjson hanya dipasang jika
+    orjson ter-install.
+    """
+    for key, value in response_config().items():
+        app.config.setdefault(key, value)
+
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+    from flask import request
+
+    @app.after_request
+    def _gzip_response(response):
+        if (not app.config['RESPONSE_GZIP']
+                or response.is_streamed or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or not 200 <= response.status_code < 300
+                or not _accepts_gzip(request)):
+            return response
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        if len(body) < app.config['RESPONSE_GZIP_MIN_BYTES']:
+            return response
+        response.set_data(gzip.compress(body, compresslevel=app.config['RESPONSE_GZIP_LEVEL']))
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
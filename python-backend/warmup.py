@@ -0,0 +1,72 @@
+"""
+Warm-up worker sebelum menerima request.
+Menjalankan fit KNN dan build fuzzy system kecil sekali, sehingga lazy import,
+inisialisasi Cython/BLAS dan code path pertama tidak dibayar oleh request user.
+"""
+
+import time
+
+import numpy as np
+
+from algorithms.executor import get_executor
+from algorithms.knn import KNNAlgorithm
+from algorithms.fuzzy_logic import (
+    build_fuzzy_system, simple_fuzzy_inference, simple_fuzzy_inference_batch
+)
+
+
+_WARMUP_CRITERIA = [{
+    'name': 'kualitas',
+    'range': [0, 100],
+    'memberships': {
+        'rendah': ['trimf', [0, 0, 50]],
+        'tinggi': ['trimf', [50, 100, 100]]
+    }
+}]
+
+_WARMUP_RULES = [
+    {'antecedents': [['kualitas', 'rendah']], 'consequent': ['hasil', 'rendah']},
+    {'antecedents': [['kualitas', 'tinggi']], 'consequent': ['hasil', 'tinggi']}
+]
+
+
+def _warm_knn():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(30, 3))
+    y = np.repeat([0, 1], 15)
+
+    knn = KNNAlgorithm(k=3)
+    knn.train(X, y)
+    knn.predict(X[:2])
+    KNNAlgorithm().find_optimal_k(X, y, k_range=(1, 5))
+
+    # Worker process pool dibuat sekarang, bukan saat find-optimal-k pertama
+    get_executor().warm_up()
+
+
+def _warm_fuzzy():
+    simple_fuzzy_inference([75, 60, 80], [0.3, 0.3, 0.4])
+    simple_fuzzy_inference_batch([[75, 60, 80], [40, 55, 70]], [0.3, 0.3, 0.4])
+
+    # System warm-up tidak dimasukkan ke fuzzy_system_cache agar statistik cache tetap bersih
+    for engine in ('skfuzzy', 'numpy'):
+        fuzzy_sys = build_fuzzy_system(_WARMUP_CRITERIA, _WARMUP_RULES, engine=engine)
+        fuzzy_sys.compute({'kualitas': 75})
+        fuzzy_sys.compute_batch({'kualitas': [25, 75]})
+
+
+def warm_up(app):
+    """
+    Jalankan warm-up lalu tandai app siap (READY) untuk /api/health
+
+    Args:
+        app: Flask app dari create_app()
+    """
+    app.config['READY'] = False
+    start = time.perf_counter()
+
+    _warm_knn()
+    _warm_fuzzy()
+
+    app.config['WARMUP_SECONDS'] = round(time.perf_counter() - start, 3)
+    app.config['READY'] = True
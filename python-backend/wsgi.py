@@ -0,0 +1,25 @@
+"""
+Entry point production untuk gunicorn:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Modul ini di-load sekali di master (preload_app), jadi numpy, scikit-learn dan
+scikit-fuzzy dibagi ke semua worker lewat copy-on-write. Warm-up dijalankan
+per worker oleh hook post_worker_init di gunicorn.conf.py; server WSGI lain
+perlu memanggil warmup.warm_up(app) setelah fork.
+
+Dataset store KNN (algorithms/dataset_store.py) aktif secara default di production
+agar semua worker berbagi satu salinan data training lewat page cache; atur
+KNN_DATASET_DIR ke folder persisten, atau kosongkan (KNN_DATASET_DIR=) untuk
+menonaktifkannya.
+"""
+
+import os
+import tempfile
+
+# Harus diatur sebelum app di-import: model_registry membaca KNN_DATASET_DIR saat import
+os.environ.setdefault('KNN_DATASET_DIR', os.path.join(tempfile.gettempdir(), 'rcount-datasets'))
+
+from app import create_app  # noqa: E402
+
+app = create_app(warm_up=True)